@@ -0,0 +1 @@
+"""Benchmarks run against local PowerDNS and whmapi1 stand-ins."""
@@ -0,0 +1,461 @@
+"""Benchmarks for the hooks, PowerDNS reads and HTTP transports, zone sync and DNS templates.
+
+Everything runs against local stand-ins inside a scratch sandbox:
+``tests/fake_pdns.py`` for the PowerDNS API (with configurable latency, zone
+and record counts) and ``benchmarks/fake_whmapi1`` for cPanel. Results are
+written as JSON so runs of different releases can be compared::
+
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --zones 100000 --only api
+    python -m benchmarks.run_benchmarks --compare results-1.0.0.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.sandbox import REPO_DIR, Sandbox
+from tests.fake_pdns import FakePowerDNS
+
+HOOKS_DIR = REPO_DIR / "scripts" / "hooks"
+RUN_HOOK = Path(__file__).resolve().parent / "run_hook.py"
+GROUPS = ("hooks", "api", "transport", "sync", "templates")
+
+# One create/edit/read/delete cycle, in the order cPanel would fire the hooks
+HOOK_SEQUENCE = (
+    ("dns_create_zone", lambda zone: [zone, zone, "default", "root"]),
+    ("dns_add_record", lambda zone: [zone, "www", "A", "192.0.2.1", "300"]),
+    ("dns_update_record", lambda zone: [zone, "www", "A", "192.0.2.2", "300"]),
+    ("dns_fetch_zone", lambda zone: [zone]),
+    ("dns_list_zones", lambda zone: []),
+    ("dns_delete_record", lambda zone: [zone, "www", "A"]),
+    ("dns_delete_zone", lambda zone: [zone]),
+)
+
+TEMPLATE = """\
+; cPanel %cpversion%
+; Zone file for %domain%
+$TTL %ttl%
+@      %nsttl%	IN      SOA     %nameserver%. %rpemail%. (
+		%serial%	; serial, todays date+todays
+		3600		; refresh, seconds
+		1800		; retry, seconds
+		1209600		; expire, seconds
+		86400 )		; minimum, seconds
+
+%domain%. %nsttl% IN NS %nameserver%.
+%domain%. %nsttl% IN NS %nameserver2%.
+
+%domain%. IN A %ip%
+%domain%. IN MX 0 %domain%.
+%domain%. IN TXT "v=spf1 +a +mx ~all"
+mail IN CNAME %domain%.
+www IN CNAME %domain%.
+ftp IN A %ftpip%
+"""
+TEMPLATE_VARIABLES = {
+    "nameserver": "ns1.example.net",
+    "nameserver2": "ns2.example.net",
+    "ip": "192.0.2.10",
+    "ftpip": "192.0.2.10",
+}
+
+
+def _stats(samples, **extra):
+    """Summarize timings in seconds."""
+    ordered = sorted(samples)
+    return dict(
+        runs=len(ordered),
+        mean=statistics.fmean(ordered),
+        median=statistics.median(ordered),
+        p95=ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        min=ordered[0],
+        max=ordered[-1],
+        **extra,
+    )
+
+
+def _max_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def timed(function, repeat, **extra):
+    """Call ``function`` ``repeat`` times and summarize; includes this process's peak RSS growth."""
+    rss = _max_rss_kb()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return _stats(samples, max_rss_growth_kb=_max_rss_kb() - rss, **extra)
+
+
+def run_hook(sandbox, hook, *args):
+    """Run a hook in a fresh sandboxed interpreter; return (seconds, exit code, peak RSS in KB)."""
+    rss_file = sandbox.root / "hook_rss"
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, str(RUN_HOOK), str(sandbox.root), str(HOOKS_DIR / hook), *args],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=dict(sandbox.env(), BENCH_RSS_FILE=str(rss_file)),
+    )
+    elapsed = time.perf_counter() - started
+    try:
+        max_rss = int(rss_file.read_text() or 0)
+        rss_file.unlink()
+    except (OSError, ValueError):
+        max_rss = None
+    return elapsed, result.returncode, max_rss
+
+
+def bench_hooks(sandbox, args, results):
+    """End-to-end cost of every hook, with and without the daemon, and with the plugin disabled."""
+    from ultahost_dns.daemon import HookDaemon
+
+    fake = FakePowerDNS(latency=args.latency).start()
+    try:
+        fake.populate(args.hook_zones, args.records)
+        sandbox.write_config(enabled=True, api_url=fake.url, api_key=fake.api_key)
+        for mode in ("local", "daemon"):
+            daemon = thread = None
+            if mode == "daemon":
+                daemon = HookDaemon(socket_path=sandbox.socket_path)
+                thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+                thread.start()
+                while not sandbox.socket_path.exists():
+                    time.sleep(0.01)
+
+            samples = {hook: [] for hook, _ in HOOK_SEQUENCE}
+            rss = dict.fromkeys(samples, 0)
+            failures = dict.fromkeys(samples, 0)
+            for index in range(args.repeat):
+                zone = f"hook-{mode}-{index}.test"
+                for hook, hook_args in HOOK_SEQUENCE:
+                    elapsed, code, max_rss = run_hook(sandbox, hook, *hook_args(zone))
+                    samples[hook].append(elapsed)
+                    rss[hook] = max(rss[hook], max_rss or 0)
+                    failures[hook] += code != 0
+
+            if daemon is not None:
+                daemon.shutdown()
+                thread.join(timeout=5)
+            for hook in samples:
+                results[f"hooks.{hook}.{mode}"] = _stats(
+                    samples[hook], max_rss_kb=rss[hook], failures=failures[hook]
+                )
+
+        # Startup cost alone: the hook exits after the enabled check
+        sandbox.write_config(enabled=False)
+        runs = [
+            run_hook(sandbox, "dns_add_record", *HOOK_SEQUENCE[1][1]("disabled.test"))
+            for _ in range(args.repeat)
+        ]
+        results["hooks.dns_add_record.disabled"] = _stats(
+            [elapsed for elapsed, _, _ in runs],
+            max_rss_kb=max(max_rss or 0 for _, _, max_rss in runs),
+            failures=sum(code != 0 for _, code, _ in runs),
+        )
+    finally:
+        fake.stop()
+
+
+def bench_api(sandbox, args, results):
+    """Zone listing and record reads at each zone count."""
+    from ultahost_dns.powerdns_client import PowerDNSClient
+
+    for count in args.zones:
+        fake = FakePowerDNS(latency=args.latency).start()
+        try:
+            names = fake.populate(count, args.records)
+            client = PowerDNSClient(api_url=fake.url, api_key=fake.api_key)
+            results[f"api.list_zones.{count}"] = timed(client.list_zones, args.repeat, zones=count)
+            results[f"api.iter_zones.{count}"] = timed(
+                lambda: sum(1 for _ in client.iter_zones(dnssec=False)), args.repeat, zones=count
+            )
+
+            picks = names[:: max(1, count // args.sample)][: args.sample]
+            rss = _max_rss_kb()
+            samples = []
+            for name in picks:
+                started = time.perf_counter()
+                client.get_records(name)
+                samples.append(time.perf_counter() - started)
+            results[f"api.get_records.{count}"] = _stats(
+                samples, zones=count, max_rss_growth_kb=_max_rss_kb() - rss
+            )
+        finally:
+            fake.stop()
+
+
+def bench_transport(sandbox, args, results):
+    """Per-request cost of each HTTP transport: small reads, PATCHes and a listing."""
+    from ultahost_dns.powerdns_client import PowerDNSClient
+
+    fake = FakePowerDNS(latency=args.latency).start()
+    try:
+        names = fake.populate(args.hook_zones, args.records)
+        for transport in PowerDNSClient.TRANSPORTS:
+            client = PowerDNSClient(api_url=fake.url, api_key=fake.api_key, transport=transport)
+            connections = fake.connections
+            results[f"transport.{transport}.get_zone"] = timed(
+                lambda: client.get_zone(names[0], rrsets=False), args.repeat * 100
+            )
+            results[f"transport.{transport}.patch"] = timed(
+                lambda: client.add_record(names[0], "bench", "A", "192.0.2.1"), args.repeat * 100
+            )
+            results[f"transport.{transport}.list_zones"] = timed(
+                client.list_zones, args.repeat, zones=args.hook_zones
+            )
+            # TCP connections opened over the whole run; 1 when keep-alive works
+            results[f"transport.{transport}.list_zones"]["connections"] = (
+                fake.connections - connections
+            )
+    finally:
+        fake.stop()
+
+
+def bench_sync(sandbox, args, results):
+    """sync_zones.py throughput: first sync, no-op resync, partial change and full resync."""
+    from ultahost_dns.powerdns_client import PowerDNSClient
+    from ultahost_dns.sync import ZoneSyncer
+
+    fake = FakePowerDNS(latency=args.latency).start()
+    try:
+        names = fake.populate(args.sync_zones, args.records, prefix="sync")
+
+        def sync(phase, **kwargs):
+            syncer = ZoneSyncer(
+                client_factory=lambda: PowerDNSClient(api_url=fake.url, api_key=fake.api_key),
+                output=lambda line: None,
+                **kwargs,
+            )
+            rss = _max_rss_kb()
+            started = time.perf_counter()
+            stats = syncer.run()
+            elapsed = time.perf_counter() - started
+            results[f"sync.{phase}.{args.sync_zones}"] = {
+                "seconds": elapsed,
+                "zones_per_second": args.sync_zones / elapsed if elapsed else None,
+                "max_rss_growth_kb": _max_rss_kb() - rss,
+                "stats": stats,
+            }
+
+        sync("initial")
+        sync("unchanged")
+        for name in names[:: max(1, len(names) // 10)]:
+            zone = fake.zones[name]
+            zone["rrsets"].append(
+                {
+                    "name": f"new.{name}",
+                    "type": "A",
+                    "ttl": 300,
+                    "records": [{"content": "192.0.2.99"}],
+                }
+            )
+            zone["serial"] += 1
+            zone["edited_serial"] = zone["serial"]
+        sync("changed")
+        sync("full", full=True)
+    finally:
+        fake.stop()
+
+
+def bench_templates(sandbox, args, results):
+    """Template compilation, rendering and application in one PATCH."""
+    from ultahost_dns.dns_template import DNSTemplate
+    from ultahost_dns.powerdns_client import PowerDNSClient
+
+    (DNSTemplate.TEMPLATE_DIR / "standard.db").write_text(TEMPLATE)
+
+    def cold():
+        DNSTemplate._compiled.clear()
+        shutil.rmtree(DNSTemplate.CACHE_DIR, ignore_errors=True)
+        DNSTemplate.get_template_records("example.com", "standard", TEMPLATE_VARIABLES)
+
+    def disk_cached():
+        DNSTemplate._compiled.clear()
+        DNSTemplate.get_template_records("example.com", "standard", TEMPLATE_VARIABLES)
+
+    results["templates.render.cold"] = timed(cold, args.repeat)
+    results["templates.render.disk_cache"] = timed(disk_cached, args.repeat)
+    results["templates.render.warm"] = timed(
+        lambda: DNSTemplate.get_template_records("example.com", "standard", TEMPLATE_VARIABLES),
+        args.repeat * 10,
+    )
+
+    fake = FakePowerDNS(latency=args.latency).start()
+    try:
+        sandbox.write_config(
+            enabled=True,
+            api_url=fake.url,
+            api_key=fake.api_key,
+            template_variables=TEMPLATE_VARIABLES,
+        )
+        client = PowerDNSClient(api_url=fake.url, api_key=fake.api_key)
+        zones = [f"template{index}.test" for index in range(args.repeat)]
+        for zone in zones:
+            client.create_zone(zone)
+        pending = iter(zones)
+        results["templates.apply"] = timed(
+            lambda: DNSTemplate.apply_template_to_zone(client, next(pending), "standard"),
+            args.repeat,
+        )
+    finally:
+        fake.stop()
+
+
+BENCHMARKS = {
+    "hooks": bench_hooks,
+    "api": bench_api,
+    "transport": bench_transport,
+    "sync": bench_sync,
+    "templates": bench_templates,
+}
+
+
+def _headline(result):
+    """The figure compared between runs: median seconds, or total seconds for one-shot runs."""
+    return result.get("median", result.get("seconds"))
+
+
+def compare(results, baseline, threshold):
+    """Print changes against a baseline; return the benchmarks slower by over ``threshold``."""
+    regressions = []
+    print(
+        f"\nCompared with {baseline.get('version')} ({baseline.get('created')}):", file=sys.stderr
+    )
+    for name, result in sorted(results.items()):
+        before = baseline.get("results", {}).get(name)
+        if before is None or not _headline(before):
+            print(f"  {name:45} (new)", file=sys.stderr)
+            continue
+        change = _headline(result) / _headline(before) - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        timings = f"{_headline(before):10.4f}s -> {_headline(result):10.4f}s"
+        print(f"  {name:45} {timings}  {change:+7.1%}{flag}", file=sys.stderr)
+    return regressions
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    counts = lambda text: [int(value) for value in text.split(",")]  # noqa: E731
+    parser = argparse.ArgumentParser(
+        description="Benchmark the plugin against local PowerDNS and whmapi1 stand-ins"
+    )
+    parser.add_argument(
+        "--only",
+        type=lambda text: text.split(","),
+        default=list(GROUPS),
+        help=f"Groups to run (default: {','.join(GROUPS)})",
+    )
+    parser.add_argument(
+        "--zones", type=counts, default=[10000, 100000], help="Zone counts for the API benchmarks"
+    )
+    parser.add_argument(
+        "--records", type=int, default=4, help="A records per generated zone (default: 4)"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every API response"
+    )
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per benchmark (default: 10)")
+    parser.add_argument(
+        "--sample", type=int, default=100, help="Zones read by the get_records benchmark"
+    )
+    parser.add_argument(
+        "--hook-zones", type=int, default=100, help="Zones on the server during hook runs"
+    )
+    parser.add_argument(
+        "--sync-zones", type=int, default=500, help="Zones synced by the sync benchmark"
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Slowdown reported as a regression (0.2 = 20%%)",
+    )
+    args = parser.parse_args(argv)
+    unknown = set(args.only) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown benchmark groups: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    """Run the selected benchmarks and write the report."""
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="ultahost_dns_bench.") as tmpdir:
+        sandbox = Sandbox(tmpdir)
+        sandbox.apply()
+        sys.path.insert(0, str(REPO_DIR / "src"))
+        from ultahost_dns import __version__
+        from ultahost_dns.logger import PluginLogger
+
+        # Benchmarked code logs to the sandbox log file; keep the console for warnings
+        PluginLogger.get_logger()
+        for handler in PluginLogger._listener.handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.WARNING)
+
+        results = {}
+        for group in args.only:
+            print(f"Running {group} benchmarks...", file=sys.stderr)
+            BENCHMARKS[group](sandbox, args, results)
+
+    report = {
+        "version": __version__,
+        "commit": _commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            key: value for key, value in vars(args).items() if key not in ("output", "compare")
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
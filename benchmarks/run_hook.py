@@ -0,0 +1,31 @@
+"""Run a hook or script inside a sandbox: ``python benchmarks/run_hook.py ROOT SCRIPT [ARGS...]``.
+
+With ``BENCH_RSS_FILE`` set, the process's peak RSS (KB) is written there on exit.
+"""
+
+import atexit
+import os
+import runpy
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from sandbox import Sandbox  # noqa: E402
+
+
+def _write_peak_rss(path):
+    # VmHWM starts afresh at exec, unlike ru_maxrss, which carries over the forking parent's size
+    with open("/proc/self/status", "r") as f:
+        peak = next((line.split()[1] for line in f if line.startswith("VmHWM:")), "0")
+    with open(path, "w") as f:
+        f.write(peak)
+
+
+if __name__ == "__main__":
+    root, script, *args = sys.argv[1:]
+    if os.environ.get("BENCH_RSS_FILE"):
+        atexit.register(_write_peak_rss, os.environ["BENCH_RSS_FILE"])
+    Sandbox(root).apply()
+    sys.argv = [script, *args]
+    runpy.run_path(script, run_name="__main__")
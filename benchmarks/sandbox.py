@@ -0,0 +1,143 @@
+"""Point the plugin's system paths (config, logs, caches, cPanel files) into a scratch directory.
+
+Patches are applied to each plugin module right after it is imported, so a
+sandboxed hook imports exactly the modules it would in production.
+"""
+
+import importlib.abc
+import importlib.machinery
+import json
+import os
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+FAKE_WHMAPI1 = Path(__file__).resolve().parent / "fake_whmapi1"
+
+
+def _patches(root):
+    """Return ``{module name: patch(module)}`` for a sandbox rooted at ``root``."""
+    cache = root / "cache"
+
+    def config(m):
+        m.Config.CONFIG_FILE = root / "config.json"
+
+    def logger(m):
+        m.PluginLogger.LOG_DIR = root / "log"
+        m.PluginLogger.LOG_FILE = root / "log" / "ultahost_dns.log"
+
+    def metrics(m):
+        m.MetricsStore.STORE_FILE = cache / "metrics.sqlite"
+        m.Metrics.store = m.MetricsStore()
+
+    def circuit_breaker(m):
+        m.CircuitBreaker.STATE_FILE = cache / "circuit_breaker.json"
+
+    def daemon(m):
+        m.DaemonClient.SOCKET_PATH = root / "run" / "ultahost_dns.sock"
+
+    def zone_cache(m):
+        m.ZoneCache.CACHE_FILE = cache / "zones.sqlite"
+
+    def ownership(m):
+        m.OwnershipIndex.USERDOMAINS_FILE = root / "userdomains"
+        m.OwnershipIndex.TRUEUSEROWNERS_FILE = root / "trueuserowners"
+        m.OwnershipIndex.INDEX_FILE = cache / "ownership.json"
+        m.OwnershipIndex.WHMAPI1 = str(FAKE_WHMAPI1)
+
+    def permissions(m):
+        m.CpanelAccountBackend.RESELLERS_FILE = root / "resellers"
+        m.CpanelAccountBackend.USERS_DIR = root / "users"
+        m.Permissions.ownership = m.OwnershipIndex()
+
+    def dns_template(m):
+        m.DNSTemplate.TEMPLATE_DIR = root / "dns_templates"
+        m.DNSTemplate.CACHE_DIR = cache / "templates"
+
+    def cpanel_dns(m):
+        m.CpanelDNS.WHMAPI1 = str(FAKE_WHMAPI1)
+        m.ZoneFiles.ZONE_DIR = root / "named"
+        m.ZoneFiles.RELOAD_COMMAND = ("true",)
+
+    def sync(m):
+        m.SyncState.STATE_FILE = root / "sync_state.json"
+
+    def zone_import(m):
+        m.ZoneImporter.ZONE_DIR = root / "named"
+
+    patches = {
+        "config": config,
+        "logger": logger,
+        "metrics": metrics,
+        "circuit_breaker": circuit_breaker,
+        "daemon": daemon,
+        "zone_cache": zone_cache,
+        "ownership": ownership,
+        "permissions": permissions,
+        "dns_template": dns_template,
+        "cpanel_dns": cpanel_dns,
+        "sync": sync,
+        "zone_import": zone_import,
+    }
+    return {f"ultahost_dns.{name}": patch for name, patch in patches.items()}
+
+
+class _PatchingFinder(importlib.abc.MetaPathFinder):
+    """Apply a sandbox patch to plugin modules as they are imported."""
+
+    def __init__(self, patches):
+        self.patches = patches
+
+    def find_spec(self, fullname, path, target=None):
+        patch = self.patches.get(fullname)
+        if patch is None:
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path)
+        if spec is None or spec.loader is None:
+            return spec
+        exec_module = spec.loader.exec_module
+
+        def exec_and_patch(module):
+            exec_module(module)
+            patch(module)
+
+        spec.loader.exec_module = exec_and_patch
+        return spec
+
+
+class Sandbox:
+    """A scratch directory standing in for the system paths the plugin uses."""
+
+    def __init__(self, root):
+        """Create the sandbox directories under ``root``."""
+        self.root = Path(root)
+        for name in ("cache", "log", "run", "named", "users", "dns_templates"):
+            (self.root / name).mkdir(parents=True, exist_ok=True)
+        for name in ("userdomains", "trueuserowners", "resellers"):
+            (self.root / name).touch()
+
+    @property
+    def socket_path(self):
+        """Path of the hook daemon socket inside the sandbox."""
+        return self.root / "run" / "ultahost_dns.sock"
+
+    def write_config(self, **settings):
+        """Write the plugin configuration file."""
+        (self.root / "config.json").write_text(json.dumps(settings))
+
+    def env(self):
+        """Return a clean environment for sandboxed subprocesses."""
+        return {
+            "PATH": os.environ.get("PATH", "/usr/bin:/bin"),
+            "HOME": str(self.root),
+            "FAKE_WHMAPI1_ROOT": str(self.root),
+        }
+
+    def apply(self):
+        """Patch the plugin modules in this process, now and when they are imported later."""
+        os.environ["FAKE_WHMAPI1_ROOT"] = str(self.root)
+        patches = _patches(self.root)
+        for name, patch in patches.items():
+            if name in sys.modules:
+                patch(sys.modules[name])
+        sys.meta_path.insert(0, _PatchingFinder(patches))
@@ -90,8 +90,22 @@ cp "$SCRIPT_DIR/scripts/test_connection.py" /usr/local/cpanel/bin/ultahost_dns/
 cp "$SCRIPT_DIR/scripts/sync_zones.py" /usr/local/cpanel/bin/ultahost_dns/ 2>/dev/null || true
 cp "$SCRIPT_DIR/scripts/list_zones_api.py" /usr/local/cpanel/bin/ultahost_dns/ 2>/dev/null || true
 cp "$SCRIPT_DIR/scripts/fetch_zone_api.py" /usr/local/cpanel/bin/ultahost_dns/ 2>/dev/null || true
+cp "$SCRIPT_DIR/scripts/provision_zones.py" /usr/local/cpanel/bin/ultahost_dns/ 2>/dev/null || true
+cp "$SCRIPT_DIR/scripts/export_metrics.py" /usr/local/cpanel/bin/ultahost_dns/ 2>/dev/null || true
+cp "$SCRIPT_DIR/scripts/flush_journal.py" /usr/local/cpanel/bin/ultahost_dns/ 2>/dev/null || true
 chmod 755 /usr/local/cpanel/bin/ultahost_dns/*.py
 
+# Install hook daemon (hooks fall back to running in-process when it is down)
+if [ -d "/etc/systemd/system" ] && command -v systemctl > /dev/null 2>&1; then
+    echo -e "${YELLOW}Installing hook daemon...${NC}"
+    cp "$SCRIPT_DIR/scripts/ultahost-dns.service" /etc/systemd/system/ultahost-dns.service
+    chmod 644 /etc/systemd/system/ultahost-dns.service
+    systemctl daemon-reload
+    systemctl enable ultahost-dns.service > /dev/null 2>&1 || true
+    systemctl restart ultahost-dns.service || true
+    echo -e "${GREEN}Hook daemon installed${NC}"
+fi
+
 # Install dnsadmin plugin (if Perl modules exist)
 if [ -f "$SCRIPT_DIR/src/ultahost_dns/dnsadmin/Setup.pm" ]; then
     echo -e "${YELLOW}Installing dnsadmin plugin...${NC}"
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Export the plugin's latency and error metrics for Prometheus or as JSON."""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+possible_paths = [
+    Path(__file__).parent.parent / "src",
+    Path("/usr/local/cpanel/bin/ultahost_dns"),
+]
+
+for path in possible_paths:
+    if path.exists():
+        sys.path.insert(0, str(path))
+        break
+
+from ultahost_dns.journal import Journal
+from ultahost_dns.metrics import Metrics, prometheus_text, summary
+
+DEFAULT_TEXTFILE = Path("/var/lib/node_exporter/textfile_collector/ultahost_dns.prom")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Export the metrics recorded by the plugin's processes"
+    )
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument(
+        "--textfile",
+        nargs="?",
+        const=str(DEFAULT_TEXTFILE),
+        help=f"Write a node_exporter textfile collector file (default path: {DEFAULT_TEXTFILE})",
+    )
+    output.add_argument(
+        "--json", action="store_true", help="Print histogram summaries and counters as JSON"
+    )
+    parser.add_argument(
+        "--reset", action="store_true", help="Delete the recorded metrics after exporting"
+    )
+    return parser.parse_args()
+
+
+def journal_gauges(stats):
+    """Render the write-behind journal's depth and lag as Prometheus gauges."""
+    lines = []
+    for name, key in (
+        ("ultahost_dns_journal_depth", "depth"),
+        ("ultahost_dns_journal_zones", "zones"),
+        ("ultahost_dns_journal_lag_seconds", "lag_seconds"),
+        ("ultahost_dns_journal_retrying_zones", "retrying_zones"),
+    ):
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {stats[key]:g}")
+    return "\n".join(lines) + "\n"
+
+
+def write_atomic(path, text):
+    """Replace a file in one step, so the collector never reads a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def main():
+    """Main export function."""
+    args = parse_args()
+    try:
+        samples = Metrics.store.samples()
+    except Exception as e:
+        print(f"ERROR: Cannot read metrics from {Metrics.store.path}: {e}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        journal = Journal().stats()
+    except Exception as e:
+        print(f"ERROR: Cannot read the journal from {Journal.STORE_FILE}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(dict(summary(samples), journal=journal), indent=2))
+    elif args.textfile:
+        write_atomic(Path(args.textfile), prometheus_text(samples) + journal_gauges(journal))
+    else:
+        sys.stdout.write(prometheus_text(samples) + journal_gauges(journal))
+
+    if args.reset:
+        Metrics.store.reset()
+
+
+if __name__ == "__main__":
+    main()
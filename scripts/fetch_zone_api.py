@@ -16,7 +16,6 @@ for path in possible_paths:
 
 try:
     from ultahost_dns.config import Config
-    from ultahost_dns.powerdns_client import PowerDNSClient
 except ImportError:
     sys.exit(1)
 
@@ -26,18 +25,14 @@ if not Config.is_enabled():
 if len(sys.argv) < 2:
     sys.exit(1)
 
+# requests and the zone cache are loaded only once there is a zone to fetch
+from ultahost_dns.powerdns_client import PowerDNSClient  # noqa: E402
+from ultahost_dns.zone_cache import ZoneCache  # noqa: E402
+
 zone_name = sys.argv[1]
-client = PowerDNSClient()
-records = client.get_records(zone_name)
+client = PowerDNSClient(cache=ZoneCache())
+zone = client.get_zone_cached(zone_name)
+records = client.records_from_zone(zone) if zone else []
 
 for record in records:
-    name = record["name"].rstrip(".")
-    ttl = record.get("ttl", 3600)
-    record_type = record["type"]
-    content = record["content"]
-
-    if name == zone_name.rstrip("."):
-        name = "@"
-
-    print(f"{name}\t{ttl}\tIN\t{record_type}\t{content}")
-
+    print(record.to_zone_line(zone_name))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Apply or inspect the write-behind journal of record changes."""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+possible_paths = [
+    Path(__file__).parent.parent / "src",
+    Path("/usr/local/cpanel/bin/ultahost_dns"),
+]
+
+for path in possible_paths:
+    if path.exists():
+        sys.path.insert(0, str(path))
+        break
+
+from ultahost_dns.journal import Journal, JournalFlusher
+from ultahost_dns.powerdns_client import PowerDNSClient
+from ultahost_dns.zone_cache import ZoneCache
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Apply the record changes queued in the write-behind journal"
+    )
+    parser.add_argument(
+        "zones", nargs="*", help="Zones to flush (default: every zone with due changes)"
+    )
+    parser.add_argument("--force", action="store_true", help="Also flush zones waiting for a retry")
+    parser.add_argument(
+        "--status", action="store_true", help="Only print the queue depth and lag as JSON"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main flush function."""
+    args = parse_args()
+    journal = Journal()
+    # Nothing was ever queued unless the database exists
+    if not args.status and journal.path.exists():
+        flusher = JournalFlusher(PowerDNSClient(cache=ZoneCache()), journal)
+        if args.zones:
+            applied = sum(flusher.flush_zone(zone) for zone in args.zones)
+        else:
+            applied = flusher.flush(force=args.force)
+        print(f"Applied {applied} queued changes", file=sys.stderr)
+
+    stats = journal.stats()
+    print(json.dumps(stats, indent=2))
+    # Changes still queued after a flush mean PowerDNS did not take them
+    return 1 if stats["depth"] and not args.status else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,18 +16,23 @@ for path in possible_paths:
 
 try:
     from ultahost_dns.config import Config
-    from ultahost_dns.powerdns_client import PowerDNSClient
 except ImportError:
     sys.exit(1)
 
 if not Config.is_enabled():
     sys.exit(1)
 
+# requests is loaded only once the plugin is known to be enabled
+from ultahost_dns.powerdns_client import PowerDNSClient  # noqa: E402
+
 client = PowerDNSClient()
-zones = client.list_zones()
 
-for zone in zones:
-    zone_name = zone.get("name", "").rstrip(".")
-    if zone_name:
-        print(zone_name)
+# Zone names are printed as the listing arrives instead of after the whole list is parsed
+try:
+    for zone in client.iter_zones(dnssec=False):
+        zone_name = zone.get("name", "").rstrip(".")
+        if zone_name:
+            print(zone_name)
+except Exception:
+    sys.exit(1)
 
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Create PowerDNS zones in bulk from a domain/user/template list."""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add src to path
+possible_paths = [
+    Path(__file__).parent.parent / "src",
+    Path("/usr/local/cpanel/bin/ultahost_dns"),
+]
+
+for path in possible_paths:
+    if path.exists():
+        sys.path.insert(0, str(path))
+        break
+
+from ultahost_dns.config import Config
+from ultahost_dns.logger import PluginLogger
+from ultahost_dns.provision import BulkProvisioner, Checkpoint, parse_items
+
+DEFAULT_CHECKPOINT = Path("/var/cache/ultahost_dns/provision.checkpoint")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Create PowerDNS zones in bulk. Each input line is: domain [user [template]]"
+    )
+    parser.add_argument(
+        "input", nargs="?", default="-", help="List file (default: read from stdin)"
+    )
+    parser.add_argument(
+        "-u", "--user", default="root", help="Owner for lines without a user (default: root)"
+    )
+    parser.add_argument(
+        "-t", "--template", default="default", help="DNS template for lines without one"
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Zones created in parallel (default: provision_concurrency setting, or 16)",
+    )
+    parser.add_argument(
+        "-r",
+        "--rate",
+        type=float,
+        default=None,
+        help="Maximum zone creations per second, 0 for no limit "
+        "(default: provision_rate setting, or 50)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Checkpoint file for resuming "
+        f"(default: <input>.checkpoint, or {DEFAULT_CHECKPOINT} for stdin)",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore the checkpoint and start over"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main provisioning function."""
+    args = parse_args()
+    logger = PluginLogger.get_logger()
+
+    if not Config.is_enabled():
+        logger.error("Plugin is not enabled")
+        print("ERROR: Plugin is not enabled. Please enable it in WHM plugin settings.")
+        sys.exit(1)
+
+    if args.checkpoint:
+        checkpoint_path = Path(args.checkpoint)
+    elif args.input == "-":
+        checkpoint_path = DEFAULT_CHECKPOINT
+    else:
+        checkpoint_path = Path(args.input + ".checkpoint")
+    checkpoint = Checkpoint(checkpoint_path)
+    if args.restart:
+        checkpoint.reset()
+
+    try:
+        if args.input == "-":
+            items = list(parse_items(sys.stdin, args.user, args.template))
+        else:
+            with open(args.input, "r", encoding="utf-8") as f:
+                items = list(parse_items(f, args.user, args.template))
+    except OSError as e:
+        print(f"ERROR: Cannot read {args.input}: {e}")
+        sys.exit(1)
+
+    logger.info(f"Starting bulk provisioning of {len(items)} zones (checkpoint: {checkpoint_path})")
+
+    provisioner = BulkProvisioner(
+        checkpoint=checkpoint, concurrency=args.concurrency, rate=args.rate
+    )
+    try:
+        stats = provisioner.run(items)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; run again to resume from {checkpoint_path}")
+        sys.exit(130)
+
+    print(
+        f"\nProvisioning complete: {stats['zones']} zones, {stats['created']} created, "
+        f"{stats['exists']} already existed, {stats['resumed']} done in earlier runs, "
+        f"{stats['denied']} denied, {stats['failed']} failed"
+    )
+    logger.info(f"Bulk provisioning complete: {stats}")
+
+    if stats["failed"] or stats["denied"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
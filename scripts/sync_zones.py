@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
-"""Sync zones from PowerDNS to cPanel local DNS."""
+"""Sync zones from PowerDNS to cPanel local DNS, or import local zones into PowerDNS."""
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -16,103 +17,74 @@ for path in possible_paths:
         break
 
 from ultahost_dns.config import Config
+from ultahost_dns.cpanel_dns import CpanelDNSError
 from ultahost_dns.logger import PluginLogger
-from ultahost_dns.powerdns_client import PowerDNSClient
-
-
-def sync_zone_to_cpanel(zone_name: str, records: list) -> bool:
-    """Sync a zone and its records to cPanel's local DNS."""
-    import subprocess
-
-    logger = PluginLogger.get_logger()
-
-    # Remove trailing dot for cPanel
-    zone_clean = zone_name.rstrip(".")
-
+from ultahost_dns.sync import SyncError, ZoneSyncer
+from ultahost_dns.zone_import import ZoneImporter
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Sync zones from PowerDNS to cPanel local DNS")
+    parser.add_argument("zones", nargs="*", help="Zones to sync (default: all PowerDNS zones)")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of zones synced in parallel (default: sync_workers setting, or 8)",
+    )
+    parser.add_argument(
+        "-n", "--dry-run", action="store_true", help="Print the changes without applying them"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Fetch and diff every zone, even if its serial did not change since the last sync",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Remove local zones missing from PowerDNS even if most or all zones seem to be gone",
+    )
+    parser.add_argument(
+        "--import",
+        dest="import_zones",
+        action="store_true",
+        help="Import local zone files (/var/named/*.db) into PowerDNS instead",
+    )
+    parser.add_argument(
+        "--zone-dir", default=None, help="Zone file directory for --import (default: /var/named)"
+    )
+    return parser.parse_args()
+
+
+def import_zones(args, logger):
+    """Import local zone files into PowerDNS."""
+    logger.info("Starting zone import from cPanel to PowerDNS")
+
+    importer = ZoneImporter(zone_dir=args.zone_dir, workers=args.workers, dry_run=args.dry_run)
     try:
-        # Use cPanel API to create zone if it doesn't exist
-        # First check if zone exists
-        result = subprocess.run(
-            ["/usr/local/cpanel/bin/whmapi1", "listzones", "domain=" + zone_clean],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-
-        zone_exists = zone_clean in result.stdout
-
-        if not zone_exists:
-            # Create zone using cPanel API
-            logger.info(f"Creating zone {zone_clean} in cPanel local DNS")
-            result = subprocess.run(
-                [
-                    "/usr/local/cpanel/bin/whmapi1",
-                    "createzone",
-                    "domain=" + zone_clean,
-                    "username=root",
-                ],
-                capture_output=True,
-                text=True,
-                timeout=10,
-            )
-
-            if result.returncode != 0:
-                logger.error(f"Failed to create zone {zone_clean} in cPanel: {result.stderr}")
-                return False
-
-        # Add records to cPanel
-        for record in records:
-            name = record["name"].rstrip(".")
-            record_type = record["type"]
-            content = record["content"]
-            ttl = record.get("ttl", 3600)
-
-            # Skip NS and SOA records as they're managed by cPanel
-            if record_type in ["NS", "SOA"]:
-                continue
-
-            # Handle MX records with priority
-            if record_type == "MX" and " " in content:
-                parts = content.split(" ", 1)
-                priority = parts[0]
-                content = parts[1]
-            else:
-                priority = "0"
-
-            # Add record using cPanel API
-            try:
-                cmd = [
-                    "/usr/local/cpanel/bin/whmapi1",
-                    "addzonerecord",
-                    "domain=" + zone_clean,
-                    "name=" + name,
-                    "type=" + record_type,
-                    "address=" + content,
-                    "ttl=" + str(ttl),
-                ]
-
-                if record_type == "MX":
-                    cmd.append("priority=" + priority)
-
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-
-                if result.returncode != 0:
-                    logger.warning(f"Failed to add record {name} {record_type}: {result.stderr}")
-                else:
-                    logger.debug(f"Added record {name} {record_type} to cPanel")
-
-            except Exception as e:
-                logger.warning(f"Error adding record {name} {record_type}: {e}")
-
-        return True
-
+        stats = importer.run(args.zones or None)
     except Exception as e:
-        logger.error(f"Error syncing zone {zone_clean}: {e}")
-        return False
+        logger.error(f"Zone import aborted: {e}")
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    mode = " (dry run, nothing applied)" if args.dry_run else ""
+    print(
+        f"\nImport complete{mode}: {stats['zones']} zones, {stats['created']} created, "
+        f"{stats['updated']} updated, {stats['unchanged']} unchanged, {stats['failed']} failed"
+    )
+    logger.info(f"Zone import complete{mode}: {stats}")
+
+    if stats["failed"]:
+        sys.exit(1)
 
 
 def main():
     """Main sync function."""
+    args = parse_args()
     logger = PluginLogger.get_logger()
 
     if not Config.is_enabled():
@@ -120,51 +92,38 @@ def main():
         print("ERROR: Plugin is not enabled. Please enable it in WHM plugin settings.")
         sys.exit(1)
 
+    if args.import_zones:
+        import_zones(args, logger)
+        return
+
     logger.info("Starting zone sync from PowerDNS to cPanel")
 
-    client = PowerDNSClient()
-    zones = client.list_zones()
+    syncer = ZoneSyncer(
+        workers=args.workers, dry_run=args.dry_run, full=args.full, force=args.force
+    )
+    try:
+        stats = syncer.run(args.zones or None)
+    except (CpanelDNSError, SyncError) as e:
+        logger.error(f"Zone sync aborted: {e}")
+        print(f"ERROR: {e}")
+        sys.exit(1)
 
-    if not zones:
+    if not stats["zones"] and not stats["deleted"]:
         logger.warning("No zones found in PowerDNS")
         print("No zones found in PowerDNS")
         sys.exit(0)
 
-    print(f"Found {len(zones)} zones in PowerDNS")
-    logger.info(f"Found {len(zones)} zones in PowerDNS")
-
-    synced = 0
-    failed = 0
-
-    for zone in zones:
-        zone_name = zone.get("name", "")
-        if not zone_name:
-            continue
-
-        print(f"Syncing zone: {zone_name}")
+    mode = " (dry run, nothing applied)" if args.dry_run else ""
+    print(
+        f"\nSync complete{mode}: {stats['zones']} zones, {stats['changed']} changed, "
+        f"{stats['unchanged']} unchanged, {stats['skipped']} skipped (serial unchanged), "
+        f"{stats['deleted']} deleted, {stats['failed']} failed"
+    )
+    logger.info(f"Zone sync complete{mode}: {stats}")
 
-        # Get zone details and records
-        zone_details = client.get_zone(zone_name)
-        if not zone_details:
-            logger.warning(f"Could not get details for zone {zone_name}")
-            failed += 1
-            continue
-
-        # Get records
-        records = client.get_records(zone_name)
-
-        # Sync to cPanel
-        if sync_zone_to_cpanel(zone_name, records):
-            synced += 1
-            print(f"  ✓ Synced {zone_name}")
-        else:
-            failed += 1
-            print(f"  ✗ Failed to sync {zone_name}")
-
-    print(f"\nSync complete: {synced} synced, {failed} failed")
-    logger.info(f"Zone sync complete: {synced} synced, {failed} failed")
+    if stats["failed"]:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
     main()
-
@@ -3,22 +3,23 @@
 
 echo "=== Testing if hook is called when accessing API2 ==="
 
-# Clear hook debug log
-> /var/log/ultahost_dns/hook_debug.log
+# The hook logs its calls at DEBUG; set "log_level": "DEBUG" in
+# /var/cpanel/ultahost_dns_config.json while testing
+LOG_FILE=/var/log/ultahost_dns/ultahost_dns.log
+LINES_BEFORE=$(wc -l < "$LOG_FILE" 2>/dev/null || echo 0)
 
 echo "Calling whmapi1 listzones..."
 /usr/local/cpanel/bin/whmapi1 listzones 2>&1 | head -20
 
 echo ""
 echo "=== Checking if hook was called ==="
-if [ -f "/var/log/ultahost_dns/hook_debug.log" ]; then
-    echo "Hook debug log contents:"
-    cat /var/log/ultahost_dns/hook_debug.log
+if tail -n +"$((LINES_BEFORE + 1))" "$LOG_FILE" 2>/dev/null | grep -qi "listzones hook called"; then
+    echo "Hook was called"
 else
-    echo "Hook debug log not found - hook was NOT called"
+    echo "No hook call logged - hook was NOT called (or log_level is above DEBUG)"
 fi
 
 echo ""
 echo "=== Checking main log ==="
-tail -10 /var/log/ultahost_dns/ultahost_dns.log | grep -i "listzones\|hook called"
+tail -10 "$LOG_FILE" | grep -i "listzones\|hook called"
 
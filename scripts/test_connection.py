@@ -13,28 +13,41 @@ from ultahost_dns.powerdns_client import PowerDNSClient
 
 
 def main():
-    """Test connection to PowerDNS API."""
+    """Test connection to every configured PowerDNS API endpoint."""
     logger = PluginLogger.get_logger()
 
     if not Config.is_enabled():
         print("ERROR: Plugin is not enabled or configuration is incomplete")
         sys.exit(1)
 
-    api_url = Config.get_api_url()
-    api_key = Config.get_api_key()
-
-    if not api_url or not api_key:
+    endpoints = Config.get_endpoints()
+    if not endpoints or not Config.get_api_key():
         print("ERROR: API URL or API Key is not configured")
         sys.exit(1)
 
-    print(f"Testing connection to PowerDNS API: {api_url}")
+    print(f"Testing connection to {len(endpoints)} PowerDNS API endpoint(s)")
     logger.info("Testing PowerDNS API connection")
 
     client = PowerDNSClient()
-    if client.test_connection():
+    results = client.check_endpoints()
+    for result in results:
+        role = "primary" if result["primary"] else "secondary"
+        endpoint = f"{result['url']} ({role}, weight {result['weight']:g})"
+        if result["healthy"]:
+            print(f"  OK    {endpoint}: {result['latency'] * 1000:.1f} ms")
+        else:
+            print(f"  DOWN  {endpoint}: {result['error']}")
+
+    healthy = sum(1 for result in results if result["healthy"])
+    if healthy == len(results):
         print("SUCCESS: Connection to PowerDNS API successful")
         logger.info("PowerDNS API connection test successful")
         sys.exit(0)
+    elif healthy:
+        down = len(results) - healthy
+        print(f"ERROR: {down} of {len(results)} PowerDNS API endpoints are unreachable")
+        logger.error("PowerDNS API connection test failed for some endpoints")
+        sys.exit(1)
     else:
         print("ERROR: Failed to connect to PowerDNS API. Please check your settings.")
         logger.error("PowerDNS API connection test failed")
@@ -43,5 +56,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
-
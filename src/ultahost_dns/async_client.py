@@ -0,0 +1,499 @@
+"""Asyncio PowerDNS v4 API client for bulk operations."""
+
+import asyncio
+import json
+import ssl
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+import requests
+
+from ultahost_dns.circuit_breaker import CircuitBreaker
+from ultahost_dns.config import Config
+from ultahost_dns.http_common import IDEMPOTENT_METHODS, ConnectFailed
+from ultahost_dns.logger import LazyJSON
+from ultahost_dns.powerdns_client import (
+    EndpointState,
+    PowerDNSClientBase,
+    RRsetBatch,
+    _api_path,
+    _zone_fqdn,
+)
+from ultahost_dns.records import Record
+from ultahost_dns.zone_cache import ZoneCache
+
+
+class _Disconnected(Exception):
+    """A pooled connection was closed by the server before it answered."""
+
+
+class AsyncResponse:
+    """The parts of ``requests.Response`` the client and its callers use."""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes):
+        """Initialize a response."""
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        """Return the body decoded as UTF-8."""
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        """Return the body parsed as JSON."""
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        """Raise ``requests.exceptions.HTTPError`` for 4xx and 5xx responses."""
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} Error for url: {self.url}", response=self
+            )
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one PowerDNS API endpoint."""
+
+    def __init__(self, url: str, api_key: str, ssl_context: ssl.SSLContext, size: int):
+        """Initialize an empty pool; connections are opened on demand."""
+        parts = urlsplit(url)
+        self.tls = parts.scheme == "https"
+        self.host = parts.hostname or ""
+        self.port = parts.port or (443 if self.tls else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.host_header = parts.netloc.rpartition("@")[2]
+        self.api_key = api_key
+        self.ssl_context = ssl_context if self.tls else None
+        self.size = size
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def acquire(
+        self, connect_timeout: float
+    ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        """Return an idle connection, or a new one; the flag tells whether it was reused."""
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    self.host,
+                    self.port,
+                    ssl=self.ssl_context,
+                    server_hostname=self.host if self.tls else None,
+                ),
+                connect_timeout,
+            )
+        except asyncio.TimeoutError as e:
+            raise requests.exceptions.ConnectTimeout(
+                f"Connection to {self.host}:{self.port} timed out"
+            ) from e
+        except OSError as e:
+            raise ConnectFailed(f"Connection to {self.host}:{self.port} failed: {e}") from e
+        return reader, writer, False
+
+    def release(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Return a connection to the pool, closing it when the pool is full."""
+        if len(self._idle) < self.size:
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+
+    async def close(self) -> None:
+        """Close all idle connections."""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+
+    def build_request(self, method: str, path: str, body: bytes) -> bytes:
+        """Serialize an HTTP/1.1 request."""
+        lines = [
+            f"{method} {self.prefix}{path} HTTP/1.1",
+            f"Host: {self.host_header}",
+            f"X-API-Key: {self.api_key}",
+            "Accept: application/json",
+            "Connection: keep-alive",
+            f"Content-Length: {len(body)}",
+        ]
+        if body:
+            lines.append("Content-Type: application/json")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    @staticmethod
+    async def read_response(
+        reader: asyncio.StreamReader, method: str
+    ) -> Tuple[int, Dict[str, str], bytes, bool]:
+        """Read one response; return status, headers, body and whether to keep the connection."""
+        status_line = await reader.readline()
+        if not status_line:
+            raise _Disconnected()
+        version, _, rest = status_line.decode("latin-1").strip().partition(" ")
+        status = int(rest.split(" ", 1)[0])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304) or status < 200:
+            body = b""
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    # Skip trailers up to the blank line
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return status, headers, body, keep_alive
+
+
+class AsyncRRsetBatch(RRsetBatch):
+    """``RRsetBatch`` whose ``send`` and ``commit`` are coroutines."""
+
+    async def send(self) -> None:
+        """Send the batch as one PATCH request, raising on API errors."""
+        if not self._rrsets:
+            return
+        try:
+            await self.client._request(
+                "PATCH", f"/zones/{self.zone_name}", data={"rrsets": self.rrsets()}
+            )
+        finally:
+            self.client.invalidate_cached_zone(self.zone_name)
+
+    async def commit(self) -> bool:
+        """Send the batch and report whether it was applied."""
+        try:
+            await self.send()
+        except requests.exceptions.RequestException as e:
+            self.client.logger.error(
+                f"Failed to apply {len(self)} RRset changes to zone {self.zone_name}: {e}"
+            )
+            return False
+        self.client.logger.info(f"Applied {len(self)} RRset changes to zone {self.zone_name}")
+        return True
+
+
+class AsyncPowerDNSClient(PowerDNSClientBase):
+    """Asyncio client for PowerDNS v4 API.
+
+    Mirrors ``PowerDNSClient`` (same arguments, methods, return values and
+    ``requests`` exceptions) with coroutine methods. Each endpoint gets a pool
+    of keep-alive HTTP/1.1 connections, and at most ``concurrency`` requests
+    (the ``async_concurrency`` setting) are in flight at once::
+
+        async with AsyncPowerDNSClient() as client:
+            zones = await client.get_zones(names)
+    """
+
+    CONCURRENCY = 64
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        cache: Optional[ZoneCache] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        concurrency: Optional[int] = None,
+    ):
+        """Initialize the client; connections are opened on first use."""
+        super().__init__(api_url, api_key, cache, breaker)
+        self.concurrency = max(
+            1, int(concurrency or Config.get("async_concurrency", self.CONCURRENCY))
+        )
+        self.ssl_context = ssl.create_default_context()
+        for endpoint in self.endpoints:
+            endpoint.session = ConnectionPool(
+                endpoint.url, endpoint.api_key, self.ssl_context, self.concurrency
+            )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncPowerDNSClient":
+        """Enter the client context."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the connections when leaving the client context."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        for endpoint in self.endpoints:
+            await endpoint.session.close()
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """Make API request."""
+        path = _api_path(endpoint)
+        if params:
+            path = f"{path}?{urlencode(params)}"
+
+        self.logger.debug("PowerDNS API %s request: %s", method, path)
+        if data:
+            self.logger.debug("Request data: %s", LazyJSON(data))
+
+        try:
+            response = await self._send(method, path, data)
+            response.raise_for_status()
+
+            if response.content:
+                return response.json()
+            return {}
+
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"PowerDNS API error: {e}")
+            if e.response is not None:
+                try:
+                    error_detail = e.response.json()
+                    self.logger.error("Error details: %s", LazyJSON(error_detail))
+                except ValueError:
+                    self.logger.error(f"Error response: {e.response.text}")
+            raise
+
+    async def _fetch(
+        self, endpoint: EndpointState, method: str, path: str, body: bytes
+    ) -> AsyncResponse:
+        """Perform one HTTP exchange on a pooled connection."""
+        pool = endpoint.session
+        request = pool.build_request(method, path, body)
+        url = f"{endpoint.url}{path}"
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        async with self._semaphore:
+            while True:
+                reader, writer, reused = await pool.acquire(self.timeout[0])
+                sent = False
+                try:
+                    writer.write(request)
+                    await asyncio.wait_for(writer.drain(), self.timeout[1])
+                    sent = True
+                    status, headers, content, keep_alive = await asyncio.wait_for(
+                        ConnectionPool.read_response(reader, method), self.timeout[1]
+                    )
+                except (_Disconnected, ConnectionResetError, BrokenPipeError) as e:
+                    writer.close()
+                    # A reused connection the server had closed: resend only if it cannot
+                    # have acted on the request, and leave other retries to RequestAttempts
+                    if reused and (idempotent or not sent):
+                        continue
+                    raise requests.exceptions.ConnectionError(
+                        f"Connection closed without response: {url}"
+                    ) from e
+                except asyncio.TimeoutError as e:
+                    writer.close()
+                    raise requests.exceptions.ReadTimeout(f"Read timed out: {url}") from e
+                except (OSError, ssl.SSLError, asyncio.IncompleteReadError, ValueError) as e:
+                    writer.close()
+                    raise requests.exceptions.ConnectionError(
+                        f"Connection error for {url}: {e}"
+                    ) from e
+
+                if keep_alive:
+                    pool.release(reader, writer)
+                else:
+                    writer.close()
+                return AsyncResponse(url, status, headers, content)
+
+    async def _send(self, method: str, path: str, data: Optional[Dict[str, Any]]) -> AsyncResponse:
+        """Send a request, with the failover and retries ``RequestAttempts`` decides on."""
+        body = json.dumps(data).encode("utf-8") if data is not None else b""
+        attempts = self._attempts(method, path)
+        while True:
+            endpoint = attempts.next_endpoint()
+            started = time.monotonic()
+            try:
+                response = await self._fetch(endpoint, method, path, body)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not attempts.failed(e, time.monotonic() - started):
+                    raise
+            else:
+                if not attempts.answered(response, time.monotonic() - started):
+                    return response
+            await asyncio.sleep(attempts.delay())
+
+    async def create_zone(
+        self,
+        zone_name: str,
+        kind: str = "Native",
+        nameservers: Optional[List[str]] = None,
+        records: Optional[List[Record]] = None,
+    ) -> bool:
+        """Create a new DNS zone, with ``records`` sent in the same POST."""
+        zone_data = self.zone_document(zone_name, kind, nameservers, records)
+        zone_name = zone_data["name"]
+
+        self.invalidate_cached_zone(zone_name)
+        try:
+            await self._request("POST", "/zones", data=zone_data)
+            self.logger.info(
+                f"Zone created: {zone_name} ({len(zone_data.get('rrsets', []))} RRsets)"
+            )
+            return True
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Failed to create zone {zone_name}: {e}")
+            return False
+
+    async def delete_zone(self, zone_name: str) -> bool:
+        """Delete a DNS zone."""
+        zone_name = _zone_fqdn(zone_name)
+        try:
+            await self._request("DELETE", f"/zones/{zone_name}")
+            self.logger.info(f"Zone deleted: {zone_name}")
+            return True
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Failed to delete zone {zone_name}: {e}")
+            return False
+        finally:
+            self.invalidate_cached_zone(zone_name)
+
+    async def get_zone(self, zone_name: str) -> Optional[Dict[str, Any]]:
+        """Get zone information."""
+        zone_name = _zone_fqdn(zone_name)
+        try:
+            return await self._request("GET", f"/zones/{zone_name}")
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Failed to get zone {zone_name}: {e}")
+            return None
+
+    async def get_zones(self, zone_names: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Fetch several zones concurrently; failed fetches map to None."""
+        zone_names = list(zone_names)
+        zones = await asyncio.gather(*(self.get_zone(zone_name) for zone_name in zone_names))
+        return dict(zip(zone_names, zones))
+
+    async def get_zone_cached(self, zone_name: str) -> Optional[Dict[str, Any]]:
+        """Get zone information, from the zone cache when it is still valid."""
+        if self.cache is None:
+            return await self.get_zone(zone_name)
+
+        cached = self.cache.get(zone_name)
+        if cached is not None:
+            zone, serial, fresh = cached
+            if fresh:
+                return zone
+            current = await self.get_zone_serial(zone_name)
+            if current is not None and current == serial:
+                self.cache.revalidated(zone_name)
+                return zone
+
+        zone = await self.get_zone(zone_name)
+        if zone:
+            self.cache.put(zone_name, zone)
+        return zone
+
+    async def get_zone_serial(self, zone_name: str) -> Optional[int]:
+        """Get the current serial of a zone without fetching its records."""
+        try:
+            zones = await self._request("GET", "/zones", params={"zone": _zone_fqdn(zone_name)})
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Failed to get serial of zone {zone_name}: {e}")
+            return None
+        if isinstance(zones, list) and zones:
+            return zones[0].get("serial")
+        return None
+
+    async def list_zones(self) -> List[Dict[str, Any]]:
+        """List all zones."""
+        try:
+            return self.zones_from_response(await self._request("GET", "/zones"))
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Failed to list zones: {e}")
+            return []
+
+    async def add_record(
+        self,
+        zone_name: str,
+        name: str,
+        record_type: str,
+        content: str,
+        ttl: int = 3600,
+        priority: Optional[int] = None,
+    ) -> bool:
+        """Add a DNS record to a zone."""
+        batch = self.batch(zone_name).add(name, record_type, content, ttl, priority)
+        name = batch.rrsets()[0]["name"]
+
+        try:
+            await batch.send()
+            self.logger.info(f"Record added: {name} {record_type} {content} in {batch.zone_name}")
+            return True
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Failed to add record {name} {record_type}: {e}")
+            return False
+
+    async def delete_record(self, zone_name: str, name: str, record_type: str) -> bool:
+        """Delete a DNS record from a zone."""
+        batch = self.batch(zone_name).delete(name, record_type)
+        name = batch.rrsets()[0]["name"]
+
+        try:
+            await batch.send()
+            self.logger.info(f"Record deleted: {name} {record_type} from {batch.zone_name}")
+            return True
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Failed to delete record {name} {record_type}: {e}")
+            return False
+
+    async def update_record(
+        self,
+        zone_name: str,
+        name: str,
+        record_type: str,
+        content: str,
+        ttl: int = 3600,
+        priority: Optional[int] = None,
+    ) -> bool:
+        """Update a DNS record in a zone."""
+        return await self.add_record(zone_name, name, record_type, content, ttl, priority)
+
+    def batch(self, zone_name: str) -> AsyncRRsetBatch:
+        """Start a batch of RRset changes for a zone, sent with ``await commit()``."""
+        return AsyncRRsetBatch(self, zone_name)
+
+    async def get_records(self, zone_name: str) -> List[Record]:
+        """Get all records for a zone."""
+        zone = await self.get_zone(zone_name)
+        if not zone:
+            return []
+        return self.records_from_zone(zone)
+
+    async def test_connection(self) -> bool:
+        """Test connection to PowerDNS API."""
+        try:
+            await self._request("GET", "/api/v1/servers")
+            return True
+        except requests.exceptions.RequestException:
+            return False
@@ -0,0 +1,153 @@
+"""Circuit breaker for the PowerDNS API, shared by all plugin processes."""
+
+import fcntl
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from ultahost_dns.config import Config
+from ultahost_dns.logger import PluginLogger
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """PowerDNS is considered down; the request was not attempted."""
+
+
+class CircuitBreaker:
+    """Track consecutive PowerDNS failures per API endpoint in a state file.
+
+    After ``threshold`` consecutive failures the circuit opens and requests fail
+    immediately for ``cooldown`` seconds. Then a single process is let through
+    as a probe: its success closes the circuit, its failure opens it again.
+    The state file is only written on failures and state changes; checking a
+    closed circuit costs a ``stat()`` call.
+    """
+
+    STATE_FILE = Path("/var/cache/ultahost_dns/circuit_breaker.json")
+    THRESHOLD = 5
+    COOLDOWN = 30
+    PROBE_TIMEOUT = 35
+
+    def __init__(self, key, path=None, threshold=None, cooldown=None, probe_timeout=None):
+        """Initialize a breaker for one endpoint; settings default to the breaker_* config keys."""
+        self.key = key
+        self.path = Path(path or self.STATE_FILE)
+        self.threshold = threshold or Config.get("breaker_threshold", self.THRESHOLD)
+        self.cooldown = (
+            cooldown if cooldown is not None else Config.get("breaker_cooldown", self.COOLDOWN)
+        )
+        self.probe_timeout = probe_timeout or self.PROBE_TIMEOUT
+        self.logger = PluginLogger.get_logger()
+        self._lock = threading.Lock()
+        self._state = {}
+        self._state_key = None
+
+    def _file_key(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _read(self):
+        """Return the state of all endpoints, re-reading the file only when it changed."""
+        key = self._file_key()
+        if key != self._state_key:
+            state = {}
+            if key is not None:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        state = json.load(f)
+                except (OSError, ValueError):
+                    state = {}
+            self._state = state if isinstance(state, dict) else {}
+            self._state_key = key
+        return self._state
+
+    def _update(self, change):
+        """Apply ``change`` to this endpoint's entry under an exclusive file lock."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path.with_name(self.path.name + ".lock"), "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                self._state_key = None
+                state = dict(self._read())
+                entry = change(dict(state.get(self.key) or {}))
+                if entry:
+                    state[self.key] = entry
+                else:
+                    state.pop(self.key, None)
+                tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(state, f)
+                os.chmod(tmp_path, 0o600)
+                os.replace(tmp_path, self.path)
+                self._state_key = None
+                return entry
+        except OSError as e:
+            self.logger.warning(f"Could not update circuit breaker state: {e}")
+            return None
+
+    def is_open(self):
+        """Whether the circuit is open and still cooling down."""
+        with self._lock:
+            entry = self._read().get(self.key)
+            return bool(entry) and time.time() < entry.get("open_until", 0)
+
+    def allow(self):
+        """Whether a request may be sent now; raises nothing."""
+        with self._lock:
+            entry = self._read().get(self.key)
+            if not entry or time.time() >= entry.get("open_until", 0):
+                if entry and entry.get("open_until"):
+                    return self._claim_probe()
+                return True
+            return False
+
+    def _claim_probe(self):
+        """Let this process probe an endpoint whose cooldown expired."""
+        now = time.time()
+        claimed = []
+
+        def change(entry):
+            if now >= entry.get("open_until", 0):
+                entry["open_until"] = now + self.probe_timeout
+                claimed.append(True)
+            return entry
+
+        self._update(change)
+        return bool(claimed)
+
+    def check(self):
+        """Raise ``CircuitOpenError`` if the circuit is open."""
+        if not self.allow():
+            raise CircuitOpenError(f"PowerDNS API at {self.key} is unavailable (circuit open)")
+
+    def record_success(self):
+        """Close the circuit after a successful request."""
+        with self._lock:
+            if self._read().get(self.key):
+                self._update(lambda entry: None)
+                self.logger.info(f"PowerDNS API at {self.key} recovered, circuit closed")
+
+    def record_failure(self):
+        """Count a failed request, opening the circuit at the threshold."""
+        now = time.time()
+
+        def change(entry):
+            entry["failures"] = entry.get("failures", 0) + 1
+            if entry["failures"] >= self.threshold:
+                entry["open_until"] = now + self.cooldown
+            return entry
+
+        with self._lock:
+            entry = self._update(change)
+        if entry and entry.get("failures") == self.threshold:
+            self.logger.error(
+                f"PowerDNS API at {self.key} failed {self.threshold} times, "
+                f"circuit open for {self.cooldown}s"
+            )
@@ -2,11 +2,102 @@
 
 import json
 import os
+import sys
+import threading
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple, Tuple
+
+
+class Endpoint(NamedTuple):
+    """One PowerDNS API node."""
+
+    url: str
+    api_key: str
+    weight: float = 1.0
+    primary: bool = False
+
+
+def _parse_endpoints(config, api_url, api_key):
+    """Return the configured endpoints, falling back to the single ``api_url``.
+
+    ``endpoints`` is a list of URLs or of objects with ``url`` and optional
+    ``weight``, ``api_key`` and ``role`` (``primary`` or ``secondary``). The first
+    endpoint is the primary unless another one has the primary role.
+    """
+    endpoints = []
+    for item in config.get("endpoints") or ():
+        if isinstance(item, str):
+            item = {"url": item}
+        if not isinstance(item, dict):
+            continue
+        url = str(item.get("url") or "").strip().rstrip("/")
+        if not url:
+            continue
+        try:
+            weight = max(float(item.get("weight", 1)), 0.0)
+        except (TypeError, ValueError):
+            weight = 1.0
+        endpoints.append(
+            Endpoint(
+                url=url,
+                api_key=str(item.get("api_key") or api_key).strip(),
+                weight=weight,
+                primary=item.get("role") == "primary",
+            )
+        )
+
+    if not endpoints and api_url:
+        endpoints.append(Endpoint(url=api_url.rstrip("/"), api_key=api_key))
+    if endpoints and not any(endpoint.primary for endpoint in endpoints):
+        endpoints[0] = endpoints[0]._replace(primary=True)
+    endpoints.sort(key=lambda endpoint: not endpoint.primary)
+    return tuple(endpoints)
+
+
+class ConfigSnapshot(NamedTuple):
+    """Immutable view of the configuration file at one point in time."""
+
+    api_url: str
+    api_key: str
+    enabled: bool
+    values: Mapping[str, Any]
+    endpoints: Tuple[Endpoint, ...] = ()
+
+    @classmethod
+    def from_dict(cls, config):
+        """Build a snapshot from a parsed configuration dict."""
+        enabled = config.get("enabled", False)
+        # Handle boolean values (could be True, "true", 1, etc.)
+        if isinstance(enabled, str):
+            enabled = enabled.lower() in ("true", "1", "yes", "on")
+        api_url = str(config.get("api_url") or "").strip()
+        api_key = str(config.get("api_key") or "").strip()
+        endpoints = _parse_endpoints(config, api_url, api_key)
+        primary = next((endpoint for endpoint in endpoints if endpoint.primary), None)
+        return cls(
+            api_url=api_url or (primary.url if primary else ""),
+            api_key=api_key or (primary.api_key if primary else ""),
+            enabled=bool(enabled),
+            values=MappingProxyType(dict(config)),
+            endpoints=endpoints,
+        )
+
+    def get(self, key, default=None):
+        """Get a configuration value."""
+        return self.values.get(key, default)
+
+    def as_dict(self):
+        """Return a mutable copy of the configuration values."""
+        return dict(self.values)
 
 
 class Config:
-    """Manage plugin configuration."""
+    """Manage plugin configuration.
+
+    The file is parsed once per process into a ``ConfigSnapshot``; later reads
+    only ``stat()`` it and parse it again when its inode, mtime or size changed.
+    """
 
     CONFIG_FILE = Path("/var/cpanel/ultahost_dns_config.json")
     DEFAULT_CONFIG = {
@@ -15,74 +106,120 @@ class Config:
         "enabled": False,
     }
 
+    _lock = threading.Lock()
+    _snapshot = None
+    _snapshot_key = None
+
     @classmethod
-    def load(cls):
-        """Load configuration from file."""
-        if not cls.CONFIG_FILE.exists():
-            cls.save(cls.DEFAULT_CONFIG)
-            return cls.DEFAULT_CONFIG.copy()
+    def _file_key(cls):
+        """Return what identifies the current version of the config file."""
+        try:
+            stat = os.stat(cls.CONFIG_FILE)
+        except OSError:
+            return (str(cls.CONFIG_FILE), None)
+        return (str(cls.CONFIG_FILE), stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
 
+    @classmethod
+    def _read(cls):
+        """Parse the config file, falling back to the defaults."""
+        config = cls.DEFAULT_CONFIG.copy()
         try:
             with open(cls.CONFIG_FILE, "r", encoding="utf-8") as f:
-                config = json.load(f)
-                # Ensure all keys exist
-                for key, value in cls.DEFAULT_CONFIG.items():
-                    if key not in config:
-                        config[key] = value
-                return config
+                loaded = json.load(f)
+            if isinstance(loaded, dict):
+                config.update(loaded)
+        except FileNotFoundError:
+            pass
         except (json.JSONDecodeError, OSError) as e:
-            # Return default config on error
-            return cls.DEFAULT_CONFIG.copy()
+            import logging
+
+            logging.getLogger("ultahost_dns").error(f"Error reading {cls.CONFIG_FILE}: {e}")
+        return config
+
+    @classmethod
+    def snapshot(cls):
+        """Return the current configuration snapshot."""
+        key = cls._file_key()
+        snapshot = cls._snapshot
+        if snapshot is not None and key == cls._snapshot_key:
+            return snapshot
+        with cls._lock:
+            if cls._snapshot is None or key != cls._snapshot_key:
+                cls._snapshot = ConfigSnapshot.from_dict(cls._read())
+                cls._snapshot_key = key
+            return cls._snapshot
+
+    @classmethod
+    def reload(cls):
+        """Parse the config file again and return the new snapshot."""
+        with cls._lock:
+            cls._snapshot = None
+            cls._snapshot_key = None
+        return cls.snapshot()
+
+    @classmethod
+    def load(cls):
+        """Load configuration from file."""
+        return cls.snapshot().as_dict()
 
     @classmethod
     def save(cls, config):
         """Save configuration to file."""
         try:
             cls.CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
-            with open(cls.CONFIG_FILE, "w", encoding="utf-8") as f:
+            tmp_path = cls.CONFIG_FILE.with_name(cls.CONFIG_FILE.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
                 json.dump(config, f, indent=2)
-            os.chmod(cls.CONFIG_FILE, 0o600)  # Secure permissions
-            return True
+            os.chmod(tmp_path, 0o600)  # Secure permissions
+            os.replace(tmp_path, cls.CONFIG_FILE)
         except OSError:
             return False
+        cls.reload()
+        return True
+
+    @classmethod
+    def get(cls, key, default=None):
+        """Get an optional configuration value."""
+        return cls.snapshot().get(key, default)
 
     @classmethod
     def get_api_url(cls):
         """Get PowerDNS API URL."""
-        config = cls.load()
-        return config.get("api_url", "")
+        return cls.snapshot().api_url
 
     @classmethod
     def get_api_key(cls):
         """Get PowerDNS API key."""
-        config = cls.load()
-        return config.get("api_key", "")
+        return cls.snapshot().api_key
+
+    @classmethod
+    def get_endpoints(cls):
+        """Get the PowerDNS API endpoints, primary first."""
+        return cls.snapshot().endpoints
 
     @classmethod
     def is_enabled(cls):
         """Check if plugin is enabled."""
         try:
-            config = cls.load()
-            enabled = config.get("enabled", False)
-            api_url = config.get("api_url", "").strip()
-            api_key = config.get("api_key", "").strip()
-            
-            # Handle boolean values (could be True, "true", 1, etc.)
-            if isinstance(enabled, str):
-                enabled = enabled.lower() in ("true", "1", "yes", "on")
-            
-            result = bool(enabled) and bool(api_url) and bool(api_key)
-            
-            # Debug logging
-            if not result:
-                import logging
+            config = cls.snapshot()
+            result = config.enabled and bool(config.api_url) and bool(config.api_key)
+
+            # Hooks check this before loading logging; until then no handler could emit the message
+            logging = sys.modules.get("logging")
+            if not result and logging is not None:
                 logger = logging.getLogger("ultahost_dns")
-                logger.debug(f"Plugin disabled check: enabled={enabled} (type: {type(enabled)}), api_url={bool(api_url)}, api_key={bool(api_key)}")
-            
+                logger.debug(
+                    "Plugin disabled check: enabled=%s, api_url=%s, api_key=%s",
+                    config.enabled,
+                    bool(config.api_url),
+                    bool(config.api_key),
+                )
+
             return result
         except Exception as e:
             # If there's an error loading config, assume disabled
             import logging
+
             logger = logging.getLogger("ultahost_dns")
             logger.error(f"Error checking if plugin is enabled: {e}")
             return False
@@ -98,5 +235,3 @@ class Config:
         if enabled is not None:
             config["enabled"] = bool(enabled)
         return cls.save(config)
-
-
@@ -0,0 +1,210 @@
+"""Access to cPanel's local DNS zones through whmapi1 and the zone files."""
+
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+
+from ultahost_dns.config import Config
+from ultahost_dns.logger import PluginLogger
+from ultahost_dns.records import Record
+from ultahost_dns.zonefile import iter_entries, parse_ttl, quote_txt, txt_data
+
+
+class CpanelDNSError(Exception):
+    """A whmapi1 call failed."""
+
+
+class CpanelDNS:
+    """Read and modify cPanel's local DNS zones."""
+
+    WHMAPI1 = "/usr/local/cpanel/bin/whmapi1"
+    TIMEOUT = 30
+
+    def __init__(self):
+        """Initialize the cPanel DNS accessor."""
+        self.logger = PluginLogger.get_logger()
+
+    def _call(self, function, **params):
+        """Call a whmapi1 function and return its ``data`` section."""
+        cmd = [self.WHMAPI1, "--output=json", function]
+        cmd.extend(f"{key}={value}" for key, value in params.items())
+
+        try:
+            result = subprocess.run(
+                cmd, capture_output=True, text=True, check=True, timeout=self.TIMEOUT
+            )
+            response = json.loads(result.stdout)
+        except (subprocess.SubprocessError, OSError, ValueError) as e:
+            raise CpanelDNSError(f"whmapi1 {function} failed: {e}") from e
+
+        metadata = response.get("metadata", {})
+        if not metadata.get("result"):
+            raise CpanelDNSError(
+                f"whmapi1 {function} failed: {metadata.get('reason', 'unknown error')}"
+            )
+        return response.get("data") or {}
+
+    def list_zones(self):
+        """Return the names of all local zones (without trailing dot)."""
+        data = self._call("listzones")
+        return {zone["domain"] for zone in data.get("zone", []) if zone.get("domain")}
+
+    def get_records(self, zone_name):
+        """Return the records of a local zone."""
+        data = self._call("dumpzone", domain=zone_name.rstrip("."))
+        zones = data.get("zone", [])
+        if not zones:
+            return []
+
+        records = []
+        for record in zones[0].get("record", []):
+            record_type = record.get("type")
+            content = self._record_content(record)
+            if not record_type or content is None:
+                continue
+            records.append(
+                Record.create(
+                    record.get("name", ""),
+                    record_type,
+                    record.get("ttl", 3600),
+                    content,
+                )
+            )
+        return records
+
+    @staticmethod
+    def _record_content(record):
+        """Return a dumpzone record's data in PowerDNS content format."""
+        record_type = record.get("type")
+        if record_type in ("A", "AAAA"):
+            return record.get("address")
+        if record_type == "CNAME":
+            return record.get("cname")
+        if record_type == "NS":
+            return record.get("nsdname")
+        if record_type == "MX":
+            return f"{record.get('preference')} {record.get('exchange')}"
+        if record_type == "SRV":
+            fields = ("priority", "weight", "port", "target")
+            return " ".join(str(record.get(field)) for field in fields)
+        if record_type == "TXT":
+            return record.get("txtdata")
+        if record_type == "SOA":
+            return None
+        return record.get("record") or record.get("address")
+
+    def create_zone(self, zone_name):
+        """Create an empty local zone."""
+        self._call("createzone", domain=zone_name.rstrip("."), username="root")
+
+    def delete_zone(self, zone_name):
+        """Delete a local zone."""
+        self._call("killdns", domain=zone_name.rstrip("."))
+
+
+class ZoneFiles(CpanelDNS):
+    """Read and write cPanel's local zones as zone files, without whmapi1 per zone.
+
+    Zones are listed and read from ``ZONE_DIR`` directly. ``write_zone`` renders
+    the complete zone, replaces the file atomically with a bumped SOA serial and
+    reloads it once with ``zone_reload_command`` (default ``rndc reload <zone>``).
+    Creating and deleting zones still goes through whmapi1, which registers them
+    with the nameserver.
+    """
+
+    ZONE_DIR = Path("/var/named")
+    RELOAD_COMMAND = ("rndc", "reload", "{zone}")
+
+    def __init__(self, zone_dir=None, reload_command=None):
+        """Initialize the zone-file accessor."""
+        super().__init__()
+        self.zone_dir = Path(zone_dir or self.ZONE_DIR)
+        self.reload_command = list(
+            reload_command or Config.get("zone_reload_command") or self.RELOAD_COMMAND
+        )
+
+    def _path(self, zone_name):
+        return self.zone_dir / f"{zone_name.rstrip('.').lower()}.db"
+
+    def list_zones(self):
+        """Return the names of all local zones (without trailing dot)."""
+        return {path.name[: -len(".db")] for path in self.zone_dir.glob("*.db")}
+
+    def get_records(self, zone_name):
+        """Return the records of a local zone; TXT content is the joined data, as in whmapi1."""
+        origin = zone_name.rstrip(".").lower() + "."
+        records = []
+        try:
+            with open(self._path(zone_name), "r", encoding="utf-8", errors="replace") as f:
+                for entry in iter_entries(f, origin=origin):
+                    content = (
+                        txt_data(entry.content) if entry.type in ("TXT", "SPF") else entry.content
+                    )
+                    ttl = parse_ttl(entry.ttl)
+                    records.append(
+                        Record.create(
+                            entry.name.lower(),
+                            entry.type,
+                            3600 if ttl is None else ttl,
+                            content,
+                        )
+                    )
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            raise CpanelDNSError(f"Cannot read zone file for {zone_name}: {e}") from e
+        return records
+
+    @staticmethod
+    def _bump_serial(content):
+        """Return SOA content with a newer serial (date-based, as cPanel does)."""
+        fields = content.split()
+        if len(fields) >= 3 and fields[2].isdigit():
+            fields[2] = str(max(int(fields[2]) + 1, int(time.strftime("%Y%m%d00"))))
+        return " ".join(fields)
+
+    @classmethod
+    def render(cls, zone_name, records):
+        """Render a complete zone file; the SOA comes first with its serial bumped."""
+        lines = [f"; Zone file for {zone_name.rstrip('.')}, written by ultahost_dns"]
+        for record in sorted(records, key=lambda r: r.type != "SOA"):
+            content = record.content
+            if record.type == "SOA":
+                content = cls._bump_serial(content)
+            elif record.type in ("TXT", "SPF"):
+                content = quote_txt(content)
+            lines.append(f"{record.name}\t{record.ttl}\tIN\t{record.type}\t{content}")
+        return "\n".join(lines) + "\n"
+
+    def write_zone(self, zone_name, records):
+        """Replace a local zone with ``records`` in one atomic write and reload it."""
+        path = self._path(zone_name)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.render(zone_name, records))
+            try:
+                stat = os.stat(path)
+                os.chmod(tmp_path, stat.st_mode & 0o7777)
+                if os.geteuid() == 0:
+                    os.chown(tmp_path, stat.st_uid, stat.st_gid)
+            except FileNotFoundError:
+                os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise CpanelDNSError(f"Cannot write zone file for {zone_name}: {e}") from e
+        self.reload(zone_name)
+
+    def reload(self, zone_name):
+        """Tell the nameserver to reload one zone."""
+        cmd = [part.replace("{zone}", zone_name.rstrip(".")) for part in self.reload_command]
+        try:
+            subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=self.TIMEOUT)
+        except (subprocess.SubprocessError, OSError) as e:
+            raise CpanelDNSError(f"Reloading zone {zone_name} failed: {e}") from e
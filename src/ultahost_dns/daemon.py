@@ -0,0 +1,330 @@
+"""Hook daemon: keeps a warm PowerDNS client and serves hook scripts over a Unix socket.
+
+The hook scripts send ``{"operation": ..., "params": {...}}`` as a single JSON
+line and read back ``{"result": ...}`` or ``{"error": ...}``. Streaming requests
+(``"stream": true``) are answered with one ``{"item": ...}`` line per item and a
+final ``{"end": true}`` (or ``{"error": ...}``). When the daemon is not running
+the hooks fall back to running the operation in-process.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+
+from ultahost_dns.logger import PluginLogger
+from ultahost_dns.metrics import Metrics, process_runtime
+
+
+class DaemonUnavailable(Exception):
+    """The daemon socket is missing or nobody is listening on it."""
+
+
+class DaemonError(Exception):
+    """The daemon accepted a request but could not complete it."""
+
+
+class DaemonClient:
+    """Client side of the hook daemon protocol."""
+
+    SOCKET_PATH = Path("/var/run/ultahost_dns/ultahost_dns.sock")
+    CONNECT_TIMEOUT = 0.5
+    RESPONSE_TIMEOUT = 60
+
+    def __init__(self, socket_path=None):
+        """Initialize the client."""
+        self.socket_path = Path(socket_path or self.SOCKET_PATH)
+
+    def _connect(self):
+        """Connect to the daemon socket."""
+        if not self.socket_path.exists():
+            raise DaemonUnavailable(f"Socket {self.socket_path} does not exist")
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(self.socket_path))
+        except OSError as e:
+            sock.close()
+            # Nothing was sent yet, so running the operation locally is safe
+            raise DaemonUnavailable(f"Cannot connect to {self.socket_path}: {e}") from e
+        sock.settimeout(self.RESPONSE_TIMEOUT)
+        return sock
+
+    @staticmethod
+    def _parse(line, operation):
+        """Decode one response line, raising DaemonError for errors."""
+        if not line:
+            raise DaemonError(f"Daemon closed the connection during {operation}")
+
+        try:
+            response = json.loads(line)
+        except ValueError as e:
+            raise DaemonError(f"Invalid daemon response: {e}") from e
+
+        if "error" in response:
+            raise DaemonError(response["error"])
+        return response
+
+    def call(self, operation, params):
+        """Run an operation in the daemon and return its result."""
+        sock = self._connect()
+        try:
+            try:
+                request = json.dumps({"operation": operation, "params": params}) + "\n"
+                sock.sendall(request.encode("utf-8"))
+                with sock.makefile("rb") as stream:
+                    line = stream.readline()
+            except OSError as e:
+                raise DaemonError(f"Daemon request {operation} failed: {e}") from e
+        finally:
+            sock.close()
+
+        return self._parse(line, operation).get("result")
+
+    def stream(self, operation, params):
+        """Run a streaming operation in the daemon and return an iterator of its items.
+
+        The connection is made before returning, so ``DaemonUnavailable`` is raised
+        here rather than during iteration.
+        """
+        sock = self._connect()
+        try:
+            request = json.dumps({"operation": operation, "params": params, "stream": True}) + "\n"
+            sock.sendall(request.encode("utf-8"))
+        except OSError as e:
+            sock.close()
+            raise DaemonError(f"Daemon request {operation} failed: {e}") from e
+        return self._items(sock, operation)
+
+    def _items(self, sock, operation):
+        """Yield streamed items until the end marker."""
+        try:
+            with sock.makefile("rb") as stream:
+                while True:
+                    try:
+                        line = stream.readline()
+                    except OSError as e:
+                        raise DaemonError(f"Daemon request {operation} failed: {e}") from e
+                    response = self._parse(line, operation)
+                    if response.get("end"):
+                        return
+                    yield response.get("item")
+        finally:
+            sock.close()
+
+
+def _record_hook(operation, mode, error=None):
+    """Record the hook's runtime since its process started, interpreter startup included."""
+    Metrics.observe("ultahost_dns_hook_seconds", process_runtime(), operation=operation, mode=mode)
+    if error is not None:
+        Metrics.inc(
+            "ultahost_dns_hook_errors_total",
+            operation=operation,
+            mode=mode,
+            error=type(error).__name__,
+        )
+
+
+def _timed_items(items, operation, mode):
+    """Yield streamed items, recording the hook runtime once the stream ends."""
+    try:
+        yield from items
+    except Exception as e:
+        _record_hook(operation, mode, e)
+        raise
+    _record_hook(operation, mode)
+
+
+def run_operation(operation, **params):
+    """Run a hook operation through the daemon, or in-process if it is not running."""
+    mode = "daemon"
+    try:
+        try:
+            result = DaemonClient().call(operation, params)
+        except DaemonUnavailable as e:
+            PluginLogger.get_logger().debug(
+                f"Hook daemon unavailable ({e}), running {operation} in-process"
+            )
+            from ultahost_dns.operations import DNSOperations
+
+            mode = "local"
+            result = DNSOperations().dispatch(operation, params)
+    except Exception as e:
+        _record_hook(operation, mode, e)
+        raise
+    _record_hook(operation, mode)
+    return result
+
+
+def stream_operation(operation, **params):
+    """Run a streaming hook operation through the daemon, or in-process if it is not running."""
+    try:
+        return _timed_items(DaemonClient().stream(operation, params), operation, "daemon")
+    except DaemonUnavailable as e:
+        PluginLogger.get_logger().debug(
+            f"Hook daemon unavailable ({e}), running {operation} in-process"
+        )
+
+    from ultahost_dns.operations import DNSOperations
+
+    return _timed_items(DNSOperations().stream(operation, params), operation, "local")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle one JSON request line per connection."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        try:
+            request = json.loads(line)
+            if request.get("stream"):
+                for item in self.server.hook_daemon.stream(
+                    request["operation"], request.get("params") or {}
+                ):
+                    self._write({"item": item})
+                response = {"end": True}
+            else:
+                result = self.server.hook_daemon.dispatch(
+                    request["operation"], request.get("params") or {}
+                )
+                response = {"result": result}
+        except Exception as e:
+            self.server.hook_daemon.logger.error(f"Hook daemon request failed: {e}", exc_info=True)
+            response = {"error": str(e)}
+
+        self._write(response)
+
+    def _write(self, response):
+        self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class HookDaemon:
+    """Serve DNS operations from a long-lived process."""
+
+    def __init__(self, socket_path=None, operations=None, journal=None):
+        """Initialize the daemon.
+
+        ``operations`` may be passed in to serve a prebuilt (or fake) operations
+        object; otherwise one is created from the current configuration. A
+        background thread applies the write-behind ``journal`` (the default
+        one unless given).
+        """
+        self.socket_path = Path(socket_path or DaemonClient.SOCKET_PATH)
+        self.logger = PluginLogger.get_logger()
+        if journal is None:
+            from ultahost_dns.journal import Journal
+
+            journal = Journal()
+        self.journal = journal
+        self._fixed_operations = operations
+        self._operations = None
+        self._operations_key = None
+        self._lock = threading.Lock()
+        self._journal_wake = threading.Event()
+        self._stopping = threading.Event()
+        self._server = None
+
+    def _get_operations(self):
+        """Return the warm operations object, rebuilding it when the configuration changes."""
+        if self._fixed_operations is not None:
+            return self._fixed_operations
+
+        from ultahost_dns.config import Config
+        from ultahost_dns.operations import DNSOperations
+        from ultahost_dns.powerdns_client import PowerDNSClient
+        from ultahost_dns.zone_cache import ZoneCache
+
+        key = Config.snapshot()
+        with self._lock:
+            if self._operations is None or key != self._operations_key:
+                self.logger.info("Hook daemon (re)connecting PowerDNS client")
+                self._operations = DNSOperations(
+                    PowerDNSClient(cache=ZoneCache()),
+                    journal=self.journal,
+                    notify=self._journal_wake.set,
+                )
+                self._operations_key = key
+            return self._operations
+
+    def dispatch(self, operation, params):
+        """Run an operation on the warm operations object."""
+        with Metrics.timer("ultahost_dns_daemon_operation_seconds", operation=operation):
+            return self._get_operations().dispatch(operation, params)
+
+    def stream(self, operation, params):
+        """Run a streaming operation on the warm operations object."""
+        return self._get_operations().stream(operation, params)
+
+    def flush_journal(self):
+        """Apply journaled changes until shutdown, waking when one is queued or a zone is due."""
+        from ultahost_dns.journal import JournalFlusher
+
+        timeout = JournalFlusher.INTERVAL
+        while not self._stopping.is_set():
+            self._journal_wake.wait(timeout)
+            self._journal_wake.clear()
+            timeout = JournalFlusher.INTERVAL
+            # Nothing was ever queued unless the database exists
+            if self._stopping.is_set() or not self.journal.path.exists():
+                continue
+            try:
+                flusher = JournalFlusher(self._get_operations().client, self.journal)
+                flusher.flush()
+                timeout = flusher.wait_time()
+            except Exception as e:
+                self.logger.error(f"Journal flush failed: {e}", exc_info=True)
+
+    def serve_forever(self):
+        """Bind the socket and serve requests until shut down."""
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(self.socket_path.parent, 0o700)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+        self._server = _UnixServer(str(self.socket_path), _RequestHandler)
+        self._server.hook_daemon = self
+        os.chmod(self.socket_path, 0o600)
+        self.logger.info(f"Hook daemon listening on {self.socket_path}")
+
+        self._stopping.clear()
+        flusher = threading.Thread(target=self.flush_journal, name="journal-flusher", daemon=True)
+        flusher.start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._stopping.set()
+            self._journal_wake.set()
+            flusher.join()
+            self._server.server_close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+    def shutdown(self):
+        """Stop serving requests."""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+def main():
+    """Run the hook daemon in the foreground."""
+    daemon = HookDaemon()
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,114 +1,299 @@
 """DNS template management for cPanel integration."""
 
-import subprocess
+import json
+import os
+import re
+import threading
 from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
 
+from ultahost_dns.config import Config
 from ultahost_dns.logger import PluginLogger
+from ultahost_dns.metrics import Metrics
+from ultahost_dns.records import Record, intern_type
+from ultahost_dns.zonefile import iter_entries, parse_ttl
+
+_PLACEHOLDER_RE = re.compile(r"%(\w+)%")
+
+# Alternating literal text and placeholder names, starting and ending with literal text
+Pattern = Tuple[str, ...]
+
+
+class TemplateError(Exception):
+    """A DNS template could not be rendered for a zone."""
+
+
+def _render(pattern: Pattern, variables: Dict[str, str]) -> str:
+    """Substitute the placeholders of a compiled pattern; KeyError names a missing one."""
+    if len(pattern) == 1:
+        return pattern[0]
+    parts = list(pattern)
+    for i in range(1, len(parts), 2):
+        parts[i] = variables[parts[i]]
+    return "".join(parts)
+
+
+class CompiledTemplate(NamedTuple):
+    """A DNS template parsed once into record patterns.
+
+    Names are qualified against ``%domain%.`` at compile time, so rendering a
+    zone is placeholder substitution only. Each entry is
+    ``(name, ttl, type, content)`` with the text fields compiled to patterns.
+    """
+
+    entries: Tuple[Tuple[Pattern, Pattern, str, Pattern], ...]
+
+    @classmethod
+    def compile(cls, lines) -> "CompiledTemplate":
+        """Compile the lines of a template file."""
+        entries = []
+        for entry in iter_entries(lines, origin="%domain%."):
+            # PowerDNS maintains the SOA (and its serial) itself
+            if entry.type == "SOA":
+                continue
+            entries.append(
+                (
+                    tuple(_PLACEHOLDER_RE.split(entry.name)),
+                    tuple(_PLACEHOLDER_RE.split(entry.ttl)),
+                    entry.type,
+                    tuple(_PLACEHOLDER_RE.split(entry.content)),
+                )
+            )
+        return cls(tuple(entries))
+
+    @classmethod
+    def from_json(cls, data) -> "CompiledTemplate":
+        """Rebuild a template saved with ``to_json``."""
+        return cls(
+            tuple(
+                (tuple(name), tuple(ttl), intern_type(record_type), tuple(content))
+                for name, ttl, record_type, content in data
+            )
+        )
+
+    def to_json(self):
+        """Return the entries as JSON-serializable lists."""
+        return [
+            [list(name), list(ttl), record_type, list(content)]
+            for name, ttl, record_type, content in self.entries
+        ]
+
+    def render(self, variables: Dict[str, str]) -> Tuple[List[Record], Set[str]]:
+        """Return the records for ``variables`` and the placeholders that had no value.
+
+        Records using a missing placeholder are left out.
+        """
+        records = []
+        missing = set()
+        for name, ttl, record_type, content in self.entries:
+            try:
+                rendered_ttl = parse_ttl(_render(ttl, variables))
+                records.append(
+                    Record.create(
+                        _render(name, variables),
+                        record_type,
+                        3600 if rendered_ttl is None else rendered_ttl,
+                        _render(content, variables),
+                    )
+                )
+            except KeyError as e:
+                missing.add(e.args[0])
+        return records, missing
 
 
 class DNSTemplate:
-    """Manage DNS templates from cPanel."""
+    """Manage DNS templates from cPanel.
+
+    Templates are compiled once per file version: compiled templates are kept in
+    memory and in ``CACHE_DIR``, keyed by the template file's inode, mtime and
+    size, so other processes do not reparse them either.
+    """
 
     logger = PluginLogger.get_logger()
     TEMPLATE_DIR = Path("/var/cpanel/dns_templates")
+    CACHE_DIR = Path("/var/cache/ultahost_dns/templates")
+    DEFAULT_TEMPLATE = (
+        "@ 3600 IN NS ns1.example.com.\n"
+        "@ 3600 IN NS ns2.example.com.\n"
+        "@ 3600 IN A 0.0.0.0\n"
+        "www 3600 IN A 0.0.0.0\n"
+    )
+    # cPanel's defaults for the TTL placeholders of its stock templates
+    DEFAULT_VARIABLES = {"ttl": "14400", "nsttl": "86400"}
+    # The server's own settings for the other standard placeholders
+    WWWACCT_CONF = Path("/etc/wwwacct.conf")
+    MAINIP_FILE = Path("/var/cpanel/mainip")
+    WWWACCT_VARIABLES = {
+        "ADDR": "ip",
+        "NS": "nameserver",
+        "NS2": "nameserver2",
+        "NS3": "nameserver3",
+        "NS4": "nameserver4",
+    }
+
+    _lock = threading.Lock()
+    _compiled: Dict[Path, Tuple[tuple, CompiledTemplate]] = {}
+    _default: Optional[CompiledTemplate] = None
+    _server: Optional[Tuple[tuple, Dict[str, str]]] = None
+
+    @staticmethod
+    def _file_key(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
 
     @classmethod
-    def get_template_records(cls, template_name="default"):
-        """Get DNS records from a cPanel DNS template."""
-        template_file = cls.TEMPLATE_DIR / f"{template_name}.db"
+    def _cache_file(cls, template_name):
+        return cls.CACHE_DIR / f"{template_name}.json"
 
-        if not template_file.exists():
-            cls.logger.warning(f"DNS template {template_name} not found, using default")
-            return cls._get_default_records()
+    @classmethod
+    def _load_cached(cls, template_name, key):
+        """Return the compiled template saved on disk for this file version, if any."""
+        try:
+            with open(cls._cache_file(template_name), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("key") == list(key):
+                return CompiledTemplate.from_json(data["entries"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
 
-        records = []
+    @classmethod
+    def _save_cached(cls, template_name, key, compiled):
+        """Persist a compiled template for other processes."""
+        cache_file = cls._cache_file(template_name)
         try:
-            with open(template_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith(";") or line.startswith("$"):
-                        continue
-
-                    # Parse DNS record format
-                    # Format: name TTL class type content
-                    parts = line.split()
-                    if len(parts) >= 5:
-                        name = parts[0]
-                        ttl = int(parts[1]) if parts[1].isdigit() else 3600
-                        record_type = parts[3]
-                        content = " ".join(parts[4:])
-
-                        records.append(
-                            {
-                                "name": name,
-                                "type": record_type,
-                                "ttl": ttl,
-                                "content": content,
-                            }
-                        )
+            cls.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"key": list(key), "entries": compiled.to_json()}, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, cache_file)
         except OSError as e:
-            cls.logger.error(f"Error reading DNS template {template_name}: {e}")
-            return cls._get_default_records()
+            cls.logger.warning(f"Could not cache compiled DNS template {template_name}: {e}")
 
-        return records
+    @classmethod
+    def compile_template(cls, template_name="default"):
+        """Return the compiled template, or None if it does not exist or cannot be read."""
+        if Path(template_name).name != template_name:
+            return None
+        template_file = cls.TEMPLATE_DIR / f"{template_name}.db"
+        key = cls._file_key(template_file)
+        if key is None:
+            return None
+
+        with cls._lock:
+            cached = cls._compiled.get(template_file)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+            compiled = cls._load_cached(template_name, key)
+            if compiled is None:
+                try:
+                    with open(template_file, "r", encoding="utf-8") as f:
+                        compiled = CompiledTemplate.compile(f)
+                except (OSError, UnicodeDecodeError) as e:
+                    cls.logger.error(f"Error reading DNS template {template_name}: {e}")
+                    return None
+                cls._save_cached(template_name, key, compiled)
+                cls.logger.debug(
+                    f"Compiled DNS template {template_name} ({len(compiled.entries)} records)"
+                )
+            cls._compiled[template_file] = (key, compiled)
+            return compiled
 
     @classmethod
-    def _get_default_records(cls):
-        """Get default DNS records."""
-        return [
-            {
-                "name": "@",
-                "type": "NS",
-                "ttl": 3600,
-                "content": "ns1.example.com.",
-            },
-            {
-                "name": "@",
-                "type": "NS",
-                "ttl": 3600,
-                "content": "ns2.example.com.",
-            },
-            {
-                "name": "@",
-                "type": "A",
-                "ttl": 3600,
-                "content": "0.0.0.0",
-            },
-            {
-                "name": "www",
-                "type": "A",
-                "ttl": 3600,
-                "content": "0.0.0.0",
-            },
-        ]
+    def _default_template(cls):
+        if cls._default is None:
+            cls._default = CompiledTemplate.compile(cls.DEFAULT_TEMPLATE.splitlines())
+        return cls._default
 
     @classmethod
-    def apply_template_to_zone(cls, client, zone_name, template_name="default"):
-        """Apply DNS template records to a zone."""
-        records = cls.get_template_records(template_name)
-        applied = 0
+    def server_variables(cls):
+        """Return the placeholder values cPanel itself uses for this server.
 
-        for record in records:
-            name = record["name"]
-            if name == "@":
-                name = zone_name.rstrip(".")
+        ``%ip%`` and ``%nameserver%`` to ``%nameserver4%`` are read from
+        ``/etc/wwwacct.conf``; the main IP is used when no shared IP is set.
+        """
+        key = (cls._file_key(cls.WWWACCT_CONF), cls._file_key(cls.MAINIP_FILE))
+        cached = cls._server
+        if cached is not None and cached[0] == key:
+            return cached[1]
 
-            priority = None
-            content = record["content"]
+        values = {}
+        try:
+            with open(cls.MAINIP_FILE, "r", encoding="utf-8") as f:
+                main_ip = f.read().strip()
+            if main_ip:
+                values["ip"] = main_ip
+        except (OSError, UnicodeDecodeError):
+            pass
+        try:
+            with open(cls.WWWACCT_CONF, "r", encoding="utf-8") as f:
+                for line in f:
+                    setting, _, value = line.strip().partition(" ")
+                    value = value.strip()
+                    if setting in cls.WWWACCT_VARIABLES and value:
+                        values[cls.WWWACCT_VARIABLES[setting]] = value
+        except (OSError, UnicodeDecodeError):
+            pass
+        cls._server = (key, values)
+        return values
+
+    @classmethod
+    def get_template_records(cls, zone_name, template_name="default", variables=None):
+        """Get the DNS records of a cPanel DNS template rendered for a zone.
+
+        ``%domain%`` is the zone name; other placeholders (``%ip%``,
+        ``%nameserver%``, ...) come from ``variables``, then the
+        ``template_variables`` setting, then ``server_variables()``, then
+        ``DEFAULT_VARIABLES``. Raises TemplateError naming the placeholders
+        left without a value, rather than returning a partial zone.
+        """
+        with Metrics.timer("ultahost_dns_template_render_seconds", template=template_name):
+            compiled = cls.compile_template(template_name)
+            if compiled is None:
+                cls.logger.warning(f"DNS template {template_name} not found, using default")
+                compiled = cls._default_template()
 
-            # Handle MX and SRV records with priority
-            if record["type"] in ["MX", "SRV"] and " " in content:
-                parts = content.split(" ", 1)
-                if parts[0].isdigit():
-                    priority = int(parts[0])
-                    content = parts[1]
+            values = dict(cls.DEFAULT_VARIABLES)
+            values.update(cls.server_variables())
+            values.update(Config.get("template_variables") or {})
+            values.update(variables or {})
+            values["domain"] = zone_name.rstrip(".")
 
-            if client.add_record(zone_name, name, record["type"], content, record["ttl"], priority):
-                applied += 1
-            else:
-                cls.logger.warning(f"Failed to apply record {name} {record['type']} to zone {zone_name}")
+            records, missing = compiled.render({key: str(value) for key, value in values.items()})
+        if missing:
+            raise TemplateError(
+                f"DNS template {template_name} has no value for {', '.join(sorted(missing))} "
+                f"(zone {zone_name}); set them in template_variables"
+            )
+        return records
+
+    @classmethod
+    def apply_template_to_zone(cls, client, zone_name, template_name="default"):
+        """Apply DNS template records to a zone in a single PATCH request."""
+        try:
+            records = cls.get_template_records(zone_name, template_name)
+        except TemplateError as e:
+            cls.logger.error(str(e))
+            return False
 
-        cls.logger.info(f"Applied {applied}/{len(records)} template records to zone {zone_name}")
-        return applied == len(records)
+        # Records sharing a name and type (e.g. both NS lines) become one RRset;
+        # MX/SRV content keeps its leading priority, which PowerDNS expects
+        batch = client.batch(zone_name)
+        for record in records:
+            batch.add(record.name, record.type, record.content, record.ttl)
 
+        with Metrics.timer("ultahost_dns_template_apply_seconds", template=template_name):
+            committed = batch.commit()
+        if not committed:
+            cls.logger.warning(f"Failed to apply template {template_name} to zone {zone_name}")
+            return False
 
+        cls.logger.info(
+            f"Applied {len(records)} template records ({len(batch)} RRsets) to zone {zone_name}"
+        )
+        return True
@@ -0,0 +1,21 @@
+"""Request semantics shared by the PowerDNS clients and their HTTP transports."""
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+# Methods PowerDNS may receive twice without changing the outcome. PATCH is
+# included: rrset changes are REPLACE/DELETE, so repeating a batch is safe.
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE", "PATCH"))
+
+
+class ConnectFailed(requests.exceptions.ConnectionError):
+    """The connection could not be opened, so no part of the request was sent."""
+
+
+def not_sent(error: requests.exceptions.RequestException) -> bool:
+    """Tell whether a request failed before any of it reached the server."""
+    if isinstance(error, (requests.exceptions.ConnectTimeout, ConnectFailed)):
+        return True
+    # requests reports a refused or unresolvable connection as MaxRetryError(NewConnectionError)
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
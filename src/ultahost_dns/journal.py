@@ -0,0 +1,355 @@
+"""Write-behind journal of record changes, applied to PowerDNS in the background."""
+
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+import requests
+
+from ultahost_dns.config import Config
+from ultahost_dns.logger import PluginLogger
+from ultahost_dns.metrics import Metrics
+
+JournalEntry = namedtuple("JournalEntry", "id zone operation params created attempts")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    zone TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    params TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_zone ON entries (zone, id);
+CREATE TABLE IF NOT EXISTS leases (
+    zone TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+
+class Journal:
+    """Durable queue of record changes shared by all plugin processes.
+
+    Entries live in a SQLite database in WAL mode, synced on every commit so
+    an appended change survives a crash. A zone's entries are applied in the
+    order they were appended, by one flusher at a time: ``claim`` leases the
+    zone for ``LEASE_SECONDS``.
+    """
+
+    STORE_FILE = Path("/var/cache/ultahost_dns/journal.sqlite")
+    LEASE_SECONDS = 120
+    BATCH_SIZE = 1000
+
+    def __init__(self, path=None):
+        """Initialize the journal; the database is opened on first use."""
+        self.path = Path(path or self.STORE_FILE)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            import sqlite3
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.path), timeout=5, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.executescript(SCHEMA)
+            self.path.chmod(0o600)
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        """Run statements in one write transaction."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    @staticmethod
+    def _key(zone_name):
+        return zone_name.rstrip(".").lower()
+
+    @staticmethod
+    def _owner():
+        return f"{os.getpid()}.{threading.get_ident()}"
+
+    def append(self, zone_name, operation, params):
+        """Append a change to a zone and return its entry id."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "INSERT INTO entries (zone, operation, params, created) VALUES (?, ?, ?, ?)",
+                (self._key(zone_name), operation, json.dumps(params), time.time()),
+            ).lastrowid
+
+    # When a zone's entries are due: after its retry backoff, once no entry was appended for
+    # ``debounce`` seconds, or ``max_delay`` seconds after its oldest entry at the latest
+    _DUE = "MAX(MAX(next_attempt), MIN(MAX(created) + ?, MIN(created) + ?))"
+
+    def due_zones(self, debounce=0.0, max_delay=0.0, force=False):
+        """Return the zones with entries to apply, oldest first.
+
+        ``force`` includes zones within their debounce window or waiting for a retry.
+        """
+        if force:
+            rows = self._query("SELECT zone FROM entries GROUP BY zone ORDER BY MIN(id)")
+        else:
+            rows = self._query(
+                f"SELECT zone FROM entries GROUP BY zone HAVING {self._DUE} <= ? ORDER BY MIN(id)",
+                (debounce, max(debounce, max_delay), time.time()),
+            )
+        return [zone for (zone,) in rows]
+
+    def next_due(self, debounce=0.0, max_delay=0.0):
+        """Return the ``time.time()`` the next zone becomes due, or None if the journal is empty."""
+        return self._query(
+            f"SELECT MIN(due) FROM (SELECT {self._DUE} AS due FROM entries GROUP BY zone)",
+            (debounce, max(debounce, max_delay)),
+        )[0][0]
+
+    def claim(self, zone_name):
+        """Lease a zone and return its entries in order, or None while another flusher holds it."""
+        zone = self._key(zone_name)
+        owner = self._owner()
+        now = time.time()
+        with self._transaction() as conn:
+            lease = conn.execute(
+                "SELECT owner, expires FROM leases WHERE zone = ?", (zone,)
+            ).fetchone()
+            if lease and lease[0] != owner and lease[1] > now:
+                return None
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (zone, owner, expires) VALUES (?, ?, ?)",
+                (zone, owner, now + self.LEASE_SECONDS),
+            )
+            rows = conn.execute(
+                "SELECT id, zone, operation, params, created, attempts FROM entries "
+                "WHERE zone = ? ORDER BY id LIMIT ?",
+                (zone, self.BATCH_SIZE),
+            ).fetchall()
+        return [JournalEntry(*row[:3], json.loads(row[3]), *row[4:]) for row in rows]
+
+    def release(self, zone_name):
+        """Give up this flusher's lease on a zone."""
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM leases WHERE zone = ? AND owner = ?",
+                (self._key(zone_name), self._owner()),
+            )
+
+    def complete(self, ids):
+        """Remove applied (or rejected) entries."""
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM entries WHERE id = ?", [(i,) for i in ids])
+
+    def retry(self, ids, error, delay):
+        """Record a failed attempt; the zone is not flushed again for ``delay`` seconds."""
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE entries SET attempts = attempts + 1, next_attempt = ?, error = ? "
+                "WHERE id = ?",
+                [(time.time() + delay, error, i) for i in ids],
+            )
+
+    def discard(self, zone_name):
+        """Drop a zone's pending entries, e.g. when the zone is deleted; return how many."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "DELETE FROM entries WHERE zone = ?", (self._key(zone_name),)
+            ).rowcount
+
+    def stats(self):
+        """Return the queue depth, zones pending, lag (age of the oldest entry) and retries."""
+        if self._conn is None and not self.path.exists():
+            return {
+                "depth": 0,
+                "zones": 0,
+                "lag_seconds": 0.0,
+                "retrying_zones": 0,
+                "last_error": None,
+            }
+        depth, zones, oldest, retrying = self._query(
+            "SELECT COUNT(*), COUNT(DISTINCT zone), MIN(created), "
+            "COUNT(DISTINCT CASE WHEN attempts > 0 THEN zone END) FROM entries"
+        )[0]
+        error = self._query(
+            "SELECT zone, error FROM entries WHERE error IS NOT NULL ORDER BY id DESC LIMIT 1"
+        )
+        return {
+            "depth": depth,
+            "zones": zones,
+            "lag_seconds": round(time.time() - oldest, 3) if oldest is not None else 0.0,
+            "retrying_zones": retrying,
+            "last_error": dict(zip(("zone", "error"), error[0])) if error else None,
+        }
+
+
+class JournalFlusher:
+    """Apply journaled record changes to PowerDNS with one PATCH per zone.
+
+    A zone's pending entries are coalesced into one ``RRsetBatch``: an add or
+    update replaces its (name, type) RRset and a delete removes it, so a later
+    change to an RRset supersedes an earlier one just as if they had been sent
+    one by one. Failures are retried with exponential backoff; changes
+    PowerDNS rejects (4xx) are logged and dropped.
+
+    A zone is flushed once no change was queued for it for ``debounce``
+    seconds, so a burst of edits (a saved zone editor form) costs one PATCH
+    and one serial increment, but no later than ``max_delay`` seconds after
+    its oldest pending change.
+    """
+
+    INTERVAL = 1.0
+    DEBOUNCE = 0.5
+    MAX_DELAY = 5.0
+    RETRY_BACKOFF = 1.0
+    RETRY_BACKOFF_MAX = 300.0
+
+    def __init__(self, client, journal=None, debounce=None, max_delay=None):
+        """Initialize a flusher; ``debounce`` and ``max_delay`` default to their settings."""
+        self.client = client
+        self.journal = journal or Journal()
+        self.debounce = float(
+            debounce if debounce is not None else Config.get("write_behind_debounce", self.DEBOUNCE)
+        )
+        self.max_delay = float(
+            max_delay
+            if max_delay is not None
+            else Config.get("write_behind_max_delay", self.MAX_DELAY)
+        )
+        self.logger = PluginLogger.get_logger()
+
+    def flush(self, force=False):
+        """Flush every zone with due entries; return the number of entries applied.
+
+        ``force`` flushes every zone, ignoring debounce windows and retry backoff.
+        """
+        return sum(
+            self.flush_zone(zone)
+            for zone in self.journal.due_zones(self.debounce, self.max_delay, force)
+        )
+
+    def wait_time(self):
+        """Return how long to wait before the next zone is due, at most ``INTERVAL`` seconds."""
+        due = self.journal.next_due(self.debounce, self.max_delay)
+        if due is None:
+            return self.INTERVAL
+        # Not zero: a zone leased by another process stays due until that flusher is done
+        return min(max(due - time.time(), 0.05), self.INTERVAL)
+
+    def flush_zone(self, zone_name):
+        """Apply a zone's pending entries in order; return how many were applied."""
+        return len(self.apply_zone(zone_name))
+
+    def apply_zone(self, zone_name):
+        """Apply a zone's pending entries in order; return the ids of those applied."""
+        entries = self.journal.claim(zone_name)
+        if entries is None:
+            return []
+        try:
+            return self._apply(entries) if entries else []
+        finally:
+            self.journal.release(zone_name)
+
+    def _batch(self, entries):
+        """Build one RRset batch from a zone's entries."""
+        batch = self.client.batch(entries[0].zone)
+        for entry in entries:
+            params = entry.params
+            if entry.operation == "delete_record":
+                batch.delete(params["name"], params["record_type"])
+            else:
+                batch.replace(
+                    params["name"],
+                    params["record_type"],
+                    [params["content"]],
+                    params.get("ttl", 3600),
+                    params.get("priority"),
+                )
+        return batch
+
+    @staticmethod
+    def _rejected(error):
+        """Whether PowerDNS refused the changes themselves, so resending them cannot succeed."""
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+        return isinstance(status, int) and 400 <= status < 500 and status != 429
+
+    def _send(self, entries):
+        """Send entries as one PATCH and remove them from the journal."""
+        with Metrics.timer("ultahost_dns_journal_flush_seconds"):
+            self._batch(entries).send()
+        self.journal.complete([entry.id for entry in entries])
+        Metrics.inc("ultahost_dns_journal_applied_total", len(entries))
+        self.logger.info(f"Applied {len(entries)} journaled changes to zone {entries[0].zone}")
+
+    def _apply(self, entries):
+        """Send a zone's entries as one PATCH, one at a time if PowerDNS rejects the batch."""
+        try:
+            self._send(entries)
+            return [entry.id for entry in entries]
+        except requests.exceptions.RequestException as e:
+            if not self._rejected(e):
+                self._retry(entries, e)
+                return []
+            if len(entries) == 1:
+                self._reject(entries, e)
+                return []
+        self.logger.warning(
+            f"PowerDNS rejected {len(entries)} journaled changes to zone {entries[0].zone}, "
+            "applying them singly"
+        )
+
+        applied = []
+        for index, entry in enumerate(entries):
+            try:
+                self._send([entry])
+                applied.append(entry.id)
+            except requests.exceptions.RequestException as e:
+                if not self._rejected(e):
+                    # Later entries wait for this one, keeping the zone's order
+                    self._retry(entries[index:], e)
+                    break
+                self._reject([entry], e)
+        return applied
+
+    def _retry(self, entries, error):
+        """Keep the entries and back off before the zone is tried again."""
+        attempts = entries[0].attempts + 1
+        delay = min(self.RETRY_BACKOFF_MAX, self.RETRY_BACKOFF * 2 ** (attempts - 1))
+        self.journal.retry([entry.id for entry in entries], str(error), delay)
+        Metrics.inc("ultahost_dns_journal_retries_total")
+        self.logger.warning(
+            f"Journaled changes to zone {entries[0].zone} failed ({error}), "
+            f"attempt {attempts}, next in {delay:.0f}s"
+        )
+
+    def _reject(self, entries, error):
+        """Drop changes PowerDNS refused."""
+        for entry in entries:
+            self.logger.error(
+                f"PowerDNS rejected {entry.operation} {entry.params} in zone {entry.zone}: {error}"
+            )
+        self.journal.complete([entry.id for entry in entries])
+        Metrics.inc("ultahost_dns_journal_rejected_total", len(entries))
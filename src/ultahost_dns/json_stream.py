@@ -0,0 +1,123 @@
+"""Incremental parsing of large JSON documents from a stream of text chunks."""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = _WHITESPACE + ",]}"
+
+
+class JSONStream:
+    """Parse a JSON document arriving in chunks, yielding array items as they complete.
+
+    Only the items of the array being iterated are held in memory (plus the
+    unparsed tail of the current chunk), so a ``GET /zones`` listing or a zone
+    with tens of thousands of RRsets is never materialized as a whole.
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        """Initialize the parser over an iterable of text chunks."""
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; False at the end of the stream."""
+        if self._eof:
+            return False
+        for chunk in self._chunks:
+            if chunk:
+                # Drop what was already parsed before growing the buffer
+                self._buffer = self._buffer[self._pos :] + chunk
+                self._pos = 0
+                return True
+        self._eof = True
+        return False
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at the end)."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        """Consume ``char`` or raise ValueError."""
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found or 'end of input'!r}")
+        self._pos += 1
+
+    def _value(self) -> Any:
+        """Decode one complete JSON value."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Other values are self-delimiting, but a number is only complete once a
+            # delimiter follows it ("1" may be "12", "1." may be "1.5")
+            complete = (
+                not isinstance(value, (int, float))
+                or isinstance(value, bool)
+                or (end < len(self._buffer) and self._buffer[end] in _DELIMITERS)
+            )
+            if complete or not self._fill():
+                self._pos = end
+                return value
+
+    def _items(self) -> Iterator[Any]:
+        """Yield the items of the array starting at the current position."""
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            separator = self._peek()
+            self._pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(
+                    f"Expected ',' or ']' in JSON stream, found {separator or 'end of input'!r}"
+                )
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yield the items of a top-level JSON array."""
+        yield from self._items()
+
+    def iter_member(self, key: str, fields: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """Yield the items of the array ``key`` of a top-level JSON object.
+
+        The object's other members are decoded into ``fields`` when given (those
+        following the array only once iteration finished).
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            name = self._value()
+            self._expect(":")
+            if name == key and self._peek() == "[":
+                yield from self._items()
+            else:
+                value = self._value()
+                if fields is not None:
+                    fields[name] = value
+            separator = self._peek()
+            self._pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(
+                    f"Expected ',' or '}}' in JSON stream, found {separator or 'end of input'!r}"
+                )
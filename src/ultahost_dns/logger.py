@@ -1,50 +1,137 @@
 """Logging system for Ultahost DNS plugin."""
 
+import atexit
+import json
 import logging
-import os
-from datetime import datetime
+import logging.handlers
+import queue
+import threading
 from pathlib import Path
 
+from ultahost_dns.config import Config
+
+
+class LazyJSON:
+    """Serialize a payload for a log message only if the message is emitted.
+
+    ``logger.debug("Request data: %s", LazyJSON(data))`` costs nothing when
+    DEBUG is disabled.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        """Wrap a JSON-serializable payload."""
+        self.data = data
+
+    def __str__(self):
+        """Return the payload as indented JSON."""
+        return json.dumps(self.data, indent=2, default=str)
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record):
+        """Return the record as a JSON line."""
+        from datetime import datetime, timezone
+
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
 
 class PluginLogger:
-    """Custom logger for the plugin."""
+    """Custom logger for the plugin.
+
+    Records are put on a queue and written to the log file (and the console) by
+    a background thread, so logging never blocks the caller on file I/O. The
+    level comes from the ``log_level`` setting (default INFO) and the file
+    format from ``log_format`` (``text`` or ``json`` for JSON lines).
+    """
 
     LOG_DIR = Path("/var/log/ultahost_dns")
     LOG_FILE = LOG_DIR / "ultahost_dns.log"
+    TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+    _lock = threading.Lock()
+    _listener = None
 
     @classmethod
-    def _setup_logger(cls):
-        """Set up the logger."""
-        cls.LOG_DIR.mkdir(parents=True, exist_ok=True)
+    def _file_handler(cls, json_format):
+        """Return the handler writing the log file, or None if it cannot be opened."""
+        try:
+            cls.LOG_DIR.mkdir(parents=True, exist_ok=True)
+            handler = logging.FileHandler(cls.LOG_FILE)
+        except OSError:
+            return None
+        if json_format:
+            handler.setFormatter(JSONFormatter())
+        else:
+            handler.setFormatter(logging.Formatter(cls.TEXT_FORMAT, datefmt="%Y-%m-%d %H:%M:%S"))
+        return handler
 
+    @classmethod
+    def _setup_logger(cls):
+        """Set up the logger, once per process."""
         logger = logging.getLogger("ultahost_dns")
-        logger.setLevel(logging.DEBUG)
-
-        # Avoid duplicate handlers
-        if logger.handlers:
+        if cls._listener is not None or logger.handlers:
             return logger
 
-        # File handler
-        file_handler = logging.FileHandler(cls.LOG_FILE)
-        file_handler.setLevel(logging.DEBUG)
-
-        # Console handler (for hook scripts)
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-
-        # Formatter
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
-
+        with cls._lock:
+            if cls._listener is not None or logger.handlers:
+                return logger
+
+            level = logging.getLevelName(str(Config.get("log_level", "INFO")).upper())
+            logger.setLevel(level if isinstance(level, int) else logging.INFO)
+
+            handlers = []
+            file_handler = cls._file_handler(Config.get("log_format", "text") == "json")
+            if file_handler is not None:
+                handlers.append(file_handler)
+
+            # Console handler (for hook scripts)
+            console_handler = logging.StreamHandler()
+            console_handler.setLevel(logging.INFO)
+            console_handler.setFormatter(
+                logging.Formatter(cls.TEXT_FORMAT, datefmt="%Y-%m-%d %H:%M:%S")
+            )
+            handlers.append(console_handler)
+
+            log_queue = queue.SimpleQueue()
+            cls._listener = logging.handlers.QueueListener(
+                log_queue, *handlers, respect_handler_level=True
+            )
+            cls._listener.start()
+            logger.addHandler(logging.handlers.QueueHandler(log_queue))
+            atexit.register(cls.shutdown)
         return logger
 
+    @classmethod
+    def shutdown(cls):
+        """Write out queued records and stop the background writer."""
+        with cls._lock:
+            listener, cls._listener = cls._listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+            logger = logging.getLogger("ultahost_dns")
+            for handler in list(logger.handlers):
+                if isinstance(handler, logging.handlers.QueueHandler):
+                    logger.removeHandler(handler)
+
     @classmethod
     def get_logger(cls):
         """Get the logger instance."""
@@ -73,5 +160,3 @@ class PluginLogger:
         """Log a warning message."""
         logger = cls.get_logger()
         logger.warning(message)
-
-
@@ -0,0 +1,272 @@
+"""Latency histograms and counters shared by all plugin processes."""
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from ultahost_dns.config import Config
+from ultahost_dns.logger import PluginLogger
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_STARTED = time.monotonic()
+
+
+def process_runtime():
+    """Return the seconds since this process started, interpreter startup included."""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # The command name may contain spaces; fields resume after its closing parenthesis
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return max(uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK"), 0.0)
+    except (OSError, ValueError, IndexError):
+        return time.monotonic() - _STARTED
+
+
+class MetricsStore:
+    """SQLite table of metric samples that processes add their increments to."""
+
+    STORE_FILE = Path("/var/cache/ultahost_dns/metrics.sqlite")
+
+    def __init__(self, path=None):
+        """Initialize the store; the database is opened on first use."""
+        self.path = Path(path or self.STORE_FILE)
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            import sqlite3
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.path), timeout=5, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS samples ("
+                "name TEXT, labels TEXT, value REAL, PRIMARY KEY (name, labels))"
+            )
+            self.path.chmod(0o600)
+            self._conn = conn
+        return self._conn
+
+    def add(self, increments):
+        """Add ``{(name, labels_json): value}`` to the stored samples in one transaction."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for (name, labels), value in increments.items():
+                updated = conn.execute(
+                    "UPDATE samples SET value = value + ? WHERE name = ? AND labels = ?",
+                    (value, name, labels),
+                ).rowcount
+                if not updated:
+                    conn.execute(
+                        "INSERT INTO samples (name, labels, value) VALUES (?, ?, ?)",
+                        (name, labels, value),
+                    )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def samples(self):
+        """Return all samples as ``(name, labels dict, value)``, sorted by name and labels."""
+        rows = (
+            self._connect()
+            .execute("SELECT name, labels, value FROM samples ORDER BY name, labels")
+            .fetchall()
+        )
+        return [(name, json.loads(labels), value) for name, labels, value in rows]
+
+    def reset(self):
+        """Delete all samples."""
+        self._connect().execute("DELETE FROM samples")
+
+
+class Metrics:
+    """Process-local counters and latency histograms, flushed to the shared store.
+
+    Recording is a dict update. Increments are added to ``MetricsStore`` when
+    the process exits, and every ``FLUSH_INTERVAL`` seconds in long-running
+    processes. Disabled with ``"metrics_enabled": false``.
+    """
+
+    FLUSH_INTERVAL = 10
+    store = MetricsStore()
+
+    _lock = threading.Lock()
+    _pending = {}
+    _flushed_at = time.monotonic()
+    _enabled = None
+    _registered = False
+
+    @classmethod
+    def enabled(cls):
+        """Whether metrics are recorded in this process."""
+        if cls._enabled is None:
+            cls._enabled = bool(Config.get("metrics_enabled", True))
+        return cls._enabled
+
+    @staticmethod
+    def _labels(labels):
+        return json.dumps({key: str(value) for key, value in labels.items()}, sort_keys=True)
+
+    @classmethod
+    def _add(cls, items):
+        """Add ``(name, labels_json, value)`` increments, flushing when the interval passed."""
+        now = time.monotonic()
+        with cls._lock:
+            for name, labels, value in items:
+                key = (name, labels)
+                cls._pending[key] = cls._pending.get(key, 0) + value
+            if not cls._registered:
+                atexit.register(cls.flush)
+                cls._registered = True
+            due = now - cls._flushed_at >= cls.FLUSH_INTERVAL
+        if due:
+            cls.flush()
+
+    @classmethod
+    def inc(cls, name, value=1, **labels):
+        """Increment a counter."""
+        if cls.enabled():
+            cls._add([(name, cls._labels(labels), value)])
+
+    @classmethod
+    def observe(cls, name, seconds, **labels):
+        """Record a duration in the ``name`` histogram."""
+        if not cls.enabled():
+            return
+        le = next((bound for bound in BUCKETS if seconds <= bound), "+Inf")
+        base = cls._labels(labels)
+        cls._add(
+            [
+                (f"{name}_bucket", cls._labels(dict(labels, le=le)), 1),
+                (f"{name}_sum", base, seconds),
+                (f"{name}_count", base, 1),
+            ]
+        )
+
+    @classmethod
+    @contextmanager
+    def timer(cls, name, **labels):
+        """Time a block into the ``name`` histogram, counting errors in ``<name>_errors_total``."""
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            cls.inc(
+                f"{name.rsplit('_seconds', 1)[0]}_errors_total", error=type(e).__name__, **labels
+            )
+            raise
+        finally:
+            cls.observe(name, time.monotonic() - started, **labels)
+
+    @classmethod
+    def flush(cls):
+        """Add this process's pending increments to the shared store."""
+        with cls._lock:
+            pending, cls._pending = cls._pending, {}
+            cls._flushed_at = time.monotonic()
+        if not pending:
+            return
+        try:
+            cls.store.add(pending)
+        except Exception as e:
+            PluginLogger.get_logger().warning(f"Could not store metrics: {e}")
+
+
+def _histograms(samples):
+    """Group samples into ``{name: {labels_json: {"buckets", "sum", "count"}}}`` and counters."""
+    histograms = {}
+    counters = {}
+    for name, labels, value in samples:
+        for suffix in ("_bucket", "_sum", "_count"):
+            if name.endswith(suffix):
+                base = name[: -len(suffix)]
+                labels = dict(labels)
+                le = labels.pop("le", None)
+                series = histograms.setdefault(base, {}).setdefault(
+                    json.dumps(labels, sort_keys=True), {"buckets": {}, "sum": 0.0, "count": 0}
+                )
+                if suffix == "_bucket":
+                    series["buckets"][le] = value
+                else:
+                    series[suffix[1:]] = value
+                break
+        else:
+            counters.setdefault(name, {})[json.dumps(labels, sort_keys=True)] = value
+    return histograms, counters
+
+
+def _cumulative(buckets):
+    """Return ``[(le, cumulative count)]`` over all bucket bounds."""
+    total = 0
+    result = []
+    for bound in BUCKETS + ("+Inf",):
+        total += buckets.get(str(bound), 0)
+        result.append((str(bound), total))
+    return result
+
+
+def _label_text(labels, **extra):
+    labels = dict(labels, **extra)
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in sorted(labels.items())) + "}"
+
+
+def prometheus_text(samples):
+    """Render samples in the Prometheus text exposition format."""
+    histograms, counters = _histograms(samples)
+    lines = []
+    for name in sorted(histograms):
+        lines.append(f"# TYPE {name} histogram")
+        for labels_json, series in sorted(histograms[name].items()):
+            labels = json.loads(labels_json)
+            for le, count in _cumulative(series["buckets"]):
+                lines.append(f"{name}_bucket{_label_text(labels, le=le)} {count:g}")
+            lines.append(f"{name}_sum{_label_text(labels)} {series['sum']:.6f}")
+            lines.append(f"{name}_count{_label_text(labels)} {series['count']:g}")
+    for name in sorted(counters):
+        lines.append(f"# TYPE {name} counter")
+        for labels_json, value in sorted(counters[name].items()):
+            lines.append(f"{name}{_label_text(json.loads(labels_json))} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def summary(samples):
+    """Return samples as JSON-ready histograms (count, mean, estimated quantiles) and counters."""
+    histograms, counters = _histograms(samples)
+    result = {"histograms": [], "counters": []}
+    for name in sorted(histograms):
+        for labels_json, series in sorted(histograms[name].items()):
+            count = series["count"]
+            cumulative = _cumulative(series["buckets"])
+            entry = {
+                "name": name,
+                "labels": json.loads(labels_json),
+                "count": int(count),
+                "sum": round(series["sum"], 6),
+                "mean": round(series["sum"] / count, 6) if count else None,
+            }
+            for quantile in (0.5, 0.9, 0.99):
+                # Upper bound of the bucket holding the quantile
+                entry[f"p{int(quantile * 100)}"] = next(
+                    (le for le, total in cumulative if count and total >= quantile * count), None
+                )
+            result["histograms"].append(entry)
+    for name in sorted(counters):
+        for labels_json, value in sorted(counters[name].items()):
+            result["counters"].append(
+                {"name": name, "labels": json.loads(labels_json), "value": value}
+            )
+    return result
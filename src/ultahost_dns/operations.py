@@ -0,0 +1,250 @@
+"""DNS operations shared by the hook scripts and the hook daemon."""
+
+from ultahost_dns.config import Config
+from ultahost_dns.dns_template import DNSTemplate, TemplateError
+from ultahost_dns.logger import PluginLogger
+from ultahost_dns.permissions import Permissions
+from ultahost_dns.status import DENIED, FAILED, OK  # noqa: F401
+
+
+class DNSOperations:
+    """Run hook operations against a PowerDNS client.
+
+    The hook scripts use a fresh instance per invocation when the daemon is not
+    running; the daemon keeps one instance (and its HTTP session) alive.
+    """
+
+    OPERATIONS = (
+        "add_record",
+        "update_record",
+        "delete_record",
+        "create_zone",
+        "delete_zone",
+        "fetch_zone",
+        "list_zones",
+    )
+    # Operations that yield their result piece by piece
+    STREAM_OPERATIONS = ("iter_zones",)
+
+    def __init__(self, client=None, journal=None, notify=None):
+        """Initialize operations with an existing or new PowerDNS client.
+
+        With the ``write_behind`` setting, record changes are appended to the
+        journal (``journal``, or the default one) and reported done at once;
+        ``notify`` wakes the flusher that applies them. Without a ``notify``
+        (no daemon), the zone's changes are flushed before returning and a
+        change that could not be applied is reported failed.
+        """
+        if client is None:
+            # Imported here so hook scripts can use the status constants without
+            # paying for the HTTP stack when the daemon serves the request
+            from ultahost_dns.powerdns_client import PowerDNSClient
+            from ultahost_dns.zone_cache import ZoneCache
+
+            client = PowerDNSClient(cache=ZoneCache())
+        self.client = client
+        self.journal = None
+        if Config.get("write_behind", False):
+            from ultahost_dns.journal import Journal
+
+            self.journal = journal or Journal()
+        self.notify = notify
+        self.logger = PluginLogger.get_logger()
+
+    def dispatch(self, operation, params):
+        """Run a named operation with keyword parameters."""
+        if operation not in self.OPERATIONS:
+            raise ValueError(f"Unknown operation: {operation}")
+        return getattr(self, operation)(**params)
+
+    def stream(self, operation, params):
+        """Run a named streaming operation, returning an iterator of items."""
+        if operation not in self.STREAM_OPERATIONS:
+            raise ValueError(f"Unknown streaming operation: {operation}")
+        return getattr(self, operation)(**params)
+
+    def _queue(
+        self, operation, zone_name, name, record_type, content=None, ttl=3600, priority=None
+    ):
+        """Journal a record change for the flusher."""
+        params = {"name": name, "record_type": record_type}
+        if content is not None:
+            params.update(content=content, ttl=ttl, priority=priority)
+        entry_id = self.journal.append(zone_name, operation, params)
+        self.logger.info(f"Queued {operation} {name} {record_type} in zone {zone_name}")
+        if self.notify is not None:
+            self.notify()
+            return OK
+
+        from ultahost_dns.journal import JournalFlusher
+
+        # No flusher runs in the background: a change left in the journal is only
+        # retried by a later change to the zone or by flush_journal.py
+        if entry_id not in JournalFlusher(self.client, self.journal).apply_zone(zone_name):
+            self.logger.error(
+                f"Failed to apply {operation} {name} {record_type} in zone {zone_name} "
+                "via PowerDNS API"
+            )
+            return FAILED
+        return OK
+
+    def add_record(
+        self, zone_name, name, record_type, content, ttl=3600, priority=None, username="root"
+    ):
+        """Add a DNS record to PowerDNS."""
+        if not Permissions.can_manage_zone(username, zone_name):
+            self.logger.error(
+                f"User {username} does not have permission to modify zone {zone_name}"
+            )
+            return DENIED
+
+        try:
+            if self.journal is not None:
+                return self._queue(
+                    "add_record", zone_name, name, record_type, content, ttl, priority
+                )
+            if self.client.add_record(zone_name, name, record_type, content, ttl, priority):
+                self.logger.info(f"Successfully added record {name} {record_type} via PowerDNS API")
+                return OK
+            self.logger.error(f"Failed to add record {name} {record_type} via PowerDNS API")
+        except Exception as e:
+            self.logger.error(f"Exception adding record: {e}", exc_info=True)
+        return FAILED
+
+    def update_record(
+        self, zone_name, name, record_type, content, ttl=3600, priority=None, username="root"
+    ):
+        """Update a DNS record in PowerDNS."""
+        if not Permissions.can_manage_zone(username, zone_name):
+            self.logger.error(
+                f"User {username} does not have permission to modify zone {zone_name}"
+            )
+            return DENIED
+
+        try:
+            if self.journal is not None:
+                return self._queue(
+                    "update_record", zone_name, name, record_type, content, ttl, priority
+                )
+            if self.client.update_record(zone_name, name, record_type, content, ttl, priority):
+                self.logger.info(
+                    f"Successfully updated record {name} {record_type} via PowerDNS API"
+                )
+                return OK
+            self.logger.error(f"Failed to update record {name} {record_type} via PowerDNS API")
+        except Exception as e:
+            self.logger.error(f"Exception updating record: {e}", exc_info=True)
+        return FAILED
+
+    def delete_record(self, zone_name, name, record_type, username="root"):
+        """Delete a DNS record from PowerDNS."""
+        if not Permissions.can_manage_zone(username, zone_name):
+            self.logger.error(
+                f"User {username} does not have permission to modify zone {zone_name}"
+            )
+            return DENIED
+
+        try:
+            if self.journal is not None:
+                return self._queue("delete_record", zone_name, name, record_type)
+            if self.client.delete_record(zone_name, name, record_type):
+                self.logger.info(
+                    f"Successfully deleted record {name} {record_type} via PowerDNS API"
+                )
+                return OK
+            self.logger.error(f"Failed to delete record {name} {record_type} via PowerDNS API")
+        except Exception as e:
+            self.logger.error(f"Exception deleting record: {e}", exc_info=True)
+        return FAILED
+
+    def create_zone(self, zone_name, template_name="default", username="root"):
+        """Create a zone in PowerDNS populated from a DNS template."""
+        if not Permissions.can_manage_zone(username, zone_name):
+            self.logger.error(
+                f"User {username} does not have permission to create zone {zone_name}"
+            )
+            return DENIED
+
+        # The template RRsets are sent inline, so the zone is created complete in one POST
+        try:
+            records = DNSTemplate.get_template_records(zone_name, template_name)
+        except TemplateError as e:
+            self.logger.error(f"Not creating zone {zone_name}: {e}")
+            return FAILED
+        if not self.client.create_zone(zone_name, records=records):
+            self.logger.error(f"Failed to create zone {zone_name} via PowerDNS API")
+            return FAILED
+
+        self.logger.info(
+            f"Successfully created zone {zone_name} via PowerDNS API (template: {template_name})"
+        )
+        return OK
+
+    def delete_zone(self, zone_name, username="root"):
+        """Delete a zone from PowerDNS."""
+        if not Permissions.can_manage_zone(username, zone_name):
+            self.logger.error(
+                f"User {username} does not have permission to delete zone {zone_name}"
+            )
+            return DENIED
+
+        if self.journal is not None:
+            self.journal.discard(zone_name)
+        if self.client.delete_zone(zone_name):
+            self.logger.info(f"Successfully deleted zone {zone_name} via PowerDNS API")
+            return OK
+        self.logger.error(f"Failed to delete zone {zone_name} via PowerDNS API")
+        return FAILED
+
+    def fetch_zone(self, zone_name):
+        """Fetch a zone and format it as a cPanel API2 fetchzone response."""
+        try:
+            zone_data = self.client.get_zone_cached(zone_name)
+            if not zone_data:
+                self.logger.warning(f"Zone {zone_name} not found in PowerDNS")
+                return {"status": 0, "statusmsg": f"Zone {zone_name} not found", "data": {}}
+
+            records = self.client.records_from_zone(zone_data)
+
+            result = {
+                "status": 1,
+                "statusmsg": "OK",
+                "data": {
+                    "zone": zone_name.rstrip("."),
+                    "records": [record.to_api2(zone_name) for record in records],
+                },
+            }
+
+            self.logger.info(f"Fetched zone {zone_name} with {len(records)} records")
+            return result
+        except Exception as e:
+            self.logger.error(f"Exception fetching zone {zone_name}: {e}", exc_info=True)
+            return {"status": 0, "statusmsg": f"Error: {str(e)}", "data": {}}
+
+    def iter_zones(self):
+        """Yield zones as cPanel API2 listzones entries while PowerDNS sends the listing."""
+        for zone in self.client.iter_zones(dnssec=False):
+            zone_name = zone.get("name", "").rstrip(".")
+            if zone_name:
+                yield {
+                    "domain": zone_name,
+                    "zone": zone_name,
+                    "zonefile": f"{zone_name}.db",  # cPanel expects zonefile
+                }
+
+    def list_zones(self):
+        """List zones and format them as a cPanel API2 listzones response."""
+        try:
+            zones = list(self.iter_zones())
+        except Exception as e:
+            self.logger.error(f"Exception listing zones: {e}", exc_info=True)
+            return {"status": 0, "statusmsg": f"Error: {str(e)}", "data": {}}
+
+        self.logger.info(f"Listed {len(zones)} zones from PowerDNS API")
+        return {
+            "status": 1,
+            "statusmsg": "OK",
+            "data": {
+                "zone": zones,  # Note: cPanel expects "zone" not "zones"
+            },
+        }
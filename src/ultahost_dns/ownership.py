@@ -0,0 +1,196 @@
+"""Indexed domain/user/reseller ownership map for permission checks."""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from ultahost_dns.logger import PluginLogger
+
+
+class OwnershipIndex:
+    """Map domains to cPanel users and users to their owning reseller.
+
+    The index is built from /etc/userdomains and /etc/trueuserowners (or from
+    ``whmapi1 listaccts`` when those files are missing), persisted to disk, and
+    rebuilt when a source file changes or the index is older than ``ttl``.
+    Lookups are dict accesses.
+    """
+
+    USERDOMAINS_FILE = Path("/etc/userdomains")
+    TRUEUSEROWNERS_FILE = Path("/etc/trueuserowners")
+    INDEX_FILE = Path("/var/cache/ultahost_dns/ownership.json")
+    WHMAPI1 = "/usr/local/cpanel/bin/whmapi1"
+    TTL = 300
+    # Minimum seconds between checks of the source files within one process
+    CHECK_INTERVAL = 2
+
+    def __init__(self, userdomains_file=None, trueuserowners_file=None, index_file=None, ttl=None):
+        """Initialize the index; it is loaded on first lookup."""
+        self.userdomains_file = Path(userdomains_file or self.USERDOMAINS_FILE)
+        self.trueuserowners_file = Path(trueuserowners_file or self.TRUEUSEROWNERS_FILE)
+        self.index_file = Path(index_file or self.INDEX_FILE)
+        self.ttl = self.TTL if ttl is None else ttl
+        self.logger = PluginLogger.get_logger()
+        self._lock = threading.Lock()
+        self._index = None
+        self._checked_at = 0.0
+
+    def _source_mtimes(self):
+        """Return the modification time and size of the source files (None if missing)."""
+        mtimes = {}
+        for path in (self.userdomains_file, self.trueuserowners_file):
+            try:
+                stat = os.stat(path)
+                mtimes[str(path)] = [stat.st_mtime_ns, stat.st_size]
+            except OSError:
+                mtimes[str(path)] = None
+        return mtimes
+
+    def _is_current(self, index, mtimes):
+        """Whether an index was built from the current sources and is within its TTL."""
+        return index.get("sources") == mtimes and time.time() - index.get("built_at", 0) < self.ttl
+
+    @staticmethod
+    def _parse_pairs(path):
+        """Parse a ``key: value`` cPanel account file into a dict."""
+        pairs = {}
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                key, sep, value = line.partition(":")
+                key = key.strip().lower()
+                value = value.strip()
+                if sep and key and value and key != "*":
+                    pairs[key] = value
+        return pairs
+
+    def _build_from_whmapi(self):
+        """Build the maps from whmapi1 listaccts (main domains only)."""
+        import subprocess
+
+        result = subprocess.run(
+            [self.WHMAPI1, "--output=json", "listaccts", "want=user,domain,owner"],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=30,
+        )
+        domains = {}
+        owners = {}
+        for account in json.loads(result.stdout).get("data", {}).get("acct", []):
+            user = account.get("user")
+            if not user:
+                continue
+            if account.get("domain"):
+                domains[account["domain"].lower()] = user
+            owners[user] = account.get("owner") or "root"
+        return domains, owners
+
+    def _build(self, mtimes):
+        """Build the index from the current sources."""
+        import subprocess
+
+        try:
+            if mtimes[str(self.userdomains_file)] is not None:
+                domains = self._parse_pairs(self.userdomains_file)
+                owners = {}
+                if mtimes[str(self.trueuserowners_file)] is not None:
+                    owners = self._parse_pairs(self.trueuserowners_file)
+            else:
+                domains, owners = self._build_from_whmapi()
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            self.logger.error(f"Error building domain ownership index: {e}")
+            domains, owners = {}, {}
+
+        users = {}
+        for domain, user in domains.items():
+            users.setdefault(user, []).append(domain)
+        resellers = {}
+        for user, owner in owners.items():
+            resellers.setdefault(owner, []).append(user)
+
+        return {
+            "sources": mtimes,
+            "built_at": time.time(),
+            "domains": domains,
+            "owners": owners,
+            "users": users,
+            "resellers": resellers,
+        }
+
+    def _save(self, index):
+        """Persist the index for other processes."""
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_file.with_name(self.index_file.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.index_file)
+        except OSError as e:
+            self.logger.warning(f"Could not persist domain ownership index: {e}")
+
+    def _load_saved(self):
+        """Load the persisted index, if any."""
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _get(self):
+        """Return the current index, reloading or rebuilding it when stale."""
+        now = time.monotonic()
+        with self._lock:
+            if self._index is not None and now - self._checked_at < self.CHECK_INTERVAL:
+                return self._index
+
+            mtimes = self._source_mtimes()
+            if self._index is None or not self._is_current(self._index, mtimes):
+                index = self._load_saved()
+                if index is None or not self._is_current(index, mtimes):
+                    index = self._build(mtimes)
+                    self._save(index)
+                self._index = index
+            self._checked_at = now
+            return self._index
+
+    def refresh(self):
+        """Rebuild the index from the sources now."""
+        with self._lock:
+            self._index = self._build(self._source_mtimes())
+            self._save(self._index)
+            self._checked_at = time.monotonic()
+
+    def owner_of_domain(self, domain):
+        """Return the user owning a domain, or its closest listed parent domain."""
+        domains = self._get()["domains"]
+        domain = domain.rstrip(".").lower()
+        while domain:
+            user = domains.get(domain)
+            if user is not None:
+                return user
+            _, _, domain = domain.partition(".")
+        return None
+
+    def reseller_of(self, username):
+        """Return the reseller (or root) owning a user."""
+        return self._get()["owners"].get(username)
+
+    def domains_of(self, username):
+        """Return the domains owned by a user."""
+        return list(self._get()["users"].get(username, []))
+
+    def users_of_reseller(self, reseller):
+        """Return the users owned by a reseller."""
+        return list(self._get()["resellers"].get(reseller, []))
+
+    def all_domains(self):
+        """Return every known domain."""
+        return list(self._get()["domains"])
+
+    def user_exists(self, username):
+        """Whether a cPanel user is known to the index."""
+        index = self._get()
+        return username in index["owners"] or username in index["users"]
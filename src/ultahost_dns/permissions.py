@@ -1,106 +1,180 @@
 """Permission management for Ultahost DNS plugin."""
 
-import subprocess
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
 from pathlib import Path
 
 from ultahost_dns.logger import PluginLogger
+from ultahost_dns.metrics import Metrics
+from ultahost_dns.ownership import OwnershipIndex
+
+
+class AccountBackend(ABC):
+    """Source of cPanel account types used by Permissions."""
+
+    @abstractmethod
+    def is_reseller(self, username):
+        """Whether a user is a reseller."""
+
+    @abstractmethod
+    def user_exists(self, username):
+        """Whether a cPanel account exists."""
+
+
+class CpanelAccountBackend(AccountBackend):
+    """Account types read in-process from cPanel's account files."""
+
+    RESELLERS_FILE = Path("/var/cpanel/resellers")
+    USERS_DIR = Path("/var/cpanel/users")
+
+    def __init__(self, ownership, resellers_file=None, users_dir=None):
+        """Initialize the backend."""
+        self.ownership = ownership
+        self.resellers_file = Path(resellers_file or self.RESELLERS_FILE)
+        self.users_dir = Path(users_dir or self.USERS_DIR)
+        self._lock = threading.Lock()
+        self._resellers = frozenset()
+        self._resellers_mtime = None
+
+    @classmethod
+    def available(cls):
+        """Whether this host has cPanel account files."""
+        return cls.USERS_DIR.is_dir()
+
+    def _load_resellers(self):
+        """Return the reseller names, re-reading the file when it changed."""
+        with self._lock:
+            try:
+                mtime = os.stat(self.resellers_file).st_mtime_ns
+            except OSError:
+                return frozenset()
+
+            if mtime != self._resellers_mtime:
+                resellers = set()
+                # Format: "reseller:acl1,acl2,..."
+                with open(self.resellers_file, "r", encoding="utf-8", errors="replace") as f:
+                    for line in f:
+                        name = line.partition(":")[0].strip()
+                        if name:
+                            resellers.add(name)
+                self._resellers = frozenset(resellers)
+                self._resellers_mtime = mtime
+            return self._resellers
+
+    def is_reseller(self, username):
+        """Whether a user is listed in the cPanel reseller file."""
+        return username in self._load_resellers()
+
+    def user_exists(self, username):
+        """Whether a cPanel account exists."""
+        if not username or "/" in username:
+            return False
+        return (self.users_dir / username).is_file() or self.ownership.user_exists(username)
+
+
+class StaticAccountBackend(AccountBackend):
+    """Fixed account lists, for hosts without cPanel (and for tests)."""
+
+    def __init__(self, resellers=(), users=()):
+        """Initialize the backend."""
+        self.resellers = set(resellers)
+        self.users = set(users) | self.resellers
+
+    def is_reseller(self, username):
+        """Whether a user is a reseller."""
+        return username in self.resellers
+
+    def user_exists(self, username):
+        """Whether an account exists."""
+        return username in self.users
 
 
 class Permissions:
     """Manage user permissions for DNS zones."""
 
     logger = PluginLogger.get_logger()
+    ownership = OwnershipIndex()
+    # Set to inject an AccountBackend; chosen on first use otherwise
+    backend = None
+    # Seconds a resolved user type is reused within one process
+    USER_TYPE_TTL = 30
+    _user_types = {}
+
+    @classmethod
+    def get_backend(cls):
+        """Return the account backend, choosing one for this host on first use."""
+        if cls.backend is None:
+            if CpanelAccountBackend.available():
+                cls.backend = CpanelAccountBackend(cls.ownership)
+            else:
+                cls.logger.debug("cPanel account files not found, using an empty account backend")
+                cls.backend = StaticAccountBackend()
+        return cls.backend
 
     @classmethod
     def is_root(cls):
         """Check if current user is root."""
-        try:
-            result = subprocess.run(
-                ["whoami"],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=5,
-            )
-            return result.stdout.strip() == "root"
-        except (subprocess.SubprocessError, subprocess.TimeoutExpired):
-            return False
+        return os.geteuid() == 0
 
     @classmethod
     def get_user_type(cls, username):
         """Get user type: root, reseller, or user."""
+        now = time.monotonic()
+        cached = cls._user_types.get(username)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        user_type = cls._resolve_user_type(username)
+        cls._user_types[username] = (user_type, now + cls.USER_TYPE_TTL)
+        return user_type
+
+    @classmethod
+    def _resolve_user_type(cls, username):
+        """Resolve a user type without the memo."""
         if cls.is_root() and username == "root":
             return "root"
 
-        try:
-            # Check if user is a reseller
-            result = subprocess.run(
-                ["/usr/local/cpanel/bin/whmapi1", "listaccts", "search=" + username, "searchtype=reseller"],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=10,
-            )
-            if username in result.stdout:
-                return "reseller"
-
-            # Check if user exists
-            result = subprocess.run(
-                ["/usr/local/cpanel/bin/whmapi1", "listaccts", "search=" + username],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=10,
-            )
-            if username in result.stdout:
-                return "user"
-
-            return None
-        except (subprocess.SubprocessError, subprocess.TimeoutExpired) as e:
-            cls.logger.error(f"Error checking user type for {username}: {e}")
-            return None
+        backend = cls.get_backend()
+        if backend.is_reseller(username):
+            return "reseller"
+        if backend.user_exists(username):
+            return "user"
+        return None
+
+    @classmethod
+    def clear_cache(cls):
+        """Forget memoized user types."""
+        cls._user_types.clear()
 
     @classmethod
     def can_manage_zone(cls, username, zone_name):
         """Check if user can manage a specific zone."""
+        with Metrics.timer("ultahost_dns_permission_check_seconds"):
+            allowed = cls._can_manage_zone(username, zone_name)
+        if not allowed:
+            Metrics.inc("ultahost_dns_permission_denied_total")
+        return allowed
+
+    @classmethod
+    def _can_manage_zone(cls, username, zone_name):
         user_type = cls.get_user_type(username)
 
         if user_type == "root":
             return True
 
+        owner = cls.ownership.owner_of_domain(zone_name)
+        if owner is None:
+            return False
+
         if user_type == "reseller":
-            # Reseller can manage zones for their accounts
-            try:
-                result = subprocess.run(
-                    ["/usr/local/cpanel/bin/whmapi1", "listaccts", "searchtype=reseller", "reseller=" + username],
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                    timeout=10,
-                )
-                # Check if zone belongs to any of reseller's accounts
-                # This is simplified - in production, check actual domain ownership
-                return True  # Simplified for now
-            except (subprocess.SubprocessError, subprocess.TimeoutExpired):
-                return False
+            # Reseller can manage their own zones and the zones of their accounts
+            return owner == username or cls.ownership.reseller_of(owner) == username
 
         if user_type == "user":
             # User can only manage their own zones
-            try:
-                # Get user's domains
-                result = subprocess.run(
-                    ["/usr/local/cpanel/bin/whmapi1", "listaccts", "search=" + username],
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                    timeout=10,
-                )
-                # Check if zone_name matches user's domain
-                # Simplified check - zone should match user's domain
-                domain = zone_name.rstrip(".")
-                return domain in result.stdout or zone_name in result.stdout
-            except (subprocess.SubprocessError, subprocess.TimeoutExpired):
-                return False
+            return owner == username
 
         return False
 
@@ -108,44 +182,19 @@ class Permissions:
     def get_user_domains(cls, username):
         """Get all domains for a user."""
         user_type = cls.get_user_type(username)
-        domains = []
-
-        try:
-            if user_type == "root":
-                # Root can see all domains
-                result = subprocess.run(
-                    ["/usr/local/cpanel/bin/whmapi1", "listaccts"],
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                    timeout=10,
-                )
-                # Parse domains from output (simplified)
-                domains = []  # Would need proper parsing
-            elif user_type == "reseller":
-                result = subprocess.run(
-                    ["/usr/local/cpanel/bin/whmapi1", "listaccts", "reseller=" + username],
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                    timeout=10,
-                )
-                # Parse domains from output
-                domains = []  # Would need proper parsing
-            elif user_type == "user":
-                result = subprocess.run(
-                    ["/usr/local/cpanel/bin/whmapi1", "listaccts", "search=" + username],
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                    timeout=10,
-                )
-                # Parse user's domain
-                domains = []  # Would need proper parsing
-
-        except (subprocess.SubprocessError, subprocess.TimeoutExpired) as e:
-            cls.logger.error(f"Error getting domains for {username}: {e}")
-
-        return domains
 
+        if user_type == "root":
+            # Root can see all domains
+            return cls.ownership.all_domains()
+
+        if user_type == "reseller":
+            domains = cls.ownership.domains_of(username)
+            for user in cls.ownership.users_of_reseller(username):
+                if user != username:
+                    domains.extend(cls.ownership.domains_of(user))
+            return domains
+
+        if user_type == "user":
+            return cls.ownership.domains_of(username)
 
+        return []
@@ -1,24 +1,479 @@
 """PowerDNS v4 API client."""
 
-import json
-from typing import Any, Dict, List, Optional
+import codecs
+import random
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import requests
 
-from ultahost_dns.config import Config
-from ultahost_dns.logger import PluginLogger
+from ultahost_dns.circuit_breaker import CircuitBreaker, CircuitOpenError
+from ultahost_dns.config import Config, Endpoint
+from ultahost_dns.http_common import IDEMPOTENT_METHODS, not_sent
+from ultahost_dns.json_stream import JSONStream
+from ultahost_dns.logger import LazyJSON, PluginLogger
+from ultahost_dns.metrics import Metrics
+from ultahost_dns.records import Record, RRset
+from ultahost_dns.zone_cache import ZoneCache
 
 
-class PowerDNSClient:
-    """Client for PowerDNS v4 API."""
+def _zone_fqdn(zone_name: str) -> str:
+    """Return a zone name with its trailing dot."""
+    return zone_name if zone_name.endswith(".") else zone_name + "."
+
+
+def _record_fqdn(name: str, zone_name: str) -> str:
+    """Qualify a record name (relative, ``@`` or FQDN) inside a zone ending with a dot."""
+    if name in ("", "@"):
+        return zone_name
+    if not name.endswith("."):
+        name += "."
+    if name == zone_name or name.endswith("." + zone_name):
+        return name
+    return f"{name.rstrip('.')}.{zone_name}"
+
 
-    def __init__(self, api_url: Optional[str] = None, api_key: Optional[str] = None):
-        """Initialize PowerDNS client."""
-        self.api_url = api_url or Config.get_api_url()
-        self.api_key = api_key or Config.get_api_key()
+class RRsetBatch:
+    """Collect RRset changes for one zone and send them as a single PATCH.
+
+    Records added for the same (name, type) are grouped into one full RRset, so
+    several NS or MX lines no longer overwrite each other. A later ``delete`` or
+    ``replace`` of a (name, type) supersedes earlier changes to it.
+    """
+
+    def __init__(self, client: "PowerDNSClient", zone_name: str):
+        """Initialize an empty batch for a zone."""
+        self.client = client
+        self.zone_name = _zone_fqdn(zone_name)
+        self._rrsets: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def add(
+        self,
+        name: str,
+        record_type: str,
+        content: str,
+        ttl: int = 3600,
+        priority: Optional[int] = None,
+    ) -> "RRsetBatch":
+        """Add a record to the (name, type) RRset."""
+        name = _record_fqdn(name, self.zone_name)
+        if priority is not None and record_type in ["MX", "SRV"]:
+            content = f"{priority} {content}"
+
+        rrset = self._rrsets.get((name, record_type))
+        if rrset is None or rrset["changetype"] != "REPLACE":
+            rrset = {
+                "name": name,
+                "type": record_type,
+                "ttl": ttl,
+                "changetype": "REPLACE",
+                "records": [],
+            }
+            self._rrsets[(name, record_type)] = rrset
+
+        rrset["ttl"] = ttl
+        if all(record["content"] != content for record in rrset["records"]):
+            rrset["records"].append({"content": content, "disabled": False})
+        return self
+
+    def replace(
+        self,
+        name: str,
+        record_type: str,
+        contents: List[str],
+        ttl: int = 3600,
+        priority: Optional[int] = None,
+    ) -> "RRsetBatch":
+        """Replace the (name, type) RRset with exactly ``contents``."""
+        self._rrsets.pop((_record_fqdn(name, self.zone_name), record_type), None)
+        for content in contents:
+            self.add(name, record_type, content, ttl, priority)
+        return self
+
+    def delete(self, name: str, record_type: str) -> "RRsetBatch":
+        """Delete the (name, type) RRset."""
+        name = _record_fqdn(name, self.zone_name)
+        self._rrsets[(name, record_type)] = {
+            "name": name,
+            "type": record_type,
+            "changetype": "DELETE",
+        }
+        return self
+
+    def rrsets(self) -> List[Dict[str, Any]]:
+        """Return the RRset changes in the order they were first touched."""
+        return list(self._rrsets.values())
+
+    def __len__(self) -> int:
+        """Return the number of RRsets changed by this batch."""
+        return len(self._rrsets)
+
+    def send(self) -> None:
+        """Send the batch as one PATCH request, raising on API errors."""
+        if not self._rrsets:
+            return
+        try:
+            self.client._request(
+                "PATCH", f"/zones/{self.zone_name}", data={"rrsets": self.rrsets()}
+            )
+        finally:
+            self.client.invalidate_cached_zone(self.zone_name)
+
+    def commit(self) -> bool:
+        """Send the batch and report whether it was applied."""
+        try:
+            self.send()
+        except requests.exceptions.RequestException as e:
+            self.client.logger.error(
+                f"Failed to apply {len(self)} RRset changes to zone {self.zone_name}: {e}"
+            )
+            return False
+        self.client.logger.info(f"Applied {len(self)} RRset changes to zone {self.zone_name}")
+        return True
+
+
+class EndpointState:
+    """Session, circuit breaker and observed latency of one PowerDNS API node."""
+
+    # Weight of the newest sample in the latency moving average
+    EWMA_ALPHA = 0.3
+
+    def __init__(self, endpoint: Endpoint, breaker: CircuitBreaker):
+        """Initialize the state of an endpoint."""
+        self.url = endpoint.url
+        self.api_key = endpoint.api_key
+        self.weight = endpoint.weight
+        self.primary = endpoint.primary
+        self.breaker = breaker
+        self.latency: Optional[float] = None
+        self.session: Any = None
+
+    def observe(self, seconds: float) -> None:
+        """Fold a response time into the latency average."""
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += self.EWMA_ALPHA * (seconds - self.latency)
+
+    @property
+    def healthy(self) -> bool:
+        """Whether requests may currently be sent to this endpoint."""
+        return not self.breaker.is_open()
+
+    def score(self) -> float:
+        """Latency scaled down by weight; lower is better."""
+        return self.latency / self.weight if self.weight else float("inf")
+
+
+def _api_path(endpoint: str) -> str:
+    """Return the API path for an endpoint given in any of the accepted forms."""
+    # Endpoint should already include /api/v1/servers/localhost if needed
+    # or we construct it here
+    if endpoint.startswith("/api/v1"):
+        # Full endpoint provided
+        return endpoint
+    if endpoint.startswith("/servers/"):
+        # Endpoint starts with /servers/
+        return f"/api/v1{endpoint}"
+    # Relative endpoint, add /api/v1/servers/localhost
+    return f"/api/v1/servers/localhost{endpoint}"
+
+
+def _api_route(path: str) -> str:
+    """Return an API path with the server and zone names replaced, for grouping metrics."""
+    parts = path.split("?", 1)[0].split("/")
+    # ["", "api", "v1", "servers", <server>, "zones", <zone>, ...]
+    if len(parts) > 4 and parts[3] == "servers":
+        parts[4] = "{server}"
+    if len(parts) > 6 and parts[5] == "zones":
+        parts[6] = "{zone}"
+    return "/".join(parts)
+
+
+class RequestAttempts:
+    """Failover, retry and circuit breaker decisions for one API request.
+
+    The client only does the I/O: it sends the request to ``next_endpoint()``,
+    reports the outcome with ``failed`` or ``answered`` and, when either asks
+    for another attempt, waits ``delay()`` seconds first. Idempotent requests
+    are retried on connection errors, timeouts and 429/502/503/504 responses,
+    moving on to the next candidate endpoint; other requests only when the
+    connection could not be opened (refused, unreachable or timed out), since
+    the server cannot have acted on them.
+    Backoff applies once every candidate was tried.
+    """
+
+    def __init__(self, client: "PowerDNSClientBase", method: str, path: str):
+        """Initialize the attempts of a request."""
+        self.client = client
+        self.method = method
+        self.path = path
+        self.candidates = client._candidates(method)
+        self.idempotent = method.upper() in client.IDEMPOTENT_METHODS
+        self.max_attempts = client.max_retries + len(self.candidates)
+        self.attempt = 0
+        self.endpoint: Optional[EndpointState] = None
+        self._index = 0
+
+    def next_endpoint(self) -> EndpointState:
+        """Return the endpoint for the next attempt, skipping those whose breaker is open."""
+        for _ in self.candidates:
+            endpoint = self.candidates[self._index % len(self.candidates)]
+            self._index += 1
+            if endpoint.breaker.allow():
+                self.endpoint = endpoint
+                return endpoint
+        raise CircuitOpenError(
+            f"No PowerDNS API endpoint is available for {self.method} {self.path}"
+        )
+
+    def failed(self, error: requests.exceptions.RequestException, seconds: float) -> bool:
+        """Record an attempt that got no response; return whether to try again."""
+        self.client._record_attempt(self.method, self.path, seconds, type(error).__name__)
+        self.endpoint.breaker.record_failure()
+        retryable = self.idempotent or not_sent(error)
+        return retryable and self._another()
+
+    def answered(self, response: Any, seconds: float) -> bool:
+        """Record an attempt that got a response; return whether to try again instead."""
+        self.endpoint.observe(seconds)
+        status = response.status_code
+        error = isinstance(status, int) and status >= 400
+        self.client._record_attempt(self.method, self.path, seconds, str(status) if error else None)
+        if isinstance(status, int) and status >= 500:
+            self.endpoint.breaker.record_failure()
+        else:
+            self.endpoint.breaker.record_success()
+        return status in self.client.RETRY_STATUSES and self.idempotent and self._another()
+
+    def _another(self) -> bool:
+        """Count a failed attempt; return whether attempts are left."""
+        if self.attempt + 1 >= self.max_attempts:
+            return False
+        self.attempt += 1
+        return True
+
+    def delay(self) -> float:
+        """Return the seconds to wait before the next attempt, logging it."""
+        failed = f"PowerDNS API {self.method} {self.endpoint.url}{self.path} failed"
+        if self.attempt < len(self.candidates):
+            self.client.logger.warning(f"{failed}, trying the next endpoint")
+            return 0.0
+        retry = self.attempt - len(self.candidates) + 1
+        delay = self.client._backoff(retry)
+        self.client.logger.warning(
+            f"{failed}, retry {retry}/{self.client.max_retries} in {delay:.2f}s"
+        )
+        return delay
+
+
+class PowerDNSClientBase:
+    """Settings, endpoint selection and response helpers shared by the API clients."""
+
+    CONNECT_TIMEOUT = 3.05
+    READ_TIMEOUT = 30
+    MAX_RETRIES = 2
+    RETRY_BACKOFF = 0.2
+    RETRY_BACKOFF_MAX = 2.0
+    RETRY_STATUSES = frozenset((429, 502, 503, 504))
+    IDEMPOTENT_METHODS = IDEMPOTENT_METHODS
+
+    READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+    WRITE_POLICIES = ("failover", "primary")
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        cache: Optional[ZoneCache] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """Initialize the client settings and endpoints.
+
+        With a ``cache``, ``get_zone_cached`` serves zones from it and every write
+        made through this client invalidates the zone it touched. Timeouts and
+        retries come from the ``connect_timeout``, ``read_timeout`` and
+        ``max_retries`` settings.
+
+        Without ``api_url`` the client uses every configured endpoint: reads go to
+        the fastest healthy one, writes to the primary and, with the ``failover``
+        ``write_policy`` (the default), to the secondaries while it is down. Each
+        endpoint has a circuit breaker shared by all processes using its URL;
+        ``breaker`` replaces the primary's.
+        """
+        if api_url:
+            endpoints = (
+                Endpoint(
+                    url=api_url.rstrip("/"), api_key=api_key or Config.get_api_key(), primary=True
+                ),
+            )
+        else:
+            endpoints = Config.get_endpoints() or (
+                Endpoint(url="", api_key=api_key or "", primary=True),
+            )
+            if api_key:
+                endpoints = tuple(endpoint._replace(api_key=api_key) for endpoint in endpoints)
+
+        self.cache = cache
+        self.timeout = (
+            float(Config.get("connect_timeout", self.CONNECT_TIMEOUT)),
+            float(Config.get("read_timeout", self.READ_TIMEOUT)),
+        )
+        self.max_retries = max(0, int(Config.get("max_retries", self.MAX_RETRIES)))
+        self.write_policy = Config.get("write_policy", "failover")
+        if self.write_policy not in self.WRITE_POLICIES:
+            self.write_policy = "failover"
         self.logger = PluginLogger.get_logger()
-        self.session = requests.Session()
-        self.session.headers.update({"X-API-Key": self.api_key})
+        self.endpoints = [
+            EndpointState(
+                endpoint,
+                (breaker if breaker and endpoint.primary else None)
+                or CircuitBreaker(endpoint.url, probe_timeout=sum(self.timeout)),
+            )
+            for endpoint in endpoints
+        ]
+
+        primary = self.endpoints[0]
+        self.api_url = primary.url
+        self.api_key = primary.api_key
+        self.breaker = primary.breaker
+
+    def _candidates(self, method: str) -> List[EndpointState]:
+        """Return the endpoints to try for a request, in order of preference."""
+        if method.upper() not in self.READ_METHODS:
+            if self.write_policy == "primary":
+                return self.endpoints[:1]
+            return self.endpoints
+
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+        measured = sorted((e for e in healthy if e.latency is not None), key=EndpointState.score)
+        unmeasured = [e for e in healthy if e.latency is None and e.weight > 0]
+        # Spread reads over endpoints without samples yet in proportion to their weight
+        ordered = []
+        while unmeasured:
+            pick = random.choices(unmeasured, weights=[e.weight for e in unmeasured])[0]
+            unmeasured.remove(pick)
+            ordered.append(pick)
+        ordered.extend(measured)
+        ordered.extend(e for e in self.endpoints if e not in ordered)
+        return ordered
+
+    def _attempts(self, method: str, path: str) -> RequestAttempts:
+        """Return the failover and retry decisions for one request."""
+        return RequestAttempts(self, method, path)
+
+    def _backoff(self, retry: int) -> float:
+        """Return the delay before a retry: full jitter up to the exponential backoff."""
+        return random.uniform(0, min(self.RETRY_BACKOFF_MAX, self.RETRY_BACKOFF * 2**retry))
+
+    @staticmethod
+    def _record_attempt(
+        method: str, path: str, seconds: float, error: Optional[str] = None
+    ) -> None:
+        """Record the duration of one request attempt and, if it failed, the status or exception."""
+        route = _api_route(path)
+        Metrics.observe("ultahost_dns_pdns_request_seconds", seconds, method=method, endpoint=route)
+        if error is not None:
+            Metrics.inc(
+                "ultahost_dns_pdns_request_errors_total", method=method, endpoint=route, error=error
+            )
+
+    def invalidate_cached_zone(self, zone_name: str) -> None:
+        """Drop a zone from the zone cache after it was modified."""
+        if self.cache is not None:
+            self.cache.invalidate(zone_name)
+
+    @staticmethod
+    def zone_document(
+        zone_name: str,
+        kind: str = "Native",
+        nameservers: Optional[List[str]] = None,
+        records: Optional[List[Record]] = None,
+    ) -> Dict[str, Any]:
+        """Build the zone creation payload, with ``records`` grouped into RRsets."""
+        zone_name = _zone_fqdn(zone_name)
+        zone_data = {
+            "name": zone_name,
+            "kind": kind,
+        }
+
+        rrsets = []
+        if records:
+            batch = RRsetBatch(None, zone_name)
+            for record in records:
+                batch.add(record.name, record.type, record.content, record.ttl)
+            # Zone creation takes plain RRsets, without a changetype
+            rrsets = [
+                {key: value for key, value in rrset.items() if key != "changetype"}
+                for rrset in batch.rrsets()
+            ]
+            zone_data["rrsets"] = rrsets
+
+        # PowerDNS rejects a nameservers list alongside an apex NS RRset
+        has_apex_ns = any(rrset["name"] == zone_name and rrset["type"] == "NS" for rrset in rrsets)
+        if nameservers and not has_apex_ns:
+            zone_data["nameservers"] = nameservers
+        return zone_data
+
+    @staticmethod
+    def zones_from_response(response: Any) -> List[Dict[str, Any]]:
+        """Return the zone list from a ``GET /zones`` response."""
+        # PowerDNS API returns a list directly, not a dict with "zones" key
+        if isinstance(response, list):
+            return response
+        # Fallback: if it's a dict with "zones" key
+        if isinstance(response, dict):
+            return response.get("zones", [])
+        return []
+
+    @staticmethod
+    def rrset_records(rrset: Dict[str, Any]) -> Iterator[Record]:
+        """Yield the records of one PowerDNS rrset."""
+        return RRset.from_api(rrset).records()
+
+    @classmethod
+    def records_from_zone(cls, zone: Dict[str, Any]) -> List[Record]:
+        """Flatten the RRsets of an already fetched zone document into records."""
+        records = []
+        for rrset in zone.get("rrsets", []):
+            records.extend(cls.rrset_records(rrset))
+        return records
+
+
+class PowerDNSClient(PowerDNSClientBase):
+    """Client for PowerDNS v4 API."""
+
+    STREAM_CHUNK_SIZE = 64 * 1024
+    TRANSPORTS = ("requests", "http.client")
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        cache: Optional[ZoneCache] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional[str] = None,
+    ):
+        """Initialize PowerDNS client with one HTTP session per endpoint.
+
+        ``transport`` (the ``http_transport`` setting) is ``requests`` (the
+        default) or ``http.client``, the lean standard-library transport; both
+        raise the same ``requests`` exceptions.
+        """
+        super().__init__(api_url, api_key, cache, breaker)
+        self.transport = transport or Config.get("http_transport", "requests")
+        if self.transport not in self.TRANSPORTS:
+            self.logger.warning(f"Unknown http_transport {self.transport!r}, using requests")
+            self.transport = "requests"
+        for endpoint in self.endpoints:
+            if self.transport == "http.client":
+                from ultahost_dns.transport import HTTPClientTransport
+
+                endpoint.session = HTTPClientTransport()
+            else:
+                endpoint.session = requests.Session()
+            endpoint.session.headers.update({"X-API-Key": endpoint.api_key})
+        self.session = self.endpoints[0].session
 
     def _request(
         self,
@@ -28,31 +483,14 @@ class PowerDNSClient:
         params: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Make API request."""
-        # Construct URL - endpoint should already include /api/v1/servers/localhost if needed
-        # or we construct it here
-        if endpoint.startswith("/api/v1"):
-            # Full endpoint provided
-            url = f"{self.api_url.rstrip('/')}{endpoint}"
-        elif endpoint.startswith("/servers/"):
-            # Endpoint starts with /servers/
-            url = f"{self.api_url.rstrip('/')}/api/v1{endpoint}"
-        else:
-            # Relative endpoint, add /api/v1/servers/localhost
-            url = f"{self.api_url.rstrip('/')}/api/v1/servers/localhost{endpoint}"
+        path = _api_path(endpoint)
 
-        try:
-            self.logger.debug(f"PowerDNS API {method} request: {url}")
-            if data:
-                self.logger.debug(f"Request data: {json.dumps(data, indent=2)}")
-
-            response = self.session.request(
-                method=method,
-                url=url,
-                json=data,
-                params=params,
-                timeout=30,
-            )
+        self.logger.debug("PowerDNS API %s request: %s", method, path)
+        if data:
+            self.logger.debug("Request data: %s", LazyJSON(data))
 
+        try:
+            response = self._send(method, path, data, params)
             response.raise_for_status()
 
             if response.content:
@@ -60,31 +498,125 @@ class PowerDNSClient:
             return {}
 
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"PowerDNS API error: {e}")
-            if hasattr(e, "response") and e.response is not None:
-                try:
-                    error_detail = e.response.json()
-                    self.logger.error(f"Error details: {json.dumps(error_detail, indent=2)}")
-                except (ValueError, AttributeError):
-                    self.logger.error(f"Error response: {e.response.text}")
+            self._log_error(e)
             raise
 
-    def create_zone(self, zone_name: str, kind: str = "Native", nameservers: Optional[List[str]] = None) -> bool:
-        """Create a new DNS zone."""
-        if not zone_name.endswith("."):
-            zone_name += "."
+    def _stream(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """GET an endpoint and yield the response body as text chunks while it arrives."""
+        path = _api_path(endpoint)
+        self.logger.debug(f"PowerDNS API GET request (streamed): {path}")
 
-        zone_data = {
-            "name": zone_name,
-            "kind": kind,
-        }
+        try:
+            response = self._send("GET", path, None, params, stream=True)
+        except requests.exceptions.RequestException as e:
+            self._log_error(e)
+            raise
 
-        if nameservers:
-            zone_data["nameservers"] = nameservers
+        try:
+            try:
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                self._log_error(e)
+                raise
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            for chunk in response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE):
+                yield decoder.decode(chunk)
+            yield decoder.decode(b"", final=True)
+        finally:
+            response.close()
+
+    def _log_error(self, e: requests.exceptions.RequestException) -> None:
+        """Log a failed request with the API's error details."""
+        self.logger.error(f"PowerDNS API error: {e}")
+        if hasattr(e, "response") and e.response is not None:
+            try:
+                error_detail = e.response.json()
+                self.logger.error("Error details: %s", LazyJSON(error_detail))
+            except (ValueError, AttributeError):
+                self.logger.error(f"Error response: {e.response.text}")
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        data: Optional[Dict[str, Any]],
+        params: Optional[Dict[str, Any]],
+        stream: bool = False,
+    ) -> requests.Response:
+        """Send a request, with the failover and retries ``RequestAttempts`` decides on."""
+        attempts = self._attempts(method, path)
+        while True:
+            endpoint = attempts.next_endpoint()
+            started = time.monotonic()
+            try:
+                response = endpoint.session.request(
+                    method=method,
+                    url=f"{endpoint.url}{path}",
+                    json=data,
+                    params=params,
+                    timeout=self.timeout,
+                    stream=stream,
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not attempts.failed(e, time.monotonic() - started):
+                    raise
+            else:
+                if not attempts.answered(response, time.monotonic() - started):
+                    return response
+                response.close()
+            time.sleep(attempts.delay())
+
+    def check_endpoints(self) -> List[Dict[str, Any]]:
+        """Probe every endpoint and return its URL, role, health, latency and error."""
+        results = []
+        for endpoint in self.endpoints:
+            result = {
+                "url": endpoint.url,
+                "primary": endpoint.primary,
+                "weight": endpoint.weight,
+                "healthy": False,
+                "latency": None,
+                "error": None,
+            }
+            started = time.monotonic()
+            try:
+                response = endpoint.session.get(
+                    f"{endpoint.url}/api/v1/servers", timeout=self.timeout
+                )
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                endpoint.breaker.record_failure()
+                result["error"] = str(e)
+            else:
+                elapsed = time.monotonic() - started
+                endpoint.observe(elapsed)
+                endpoint.breaker.record_success()
+                result["healthy"] = True
+                result["latency"] = elapsed
+            results.append(result)
+        return results
+
+    def create_zone(
+        self,
+        zone_name: str,
+        kind: str = "Native",
+        nameservers: Optional[List[str]] = None,
+        records: Optional[List[Record]] = None,
+    ) -> bool:
+        """Create a new DNS zone.
+
+        ``records`` (as returned by ``DNSTemplate.get_template_records``) are
+        grouped into RRsets and sent in the same POST, so the zone is created
+        complete in one request.
+        """
+        zone_data = self.zone_document(zone_name, kind, nameservers, records)
+        zone_name = zone_data["name"]
+        rrsets = zone_data.get("rrsets", [])
 
+        self.invalidate_cached_zone(zone_name)
         try:
             self._request("POST", "/zones", data=zone_data)
-            self.logger.info(f"Zone created: {zone_name}")
+            self.logger.info(f"Zone created: {zone_name} ({len(rrsets)} RRsets)")
             return True
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Failed to create zone {zone_name}: {e}")
@@ -102,33 +634,82 @@ class PowerDNSClient:
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Failed to delete zone {zone_name}: {e}")
             return False
+        finally:
+            self.invalidate_cached_zone(zone_name)
 
-    def get_zone(self, zone_name: str) -> Optional[Dict[str, Any]]:
-        """Get zone information."""
+    def get_zone(self, zone_name: str, rrsets: bool = True) -> Optional[Dict[str, Any]]:
+        """Get zone information; with ``rrsets=False`` only the zone metadata is fetched."""
         if not zone_name.endswith("."):
             zone_name += "."
 
         try:
-            return self._request("GET", f"/zones/{zone_name}")
+            return self._request(
+                "GET", f"/zones/{zone_name}", params=None if rrsets else {"rrsets": "false"}
+            )
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Failed to get zone {zone_name}: {e}")
             return None
 
+    def get_zone_cached(self, zone_name: str) -> Optional[Dict[str, Any]]:
+        """Get zone information, from the zone cache when it is still valid.
+
+        A cache entry within its TTL is returned as is; an older one is returned
+        after a rrsets-less lookup confirms the zone serial did not change.
+        """
+        if self.cache is None:
+            return self.get_zone(zone_name)
+
+        cached = self.cache.get(zone_name)
+        if cached is not None:
+            zone, serial, fresh = cached
+            if fresh:
+                return zone
+            current = self.get_zone_serial(zone_name)
+            if current is not None and current == serial:
+                self.cache.revalidated(zone_name)
+                return zone
+
+        zone = self.get_zone(zone_name)
+        if zone:
+            self.cache.put(zone_name, zone)
+        return zone
+
+    def get_zone_serial(self, zone_name: str) -> Optional[int]:
+        """Get the current serial of a zone without fetching its records."""
+        try:
+            zones = self._request("GET", "/zones", params={"zone": _zone_fqdn(zone_name)})
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Failed to get serial of zone {zone_name}: {e}")
+            return None
+        if isinstance(zones, list) and zones:
+            return zones[0].get("serial")
+        return None
+
     def list_zones(self) -> List[Dict[str, Any]]:
         """List all zones."""
         try:
-            response = self._request("GET", "/zones")
-            # PowerDNS API returns a list directly, not a dict with "zones" key
-            if isinstance(response, list):
-                return response
-            # Fallback: if it's a dict with "zones" key
-            if isinstance(response, dict):
-                return response.get("zones", [])
-            return []
-        except requests.exceptions.RequestException as e:
+            return list(self.iter_zones())
+        except (requests.exceptions.RequestException, ValueError) as e:
             self.logger.error(f"Failed to list zones: {e}")
             return []
 
+    def iter_zones(
+        self, zone_name: Optional[str] = None, dnssec: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield zones (without RRsets) as the listing is received.
+
+        ``zone_name`` restricts the listing to that zone through the API's zone
+        filter. ``dnssec=False`` omits the ``dnssec`` and ``edited_serial`` fields,
+        which makes the listing much cheaper for PowerDNS. Raises ``requests``
+        exceptions on API errors and ValueError on malformed responses.
+        """
+        params = {}
+        if zone_name:
+            params["zone"] = _zone_fqdn(zone_name)
+        if not dnssec:
+            params["dnssec"] = "false"
+        yield from JSONStream(self._stream("/zones", params or None)).iter_array()
+
     def add_record(
         self,
         zone_name: str,
@@ -139,39 +720,12 @@ class PowerDNSClient:
         priority: Optional[int] = None,
     ) -> bool:
         """Add a DNS record to a zone."""
-        if not zone_name.endswith("."):
-            zone_name += "."
-
-        if not name.endswith("."):
-            name += "."
-
-        # Ensure name is FQDN
-        if not name.endswith(zone_name):
-            name = f"{name}.{zone_name}" if name != zone_name else zone_name
-
-        record_data = {
-            "rrsets": [
-                {
-                    "name": name,
-                    "type": record_type,
-                    "ttl": ttl,
-                    "changetype": "REPLACE",
-                    "records": [
-                        {
-                            "content": content,
-                            "disabled": False,
-                        }
-                    ],
-                }
-            ]
-        }
-
-        if priority is not None and record_type in ["MX", "SRV"]:
-            record_data["rrsets"][0]["records"][0]["content"] = f"{priority} {content}"
+        batch = self.batch(zone_name).add(name, record_type, content, ttl, priority)
+        name = batch.rrsets()[0]["name"]
 
         try:
-            self._request("PATCH", f"/zones/{zone_name}", data=record_data)
-            self.logger.info(f"Record added: {name} {record_type} {content} in {zone_name}")
+            batch.send()
+            self.logger.info(f"Record added: {name} {record_type} {content} in {batch.zone_name}")
             return True
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Failed to add record {name} {record_type}: {e}")
@@ -179,28 +733,12 @@ class PowerDNSClient:
 
     def delete_record(self, zone_name: str, name: str, record_type: str) -> bool:
         """Delete a DNS record from a zone."""
-        if not zone_name.endswith("."):
-            zone_name += "."
-
-        if not name.endswith("."):
-            name += "."
-
-        if not name.endswith(zone_name):
-            name = f"{name}.{zone_name}" if name != zone_name else zone_name
-
-        record_data = {
-            "rrsets": [
-                {
-                    "name": name,
-                    "type": record_type,
-                    "changetype": "DELETE",
-                }
-            ]
-        }
+        batch = self.batch(zone_name).delete(name, record_type)
+        name = batch.rrsets()[0]["name"]
 
         try:
-            self._request("PATCH", f"/zones/{zone_name}", data=record_data)
-            self.logger.info(f"Record deleted: {name} {record_type} from {zone_name}")
+            batch.send()
+            self.logger.info(f"Record deleted: {name} {record_type} from {batch.zone_name}")
             return True
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Failed to delete record {name} {record_type}: {e}")
@@ -218,26 +756,27 @@ class PowerDNSClient:
         """Update a DNS record in a zone."""
         return self.add_record(zone_name, name, record_type, content, ttl, priority)
 
-    def get_records(self, zone_name: str) -> List[Dict[str, Any]]:
+    def batch(self, zone_name: str) -> RRsetBatch:
+        """Start a batch of RRset changes for a zone, sent with ``commit()``."""
+        return RRsetBatch(self, zone_name)
+
+    def get_records(self, zone_name: str) -> List[Record]:
         """Get all records for a zone."""
-        zone = self.get_zone(zone_name)
-        if not zone:
+        try:
+            return list(self.iter_records(zone_name))
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.logger.error(f"Failed to get records of zone {zone_name}: {e}")
             return []
 
-        records = []
-        for rrsets in zone.get("rrsets", []):
-            for record in rrsets.get("records", []):
-                records.append(
-                    {
-                        "name": rrsets["name"],
-                        "type": rrsets["type"],
-                        "ttl": rrsets.get("ttl", 3600),
-                        "content": record.get("content", ""),
-                        "disabled": record.get("disabled", False),
-                    }
-                )
+    def iter_records(self, zone_name: str) -> Iterator[Record]:
+        """Yield the records of a zone as its RRsets are received.
 
-        return records
+        Raises ``requests`` exceptions on API errors and ValueError on malformed
+        responses.
+        """
+        stream = JSONStream(self._stream(f"/zones/{_zone_fqdn(zone_name)}"))
+        for rrset in stream.iter_member("rrsets"):
+            yield from self.rrset_records(rrset)
 
     def test_connection(self) -> bool:
         """Test connection to PowerDNS API."""
@@ -0,0 +1,218 @@
+"""Bulk zone provisioning for account migrations."""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+from ultahost_dns.async_client import AsyncPowerDNSClient
+from ultahost_dns.config import Config
+from ultahost_dns.dns_template import DNSTemplate
+from ultahost_dns.logger import PluginLogger
+from ultahost_dns.permissions import Permissions
+
+CREATED = "created"
+EXISTS = "exists"
+DENIED = "denied"
+FAILED = "failed"
+
+
+class ProvisionItem(NamedTuple):
+    """One zone to create: its domain, owning user and DNS template."""
+
+    domain: str
+    user: str = "root"
+    template: str = "default"
+
+
+def parse_items(
+    lines: Iterable[str], user: str = "root", template: str = "default"
+) -> Iterator[ProvisionItem]:
+    """Parse ``domain [user [template]]`` lines; blank lines and ``#`` comments are skipped.
+
+    Fields may be separated by whitespace or commas; missing fields take the
+    given defaults.
+    """
+    for line in lines:
+        fields = line.split("#", 1)[0].replace(",", " ").split()
+        if not fields:
+            continue
+        yield ProvisionItem(
+            fields[0].rstrip(".").lower(),
+            fields[1] if len(fields) > 1 else user,
+            fields[2] if len(fields) > 2 else template,
+        )
+
+
+class Checkpoint:
+    """Append-only log of finished domains, so an interrupted run can resume.
+
+    Each finished domain is one ``domain<TAB>status`` line, flushed as it
+    completes; a torn last line from a crash is ignored. Failed domains are not
+    logged and are retried on the next run.
+    """
+
+    def __init__(self, path):
+        """Open the checkpoint file, creating it if needed."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = None
+
+    def done(self):
+        """Return the domains finished by previous runs."""
+        done = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.endswith("\n"):
+                        domain, _, status = line.rstrip("\n").partition("\t")
+                        done[domain] = status
+        except OSError:
+            pass
+        return done
+
+    def record(self, domain, status):
+        """Log a finished domain."""
+        if self._file is None:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            self._file = os.fdopen(fd, "a", encoding="utf-8")
+        self._file.write(f"{domain}\t{status}\n")
+        self._file.flush()
+
+    def reset(self):
+        """Forget all finished domains."""
+        self.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        """Close the checkpoint file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class RateLimiter:
+    """Space out operations to at most ``rate`` per second (unlimited when 0)."""
+
+    def __init__(self, rate):
+        """Initialize the limiter."""
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        """Wait for the next free slot."""
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class BulkProvisioner:
+    """Create many PowerDNS zones concurrently from a domain/user/template list.
+
+    User types and domain ownership come from the ``Permissions`` index, which is
+    loaded once for the run; templates are compiled once each by ``DNSTemplate``.
+    Zones are created with one POST each (template RRsets inline), at most
+    ``concurrency`` at a time and ``rate`` per second. Zones that already exist
+    in PowerDNS are left alone.
+    """
+
+    CONCURRENCY = 16
+    RATE = 50
+
+    def __init__(
+        self,
+        client_factory=None,
+        checkpoint=None,
+        concurrency=None,
+        rate=None,
+        output=print,
+        variables=None,
+    ):
+        """Initialize the provisioner; ``concurrency`` and ``rate`` default to their settings."""
+        self.client_factory = client_factory or AsyncPowerDNSClient
+        self.checkpoint = checkpoint
+        self.concurrency = max(
+            1, int(concurrency or Config.get("provision_concurrency", self.CONCURRENCY))
+        )
+        self.rate = float(rate if rate is not None else Config.get("provision_rate", self.RATE))
+        self.output = output
+        self.variables = variables
+        self.logger = PluginLogger.get_logger()
+
+    def allowed(self, item):
+        """Whether the item's user may own its domain."""
+        return Permissions.can_manage_zone(item.user, item.domain)
+
+    async def _provision(self, client, item, existing, limiter, semaphore):
+        """Create one zone and return its status."""
+        if not self.allowed(item):
+            self.logger.error(
+                f"User {item.user} does not have permission to create zone {item.domain}"
+            )
+            return DENIED
+        if item.domain in existing:
+            return EXISTS
+
+        records = DNSTemplate.get_template_records(item.domain, item.template, self.variables)
+        async with semaphore:
+            await limiter.wait()
+            created = await client.create_zone(item.domain, records=records)
+        return CREATED if created else FAILED
+
+    async def run_async(self, items):
+        """Provision the items and return counters per status."""
+        stats = {"zones": 0, CREATED: 0, EXISTS: 0, DENIED: 0, FAILED: 0, "resumed": 0}
+        done = self.checkpoint.done() if self.checkpoint else {}
+
+        pending = []
+        seen = set()
+        for item in items:
+            if item.domain in seen:
+                continue
+            seen.add(item.domain)
+            stats["zones"] += 1
+            if item.domain in done:
+                stats["resumed"] += 1
+            else:
+                pending.append(item)
+        if not pending:
+            return stats
+
+        limiter = RateLimiter(self.rate)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with self.client_factory() as client:
+            existing = {
+                zone["name"].rstrip(".") for zone in await client.list_zones() if zone.get("name")
+            }
+
+            async def provision(item):
+                try:
+                    return item, await self._provision(client, item, existing, limiter, semaphore)
+                except Exception as e:
+                    self.logger.error(f"Error provisioning zone {item.domain}: {e}")
+                    return item, FAILED
+
+            for future in asyncio.as_completed([provision(item) for item in pending]):
+                item, status = await future
+                stats[status] += 1
+                if status != FAILED and self.checkpoint:
+                    self.checkpoint.record(item.domain, status)
+                mark = "✗" if status in (DENIED, FAILED) else "✓"
+                self.output(f"  {mark} {item.domain} ({item.user}, {item.template}): {status}")
+        return stats
+
+    def run(self, items):
+        """Provision the items from synchronous code."""
+        try:
+            return asyncio.run(self.run_async(items))
+        finally:
+            if self.checkpoint:
+                self.checkpoint.close()
@@ -0,0 +1,128 @@
+"""Compact DNS record and RRset value types shared by all modules."""
+
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Integers above 256 are not cached by CPython, so every parsed TTL would be a new object
+_TTLS: Dict[int, int] = {}
+
+
+def intern_type(record_type: str) -> str:
+    """Return the shared string object for a record type."""
+    return sys.intern(record_type.upper())
+
+
+def intern_ttl(ttl: Any) -> int:
+    """Return the shared int object for a TTL."""
+    ttl = int(ttl)
+    return _TTLS.setdefault(ttl, ttl)
+
+
+class Record(NamedTuple):
+    """One DNS record in PowerDNS content format.
+
+    ``name`` is as given by the source: a FQDN for records read from PowerDNS,
+    possibly relative (or ``@``) for template records. MX and SRV content starts
+    with the priority.
+    """
+
+    name: str
+    type: str
+    ttl: int
+    content: str
+    disabled: bool = False
+
+    @classmethod
+    def create(
+        cls, name: str, record_type: str, ttl: Any, content: str, disabled: bool = False
+    ) -> "Record":
+        """Build a record with an interned type and TTL."""
+        return cls(name, intern_type(record_type), intern_ttl(ttl), content, disabled)
+
+    def split_priority(self) -> Tuple[Optional[int], str]:
+        """Return ``(priority, data)`` for MX/SRV content, ``(None, content)`` otherwise."""
+        if self.type in ("MX", "SRV"):
+            priority, sep, data = self.content.partition(" ")
+            if sep and priority.isdigit():
+                return int(priority), data
+        return None, self.content
+
+    def relative_name(self, zone_name: str) -> str:
+        """Return the name without trailing dot, ``@`` for the zone apex."""
+        name = self.name.rstrip(".")
+        return "@" if name == zone_name.rstrip(".") else name
+
+    def to_api2(self, zone_name: str) -> Dict[str, Any]:
+        """Return the record in the cPanel API2 fetchzone shape."""
+        priority, data = self.split_priority()
+        record = {
+            "name": self.relative_name(zone_name),
+            "ttl": self.ttl,
+            "type": self.type,
+            "record": data,
+        }
+        if priority is not None:
+            record["priority"] = priority
+        return record
+
+    def to_zone_line(self, zone_name: str) -> str:
+        """Return the record as a tab-separated zone-file line."""
+        return f"{self.relative_name(zone_name)}\t{self.ttl}\tIN\t{self.type}\t{self.content}"
+
+
+class RRset(NamedTuple):
+    """All records of one (name, type) pair, as PowerDNS stores them."""
+
+    name: str
+    type: str
+    ttl: int
+    contents: Tuple[str, ...]
+    disabled: Tuple[bool, ...] = ()
+
+    @classmethod
+    def from_api(cls, rrset: Dict[str, Any]) -> "RRset":
+        """Build an RRset from PowerDNS rrset JSON."""
+        records = rrset.get("records", [])
+        return cls(
+            rrset["name"],
+            intern_type(rrset["type"]),
+            intern_ttl(rrset.get("ttl", 3600)),
+            tuple(record.get("content", "") for record in records),
+            tuple(bool(record.get("disabled", False)) for record in records),
+        )
+
+    @classmethod
+    def group(cls, records: Iterable[Record]) -> List["RRset"]:
+        """Group records into RRsets, in the order each (name, type) first appears."""
+        grouped: Dict[Tuple[str, str], List[Record]] = {}
+        for record in records:
+            grouped.setdefault((record.name, record.type), []).append(record)
+        return [
+            cls(
+                name,
+                record_type,
+                members[-1].ttl,
+                tuple(r.content for r in members),
+                tuple(r.disabled for r in members),
+            )
+            for (name, record_type), members in grouped.items()
+        ]
+
+    def records(self) -> Iterator[Record]:
+        """Yield the records of the RRset."""
+        disabled = self.disabled or (False,) * len(self.contents)
+        for content, is_disabled in zip(self.contents, disabled):
+            yield Record(self.name, self.type, self.ttl, content, is_disabled)
+
+    def to_api(self, changetype: Optional[str] = None) -> Dict[str, Any]:
+        """Return the RRset as PowerDNS rrset JSON, with a changetype for PATCH requests."""
+        disabled = self.disabled or (False,) * len(self.contents)
+        rrset = {
+            "name": self.name,
+            "type": self.type,
+            "ttl": self.ttl,
+            "records": [{"content": c, "disabled": d} for c, d in zip(self.contents, disabled)],
+        }
+        if changetype:
+            rrset["changetype"] = changetype
+        return rrset
@@ -0,0 +1,8 @@
+"""Outcome of a write operation, mapped to an exit code by each hook script.
+
+Kept apart from ``operations`` so hooks can read them without loading it.
+"""
+
+OK = "ok"
+DENIED = "denied"
+FAILED = "failed"
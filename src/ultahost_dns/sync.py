@@ -0,0 +1,345 @@
+"""Concurrent, diff-based sync of PowerDNS zones into cPanel's local DNS."""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import requests
+
+from ultahost_dns.config import Config
+from ultahost_dns.cpanel_dns import ZoneFiles
+from ultahost_dns.logger import PluginLogger
+from ultahost_dns.powerdns_client import PowerDNSClient
+from ultahost_dns.zonefile import txt_data
+
+
+class SyncError(Exception):
+    """A zone could not be synced."""
+
+
+class SyncState:
+    """Last-synced PowerDNS serials per zone, persisted between sync runs."""
+
+    STATE_FILE = Path("/var/cpanel/ultahost_dns_sync_state.json")
+
+    def __init__(self, path=None):
+        """Load the state file (a missing or unreadable file means a full sync)."""
+        self.path = Path(path or self.STATE_FILE)
+        self._zones = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._zones = json.load(f).get("zones", {})
+        except (OSError, ValueError, AttributeError):
+            self._zones = {}
+
+    @staticmethod
+    def marker(zone):
+        """Return the change marker of a zone from the /zones listing or a zone document."""
+        if not zone or zone.get("serial") is None:
+            return None
+        return [zone.get("serial"), zone.get("edited_serial")]
+
+    def get(self, zone_name):
+        """Return the marker recorded at the last sync of a zone."""
+        return self._zones.get(zone_name)
+
+    def set(self, zone_name, marker):
+        """Record the marker a zone was synced at."""
+        if marker is None:
+            self._zones.pop(zone_name, None)
+        else:
+            self._zones[zone_name] = marker
+
+    def forget(self, zone_name):
+        """Drop a zone from the state."""
+        self._zones.pop(zone_name, None)
+
+    def zones(self):
+        """Return the names of all zones in the state."""
+        return list(self._zones)
+
+    def save(self):
+        """Write the state file atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"zones": self._zones}, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+
+
+class ZonePlan:
+    """Changes needed to make a local zone match PowerDNS."""
+
+    def __init__(self, zone_name, create=False, add=None, remove=None, keep=None, marker=None):
+        """Initialize a plan for one zone."""
+        self.zone_name = zone_name
+        self.create = create
+        self.add = add or []
+        self.remove = remove or []
+        # Local records that stay as they are
+        self.keep = keep or []
+        # SyncState marker of the PowerDNS zone the plan was computed from
+        self.marker = marker
+
+    @property
+    def changed(self):
+        """Whether applying the plan changes anything."""
+        return self.create or bool(self.add) or bool(self.remove)
+
+    def describe(self):
+        """Return the plan as printable lines."""
+        lines = []
+        if self.create:
+            lines.append(f"  create zone {self.zone_name}")
+        for sign, records in (("-", self.remove), ("+", self.add)):
+            lines.extend(f"  {sign} {r.name} {r.ttl} {r.type} {r.content}" for r in records)
+        return lines
+
+
+class ZoneSyncer:
+    """Sync PowerDNS zones into cPanel's local DNS with a bounded worker pool.
+
+    Every zone is fetched from PowerDNS once and diffed against the local zone;
+    a zone that changed is written complete in one operation (``write_zone`` of
+    the ``cpanel`` backend, ``ZoneFiles`` by default). Unless ``full`` is set,
+    zones whose serial matches the one recorded in ``SyncState`` are not fetched at
+    all, and previously synced zones that disappeared from PowerDNS are removed
+    locally. A listing that fails aborts the run before anything is removed, and
+    an empty listing, or one that would remove more than ``MAX_DELETE_RATIO`` of
+    the synced zones, removes nothing unless ``force`` is set.
+    """
+
+    # Managed by cPanel itself
+    SKIP_TYPES = ("NS", "SOA")
+
+    MAX_DELETE_RATIO = 0.5
+
+    def __init__(
+        self,
+        client_factory=None,
+        cpanel=None,
+        workers=None,
+        dry_run=False,
+        output=print,
+        state=None,
+        full=False,
+        force=False,
+    ):
+        """Initialize the syncer.
+
+        ``cpanel`` provides ``list_zones``, ``get_records``, ``create_zone``,
+        ``delete_zone`` and ``write_zone``. ``client_factory`` builds one
+        PowerDNS client per worker thread, since a requests session should not
+        be shared between threads.
+        """
+        self.client_factory = client_factory or PowerDNSClient
+        self.cpanel = cpanel or ZoneFiles()
+        self.workers = max(1, int(workers or Config.get("sync_workers", 8)))
+        self.dry_run = dry_run
+        self.output = output
+        self.state = state if state is not None else SyncState()
+        self.full = full
+        self.force = force
+        self.logger = PluginLogger.get_logger()
+        self._local = threading.local()
+        self._output_lock = threading.Lock()
+
+    def _client(self):
+        """Return this worker thread's PowerDNS client."""
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.client_factory()
+        return client
+
+    def _print(self, *lines):
+        """Print lines without interleaving output from other workers."""
+        with self._output_lock:
+            for line in lines:
+                self.output(line)
+
+    @staticmethod
+    def _local_content(record_type, content):
+        """Convert PowerDNS content to the form cPanel stores."""
+        if record_type == "TXT":
+            return txt_data(content)
+        return content
+
+    @classmethod
+    def plan_zone(cls, zone_name, remote_records, local_records, zone_exists=True):
+        """Diff PowerDNS records against local records."""
+        wanted = {}
+        for record in remote_records:
+            if record.type in cls.SKIP_TYPES or record.disabled:
+                continue
+            content = cls._local_content(record.type, record.content)
+            key = (record.name.lower(), record.type, content)
+            wanted[key] = record._replace(content=content)
+
+        remove = []
+        keep = []
+        for record in local_records:
+            if record.type in cls.SKIP_TYPES:
+                keep.append(record)
+                continue
+            key = (record.name.lower(), record.type, record.content)
+            existing = wanted.get(key)
+            if existing is not None and existing.ttl == record.ttl:
+                del wanted[key]
+                keep.append(record)
+            else:
+                remove.append(record)
+
+        return ZonePlan(
+            zone_name, create=not zone_exists, add=list(wanted.values()), remove=remove, keep=keep
+        )
+
+    def apply_plan(self, plan):
+        """Apply a plan to the local zone with one complete zone write."""
+        keep = plan.keep
+        if plan.create:
+            self.cpanel.create_zone(plan.zone_name)
+            # Keep the SOA and NS records cPanel created the zone with
+            keep = [r for r in self.cpanel.get_records(plan.zone_name) if r.type in self.SKIP_TYPES]
+
+        self.cpanel.write_zone(plan.zone_name, keep + plan.add)
+
+    def sync_zone(self, zone_name, local_zones):
+        """Fetch one zone from PowerDNS, diff it and apply (or print) the changes."""
+        zone_clean = zone_name.rstrip(".")
+
+        zone = self._client().get_zone(zone_clean)
+        if not zone:
+            raise SyncError(f"Could not get details for zone {zone_clean}")
+        remote_records = PowerDNSClient.records_from_zone(zone)
+
+        zone_exists = zone_clean in local_zones
+        local_records = self.cpanel.get_records(zone_clean) if zone_exists else []
+        plan = self.plan_zone(zone_clean, remote_records, local_records, zone_exists)
+        plan.marker = SyncState.marker(zone)
+
+        if not plan.changed:
+            return plan
+
+        if self.dry_run:
+            self._print(f"Zone {zone_clean}:", *plan.describe())
+        else:
+            self.apply_plan(plan)
+            self.logger.info(
+                f"Synced zone {zone_clean}: +{len(plan.add)} -{len(plan.remove)} records"
+            )
+        return plan
+
+    def _remove_deleted_zones(self, listed, local_zones, stats):
+        """Remove previously synced zones that no longer exist in PowerDNS."""
+        synced = self.state.zones()
+        gone = [zone_name for zone_name in synced if zone_name not in listed]
+        if not gone:
+            return
+
+        if not self.force and (not listed or len(gone) > len(synced) * self.MAX_DELETE_RATIO):
+            # More likely a broken PowerDNS backend than zones really deleted
+            message = (
+                f"Not removing {len(gone)} of {len(synced)} synced zones missing from PowerDNS; "
+                "run with --force if they were really deleted"
+            )
+            self.logger.warning(message)
+            self._print(f"  ! {message}")
+            return
+
+        for zone_name in gone:
+            if zone_name in local_zones:
+                if self.dry_run:
+                    self._print(f"Zone {zone_name}:", "  delete zone (removed from PowerDNS)")
+                    stats["deleted"] += 1
+                    continue
+                try:
+                    self.cpanel.delete_zone(zone_name)
+                except Exception as e:
+                    self.logger.error(f"Error removing zone {zone_name}: {e}")
+                    self._print(f"  ✗ Failed to remove {zone_name}: {e}")
+                    stats["failed"] += 1
+                    continue
+                self.logger.info(f"Removed zone {zone_name} deleted from PowerDNS")
+                self._print(f"  ✓ Removed {zone_name} (deleted from PowerDNS)")
+                stats["deleted"] += 1
+
+            if not self.dry_run:
+                self.state.forget(zone_name)
+
+    def run(self, zone_names=None):
+        """Sync the given zones, or every changed PowerDNS zone, and return counters."""
+        listed = None
+        if zone_names is None:
+            # The listing carries each zone's serials, so unchanged zones cost nothing more
+            listed = {}
+            try:
+                for zone in self._client().iter_zones():
+                    if zone.get("name"):
+                        listed[zone["name"].rstrip(".")] = SyncState.marker(zone)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                # A partial listing must not be mistaken for deleted zones
+                raise SyncError(f"Could not list PowerDNS zones: {e}") from e
+            zone_names = list(listed)
+        zone_names = [name.rstrip(".") for name in zone_names if name]
+
+        stats = {
+            "zones": len(zone_names),
+            "changed": 0,
+            "unchanged": 0,
+            "skipped": 0,
+            "deleted": 0,
+            "failed": 0,
+        }
+        if not zone_names and not self.state.zones():
+            return stats
+
+        local_zones = self.cpanel.list_zones()
+
+        if listed is not None:
+            self._remove_deleted_zones(listed, local_zones, stats)
+
+        pending = []
+        for zone_name in zone_names:
+            marker = listed.get(zone_name) if listed is not None else None
+            # A zone deleted on the cPanel side is re-synced even if PowerDNS did not change
+            if (
+                not self.full
+                and marker is not None
+                and zone_name in local_zones
+                and self.state.get(zone_name) == marker
+            ):
+                stats["skipped"] += 1
+            else:
+                pending.append(zone_name)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.sync_zone, name, local_zones): name for name in pending}
+            for future in as_completed(futures):
+                zone_name = futures[future]
+                try:
+                    plan = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error syncing zone {zone_name}: {e}")
+                    self._print(f"  ✗ Failed to sync {zone_name}: {e}")
+                    stats["failed"] += 1
+                    continue
+
+                if not self.dry_run:
+                    self.state.set(zone_name, plan.marker)
+
+                if plan.changed:
+                    stats["changed"] += 1
+                    if not self.dry_run:
+                        self._print(
+                            f"  ✓ Synced {zone_name} (+{len(plan.add)} -{len(plan.remove)})"
+                        )
+                else:
+                    stats["unchanged"] += 1
+
+        if not self.dry_run:
+            self.state.save()
+
+        return stats
@@ -0,0 +1,269 @@
+"""Lean HTTP/1.1 transport for the PowerDNS client, built on ``http.client``."""
+
+import http.client
+import select
+import socket
+import ssl
+import threading
+from json import dumps, loads
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlencode, urlsplit
+
+import requests
+
+from ultahost_dns.http_common import IDEMPOTENT_METHODS, ConnectFailed
+
+# Failures of a reused connection meaning the server closed it while it was idle
+_STALE = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+def _dropped(sock: socket.socket) -> bool:
+    """Tell whether the server closed an idle connection: it is readable before any request."""
+    try:
+        return bool(select.select([sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+class Response:
+    """The parts of ``requests.Response`` the client and its callers use.
+
+    The body is read on first use of ``content`` or ``iter_content``; the
+    connection goes back to its pool once the body has been read in full.
+    """
+
+    def __init__(self, url: str, raw: http.client.HTTPResponse, release: Callable[[bool], None]):
+        """Initialize a response whose body is still to be read from ``raw``."""
+        self.url = url
+        self.status_code = raw.status
+        self.reason = raw.reason
+        self.headers = raw.headers
+        self._raw: Optional[http.client.HTTPResponse] = raw
+        self._release = release
+        self._content: Optional[bytes] = None
+
+    def _read(self, amount: Optional[int] = None) -> bytes:
+        """Read from the body, raising the ``requests`` exception for a failure."""
+        try:
+            return self._raw.read(amount) if amount else self._raw.read()
+        except socket.timeout as e:
+            self.close()
+            raise requests.exceptions.ConnectionError(f"Read timed out: {self.url}") from e
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            raise requests.exceptions.ChunkedEncodingError(f"Connection broken: {e!r}") from e
+
+    def _finish(self) -> None:
+        """Hand the connection back once the body has been read."""
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._release(not raw.will_close)
+
+    def load(self) -> None:
+        """Read the whole body, releasing the connection."""
+        if self._content is None:
+            self._content = self._read() if self._raw is not None else b""
+            self._finish()
+
+    @property
+    def content(self) -> bytes:
+        """Return the whole body."""
+        self.load()
+        return self._content
+
+    @property
+    def text(self) -> str:
+        """Return the body decoded as UTF-8."""
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        """Return the body parsed as JSON."""
+        return loads(self.content)
+
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        """Yield the body in chunks of at most ``chunk_size`` bytes while it arrives."""
+        if self._content is not None:
+            for start in range(0, len(self._content), chunk_size):
+                yield self._content[start : start + chunk_size]
+            return
+        while self._raw is not None:
+            chunk = self._read(chunk_size)
+            if self._raw is not None and self._raw.isclosed():
+                # Fully read: free the connection even if the caller stops iterating here
+                self._finish()
+            if not chunk:
+                break
+            yield chunk
+
+    def raise_for_status(self) -> None:
+        """Raise ``requests.exceptions.HTTPError`` for 4xx and 5xx responses."""
+        if 400 <= self.status_code < 600:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}", response=self
+            )
+
+    def close(self) -> None:
+        """Release the connection, closing it if the body was not read in full."""
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            raw.close()
+            self._release(False)
+
+
+class HTTPClientTransport:
+    """Keep-alive connections to PowerDNS API endpoints over ``http.client``.
+
+    A stand-in for the ``requests.Session`` of ``PowerDNSClient`` (``headers``,
+    ``request``, ``get`` and ``close``) raising the same ``requests``
+    exceptions, without requests' per-request adapter, cookie and hook
+    machinery. Up to ``pool_size`` idle connections are kept per host, and
+    HTTPS connections share one TLS context. Safe to share between threads.
+    """
+
+    POOL_SIZE = 10
+
+    def __init__(self, ssl_context: Optional[ssl.SSLContext] = None, pool_size: int = POOL_SIZE):
+        """Initialize the transport; connections are opened on demand."""
+        self.headers: Dict[str, str] = {"Accept": "application/json", "User-Agent": "ultahost-dns"}
+        self.ssl_context = ssl_context
+        self.pool_size = pool_size
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _context(self) -> ssl.SSLContext:
+        """Return the TLS context shared by all HTTPS connections."""
+        with self._lock:
+            if self.ssl_context is None:
+                self.ssl_context = ssl.create_default_context()
+            return self.ssl_context
+
+    def _acquire(
+        self, key: Tuple[str, str, int], connect_timeout: Optional[float], reuse: bool
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return an idle connection, or a new one; the flag tells whether it was reused."""
+        if reuse:
+            with self._lock:
+                idle = self._idle.get(key, [])
+                while idle:
+                    connection = idle.pop()
+                    if connection.sock is not None and not _dropped(connection.sock):
+                        return connection, True
+                    connection.close()
+
+        scheme, host, port = key
+        if scheme == "https":
+            connection = http.client.HTTPSConnection(
+                host, port, timeout=connect_timeout, context=self._context()
+            )
+        else:
+            connection = http.client.HTTPConnection(host, port, timeout=connect_timeout)
+        try:
+            connection.connect()
+        except socket.timeout as e:
+            connection.close()
+            raise requests.exceptions.ConnectTimeout(
+                f"Connection to {host}:{port} timed out"
+            ) from e
+        except ssl.SSLError as e:
+            connection.close()
+            raise requests.exceptions.SSLError(
+                f"TLS handshake with {host}:{port} failed: {e}"
+            ) from e
+        except OSError as e:
+            connection.close()
+            raise ConnectFailed(f"Connection to {host}:{port} failed: {e}") from e
+        connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return connection, False
+
+    def _release(
+        self, key: Tuple[str, str, int], connection: http.client.HTTPConnection, reusable: bool
+    ) -> None:
+        """Return a connection to its pool; close it if it cannot be reused or the pool is full."""
+        if reusable and connection.sock is not None:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.pool_size:
+                    idle.append(connection)
+                    return
+        connection.close()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        json: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Union[float, Tuple[float, float], None] = None,
+        stream: bool = False,
+    ) -> Response:
+        """Send a request and return its response, like ``requests.Session.request``.
+
+        When a reused connection turns out to be closed by the server, the
+        request is resent once on a new connection if it could not be sent in
+        full or its method is idempotent. Otherwise the server may have acted on
+        it, and ``requests.exceptions.ConnectionError`` is raised, as with
+        ``requests``.
+        """
+        parts = urlsplit(url)
+        key = (
+            parts.scheme,
+            parts.hostname or "",
+            parts.port or (443 if parts.scheme == "https" else 80),
+        )
+        target = parts.path or "/"
+        query = [parts.query] if parts.query else []
+        if params:
+            query.append(urlencode({k: v for k, v in params.items() if v is not None}, doseq=True))
+        if any(query):
+            target += "?" + "&".join(q for q in query if q)
+
+        headers = dict(self.headers)
+        body = None
+        if json is not None:
+            body = dumps(json).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        connect_timeout, read_timeout = (
+            timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        )
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        reuse = True
+        while True:
+            connection, reused = self._acquire(key, connect_timeout, reuse)
+            sent = False
+            try:
+                connection.sock.settimeout(read_timeout)
+                connection.request(method, target, body=body, headers=headers)
+                sent = True
+                raw = connection.getresponse()
+            except _STALE as e:
+                connection.close()
+                if reused and (idempotent or not sent):
+                    reuse = False
+                    continue
+                raise requests.exceptions.ConnectionError(f"Connection aborted: {e!r}") from e
+            except socket.timeout as e:
+                connection.close()
+                raise requests.exceptions.ReadTimeout(f"Read timed out: {url}") from e
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise requests.exceptions.ConnectionError(f"Connection aborted: {e!r}") from e
+            break
+
+        response = Response(url, raw, lambda reusable: self._release(key, connection, reusable))
+        if not stream:
+            response.load()
+        return response
+
+    def get(self, url: str, **kwargs: Any) -> Response:
+        """Send a GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
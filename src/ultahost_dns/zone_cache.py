@@ -0,0 +1,143 @@
+"""On-disk cache of PowerDNS zone documents, validated by zone serial."""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from ultahost_dns.config import Config
+from ultahost_dns.logger import PluginLogger
+
+
+class ZoneCache:
+    """SQLite cache of zone documents shared by all plugin processes.
+
+    An entry younger than ``ttl`` seconds is served without contacting PowerDNS;
+    an older one is served after the caller confirmed the zone serial did not
+    change. Our own write paths invalidate entries. Entries not read for
+    ``max_age`` seconds, and the least recently read entries beyond
+    ``max_entries``/``max_bytes``, are evicted.
+    """
+
+    CACHE_FILE = Path("/var/cache/ultahost_dns/zones.sqlite")
+    TTL = 60
+    MAX_AGE = 86400
+    MAX_ENTRIES = 5000
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, path=None, ttl=None, max_entries=None, max_bytes=None):
+        """Initialize the cache; settings default to the zone_cache_* config keys."""
+        self.path = Path(path or self.CACHE_FILE)
+        self.ttl = ttl if ttl is not None else Config.get("zone_cache_ttl", self.TTL)
+        self.max_entries = max_entries or Config.get("zone_cache_max_entries", self.MAX_ENTRIES)
+        self.max_bytes = max_bytes or Config.get("zone_cache_max_bytes", self.MAX_BYTES)
+        self.logger = PluginLogger.get_logger()
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        """Open (and create) the database on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS zones ("
+                "name TEXT PRIMARY KEY, serial INTEGER, fetched_at REAL, "
+                "accessed_at REAL, size INTEGER, data BLOB)"
+            )
+            self.path.chmod(0o600)
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql, params=()):
+        """Run a statement, treating database errors as cache misses."""
+        with self._lock:
+            try:
+                conn = self._connect()
+                with conn:
+                    return conn.execute(sql, params).fetchall()
+            except (sqlite3.Error, OSError) as e:
+                self.logger.warning(f"Zone cache unavailable: {e}")
+                return []
+
+    @staticmethod
+    def _key(zone_name):
+        return zone_name.rstrip(".").lower()
+
+    def get(self, zone_name):
+        """Return ``(zone, serial, fresh)`` for a cached zone, or None."""
+        rows = self._execute(
+            "SELECT serial, fetched_at, data FROM zones WHERE name = ?",
+            (self._key(zone_name),),
+        )
+        if not rows:
+            return None
+
+        serial, fetched_at, data = rows[0]
+        try:
+            zone = json.loads(zlib.decompress(data))
+        except (zlib.error, ValueError):
+            self.invalidate(zone_name)
+            return None
+
+        now = time.time()
+        self._execute(
+            "UPDATE zones SET accessed_at = ? WHERE name = ?", (now, self._key(zone_name))
+        )
+        return zone, serial, now - fetched_at < self.ttl
+
+    def put(self, zone_name, zone):
+        """Store a freshly fetched zone document."""
+        data = zlib.compress(json.dumps(zone, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        self._execute(
+            "INSERT OR REPLACE INTO zones (name, serial, fetched_at, accessed_at, size, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (self._key(zone_name), zone.get("serial"), now, now, len(data), data),
+        )
+        self._evict(now)
+
+    def revalidated(self, zone_name):
+        """Mark a cached zone as confirmed unchanged."""
+        self._execute(
+            "UPDATE zones SET fetched_at = ? WHERE name = ?", (time.time(), self._key(zone_name))
+        )
+
+    def invalidate(self, zone_name):
+        """Drop a zone from the cache."""
+        self._execute("DELETE FROM zones WHERE name = ?", (self._key(zone_name),))
+
+    def clear(self):
+        """Drop all cached zones."""
+        self._execute("DELETE FROM zones")
+
+    def _evict(self, now):
+        """Enforce the age, entry count and size limits."""
+        self._execute("DELETE FROM zones WHERE accessed_at < ?", (now - self.MAX_AGE,))
+
+        rows = self._execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM zones")
+        if not rows:
+            return
+        count, total = rows[0]
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # Keep the most recently read entries that fit both limits
+        kept_count = kept_bytes = 0
+        evict = []
+        for name, size in self._execute("SELECT name, size FROM zones ORDER BY accessed_at DESC"):
+            if kept_count < self.max_entries and kept_bytes + size <= self.max_bytes:
+                kept_count += 1
+                kept_bytes += size
+            else:
+                evict.append((name,))
+
+        with self._lock:
+            try:
+                with self._connect() as conn:
+                    conn.executemany("DELETE FROM zones WHERE name = ?", evict)
+            except (sqlite3.Error, OSError) as e:
+                self.logger.warning(f"Zone cache eviction failed: {e}")
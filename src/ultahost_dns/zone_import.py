@@ -0,0 +1,187 @@
+"""Import of cPanel's local zone files into PowerDNS."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from ultahost_dns.config import Config
+from ultahost_dns.logger import PluginLogger
+from ultahost_dns.powerdns_client import PowerDNSClient, _zone_fqdn
+from ultahost_dns.records import Record, RRset
+from ultahost_dns.zonefile import iter_entries, parse_ttl
+
+CREATED = "created"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+
+
+class ZoneImportError(Exception):
+    """A zone could not be imported."""
+
+
+def read_zone_file(path, zone_name):
+    """Parse a BIND zone file into the RRsets to store in PowerDNS.
+
+    Names are lowercased and qualified against the zone, unquoted TXT data is
+    quoted as the PowerDNS API requires, and the SOA is left out since PowerDNS
+    maintains its own.
+    """
+    records = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for entry in iter_entries(f, origin=_zone_fqdn(zone_name).lower()):
+            if entry.type == "SOA":
+                continue
+            content = entry.content
+            if entry.type in ("TXT", "SPF") and not content.startswith('"'):
+                content = f'"{content}"'
+            ttl = parse_ttl(entry.ttl)
+            records.append(
+                Record.create(entry.name.lower(), entry.type, 3600 if ttl is None else ttl, content)
+            )
+    return RRset.group(records)
+
+
+def _rrset_key(rrset):
+    """Return what makes two RRsets equal, ignoring case and record order."""
+    return (rrset.name.lower(), rrset.type, rrset.ttl, tuple(sorted(rrset.contents)))
+
+
+class ZoneImporter:
+    """Push cPanel's local zone files (``/var/named/<zone>.db``) into PowerDNS.
+
+    Each zone costs one write at most: a POST with all RRsets when the zone is
+    new, or one PATCH replacing the changed RRsets and deleting the ones the
+    file no longer has. Zones whose RRsets already match are not written.
+    Files are processed by a bounded worker pool.
+    """
+
+    ZONE_DIR = Path("/var/named")
+
+    def __init__(
+        self, client_factory=None, zone_dir=None, workers=None, dry_run=False, output=print
+    ):
+        """Initialize the importer.
+
+        ``client_factory`` builds one PowerDNS client per worker thread.
+        """
+        self.client_factory = client_factory or PowerDNSClient
+        self.zone_dir = Path(zone_dir or self.ZONE_DIR)
+        self.workers = max(1, int(workers or Config.get("sync_workers", 8)))
+        self.dry_run = dry_run
+        self.output = output
+        self.logger = PluginLogger.get_logger()
+        self._local = threading.local()
+        self._output_lock = threading.Lock()
+
+    def _client(self):
+        """Return this worker thread's PowerDNS client."""
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.client_factory()
+        return client
+
+    def _print(self, *lines):
+        """Print lines without interleaving output from other workers."""
+        with self._output_lock:
+            for line in lines:
+                self.output(line)
+
+    def zone_files(self, zone_names=None):
+        """Return ``{zone: path}`` for the given zones, or for every ``*.db`` file."""
+        if zone_names is not None:
+            return {
+                name.rstrip(".").lower(): self.zone_dir / f"{name.rstrip('.').lower()}.db"
+                for name in zone_names
+            }
+        return {
+            path.name[: -len(".db")].lower(): path for path in sorted(self.zone_dir.glob("*.db"))
+        }
+
+    @staticmethod
+    def plan_zone(local_rrsets, remote_zone):
+        """Return ``(replace, delete)``: RRsets to write and remote (name, type) pairs to remove."""
+        remote = {}
+        for rrset in remote_zone.get("rrsets", []):
+            if rrset.get("type") != "SOA" and rrset.get("records"):
+                remote_rrset = RRset.from_api(rrset)
+                remote[(remote_rrset.name.lower(), remote_rrset.type)] = remote_rrset
+
+        replace = []
+        for rrset in local_rrsets:
+            existing = remote.pop((rrset.name, rrset.type), None)
+            if existing is None or _rrset_key(existing) != _rrset_key(rrset):
+                replace.append(rrset)
+        return replace, list(remote)
+
+    def import_zone(self, zone_name, path, exists):
+        """Import one zone file and return its status."""
+        try:
+            local_rrsets = read_zone_file(path, zone_name)
+        except OSError as e:
+            raise ZoneImportError(f"Cannot read {path}: {e}") from e
+        client = self._client()
+
+        if not exists:
+            if self.dry_run:
+                self._print(f"Zone {zone_name}:", f"  create zone with {len(local_rrsets)} RRsets")
+            elif not client.create_zone(
+                zone_name, records=[r for rrset in local_rrsets for r in rrset.records()]
+            ):
+                raise ZoneImportError(f"Could not create zone {zone_name}")
+            return CREATED
+
+        remote_zone = client.get_zone(zone_name)
+        if not remote_zone:
+            raise ZoneImportError(f"Could not get details for zone {zone_name}")
+        replace, delete = self.plan_zone(local_rrsets, remote_zone)
+        if not replace and not delete:
+            return UNCHANGED
+
+        if self.dry_run:
+            self._print(
+                f"Zone {zone_name}:",
+                *(f"  ~ {r.name} {r.ttl} {r.type} {' | '.join(r.contents)}" for r in replace),
+                *(f"  - {name} {record_type}" for name, record_type in delete),
+            )
+            return UPDATED
+
+        batch = client.batch(zone_name)
+        for rrset in replace:
+            batch.replace(rrset.name, rrset.type, list(rrset.contents), rrset.ttl)
+        for name, record_type in delete:
+            batch.delete(name, record_type)
+        if not batch.commit():
+            raise ZoneImportError(f"Could not update zone {zone_name}")
+        return UPDATED
+
+    def run(self, zone_names=None):
+        """Import the given zones, or every local zone file, and return counters."""
+        files = self.zone_files(zone_names)
+        stats = {"zones": len(files), CREATED: 0, UPDATED: 0, UNCHANGED: 0, "failed": 0}
+        if not files:
+            return stats
+
+        existing = {
+            zone["name"].rstrip(".").lower() for zone in self._client().iter_zones(dnssec=False)
+        }
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self.import_zone, name, path, name in existing): name
+                for name, path in files.items()
+            }
+            for future in as_completed(futures):
+                zone_name = futures[future]
+                try:
+                    status = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error importing zone {zone_name}: {e}")
+                    self._print(f"  ✗ Failed to import {zone_name}: {e}")
+                    stats["failed"] += 1
+                    continue
+
+                stats[status] += 1
+                if status != UNCHANGED and not self.dry_run:
+                    self.logger.info(f"Imported zone {zone_name} ({status})")
+                    self._print(f"  ✓ Imported {zone_name} ({status})")
+        return stats
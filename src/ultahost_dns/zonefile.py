@@ -0,0 +1,173 @@
+"""Streaming parser for BIND master files (cPanel zone files and DNS templates)."""
+
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from ultahost_dns.records import intern_type
+
+CLASSES = frozenset(("IN", "CH", "HS", "CS"))
+# Content fields holding domain names, which are qualified like owner names
+NAME_FIELDS = {
+    "CNAME": (0,),
+    "DNAME": (0,),
+    "NS": (0,),
+    "PTR": (0,),
+    "MX": (1,),
+    "SRV": (3,),
+    "SOA": (0, 1),
+}
+DEFAULT_TTL = "3600"
+
+_TXT_STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+# Longest character-string allowed in a TXT record
+_TXT_CHUNK = 255
+_TTL_RE = re.compile(r"^(?:\d+[smhdw]?)+$", re.IGNORECASE)
+_PLACEHOLDER_RE = re.compile(r"^%\w+%$")
+_TTL_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+class ZoneEntry(NamedTuple):
+    """One resource record as written in a zone file, with names qualified.
+
+    ``ttl`` is kept as text, so templates can use placeholders there; see
+    ``parse_ttl``.
+    """
+
+    name: str
+    ttl: str
+    type: str
+    content: str
+
+
+def parse_ttl(text: str) -> Optional[int]:
+    """Return a TTL (``3600``, ``1h``, ``1d12h``) in seconds, or None if it is not one."""
+    if not _TTL_RE.match(text):
+        return None
+    return sum(
+        int(value) * _TTL_UNITS[unit.lower()]
+        for value, unit in re.findall(r"(\d+)([smhdw]?)", text, re.I)
+    )
+
+
+def txt_data(content: str) -> str:
+    """Return TXT content (``"v=spf1 " "-all"``) as the joined data cPanel stores."""
+    strings = _TXT_STRING_RE.findall(content)
+    return "".join(strings) if strings else content
+
+
+def quote_txt(data: str) -> str:
+    """Return TXT data as quoted character-strings for a zone file."""
+    # Data read back from a zone file keeps its escapes; escape only bare quotes
+    data = re.sub(r'(?<!\\)"', r'\\"', data)
+    chunks = [data[i : i + _TXT_CHUNK] for i in range(0, len(data), _TXT_CHUNK)] or [""]
+    return " ".join(f'"{chunk}"' for chunk in chunks)
+
+
+def qualify(name: str, origin: str) -> str:
+    """Make a name absolute against ``origin``; names are left alone without an origin."""
+    if name == "@":
+        return origin or name
+    if name.endswith(".") or not origin:
+        return name
+    return f"{name}.{origin}"
+
+
+def _tokens(line: str, depth: int) -> Tuple[List[str], int]:
+    """Split a physical line into tokens, dropping comments and parentheses.
+
+    Quoted strings are kept whole, quotes included. Returns the tokens and the
+    parenthesis depth at the end of the line.
+    """
+    tokens = []
+    token = []
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if char == '"':
+            end = i + 1
+            while end < len(line) and line[end] != '"':
+                end += 2 if line[end] == "\\" else 1
+            token.append(line[i : end + 1])
+            i = end + 1
+            continue
+        if char in " \t\r\n;()":
+            if token:
+                tokens.append("".join(token))
+                token = []
+            if char == ";":
+                break
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth = max(depth - 1, 0)
+        else:
+            token.append(char)
+        i += 1
+    if token:
+        tokens.append("".join(token))
+    return tokens, depth
+
+
+def _logical_lines(lines: Iterable[str]) -> Iterator[Tuple[bool, List[str]]]:
+    """Yield ``(has_owner, tokens)`` per entry, joining parenthesized continuation lines."""
+    pending: List[str] = []
+    has_owner = False
+    depth = 0
+    for line in lines:
+        if depth == 0:
+            has_owner = bool(line) and line[0] not in " \t"
+        tokens, depth = _tokens(line, depth)
+        pending.extend(tokens)
+        if depth == 0 and pending:
+            yield has_owner, pending
+            pending = []
+    if pending:
+        yield has_owner, pending
+
+
+def iter_entries(
+    lines: Iterable[str], origin: str = "", default_ttl: str = DEFAULT_TTL
+) -> Iterator[ZoneEntry]:
+    """Yield the records of a zone file one at a time.
+
+    Handles ``$TTL`` and ``$ORIGIN``, parenthesized multi-line records, comments,
+    blank owners (repeating the previous one) and TTL/class in either order.
+    Relative owner names and name fields in content are qualified against the
+    current origin, ``@`` included. ``$INCLUDE`` is not followed.
+    """
+    ttl = default_ttl
+    owner = origin or "@"
+    for has_owner, tokens in _logical_lines(lines):
+        first = tokens[0]
+        if first.startswith("$"):
+            directive = first.upper()
+            if directive == "$TTL" and len(tokens) > 1:
+                ttl = tokens[1]
+            elif directive == "$ORIGIN" and len(tokens) > 1:
+                origin = qualify(tokens[1], origin)
+            continue
+
+        if has_owner:
+            owner = qualify(first, origin)
+            tokens = tokens[1:]
+
+        record_ttl = ttl
+        index = 0
+        while index < len(tokens):
+            token = tokens[index]
+            if token.upper() in CLASSES:
+                index += 1
+            elif _TTL_RE.match(token) or _PLACEHOLDER_RE.match(token):
+                record_ttl = token
+                index += 1
+            else:
+                break
+        if index >= len(tokens):
+            continue
+
+        record_type = intern_type(tokens[index])
+        fields = tokens[index + 1 :]
+        for field in NAME_FIELDS.get(record_type, ()):
+            if field < len(fields):
+                fields[field] = qualify(fields[field], origin)
+        yield ZoneEntry(owner, record_ttl, record_type, " ".join(fields))
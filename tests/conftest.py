@@ -0,0 +1,51 @@
+"""Shared test fixtures."""
+
+import pytest
+
+from tests.fake_pdns import FakePowerDNS
+from ultahost_dns.circuit_breaker import CircuitBreaker
+from ultahost_dns.dns_template import DNSTemplate
+from ultahost_dns.journal import Journal
+from ultahost_dns.metrics import Metrics, MetricsStore
+
+
+@pytest.fixture(autouse=True)
+def breaker_state(tmp_path, monkeypatch):
+    """Keep circuit breaker state in a per-test file."""
+    path = tmp_path / "circuit_breaker.json"
+    monkeypatch.setattr(CircuitBreaker, "STATE_FILE", path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def metrics_store(tmp_path, monkeypatch):
+    """Keep recorded metrics in a per-test store."""
+    store = MetricsStore(tmp_path / "metrics.sqlite")
+    monkeypatch.setattr(Metrics, "store", store)
+    monkeypatch.setattr(Metrics, "_pending", {})
+    monkeypatch.setattr(Metrics, "_enabled", True)
+    return store
+
+
+@pytest.fixture(autouse=True)
+def server_settings(tmp_path, monkeypatch):
+    """Read the server's template variables from per-test files."""
+    monkeypatch.setattr(DNSTemplate, "WWWACCT_CONF", tmp_path / "wwwacct.conf")
+    monkeypatch.setattr(DNSTemplate, "MAINIP_FILE", tmp_path / "mainip")
+    monkeypatch.setattr(DNSTemplate, "_server", None)
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def journal(tmp_path, monkeypatch):
+    """Keep the write-behind journal in a per-test database."""
+    monkeypatch.setattr(Journal, "STORE_FILE", tmp_path / "journal.sqlite")
+    return Journal()
+
+
+@pytest.fixture
+def fake_pdns():
+    """Run a stand-in PowerDNS API server for the test."""
+    server = FakePowerDNS().start()
+    yield server
+    server.stop()
@@ -0,0 +1,251 @@
+"""In-process stand-in for the PowerDNS v4 HTTP API, used by tests and benchmarks."""
+
+import copy
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+API_PREFIX = "/api/v1/servers/localhost"
+
+
+class FakePowerDNS:
+    """A threaded HTTP/1.1 keep-alive server implementing the zone endpoints.
+
+    ``latency`` adds a delay to every response; ``populate`` fills the server
+    with generated zones. ``requests`` records
+    ``(method, path)`` for every request and ``connections`` the number of TCP
+    connections accepted.
+    """
+
+    def __init__(self, api_key="test-key", latency=0.0):
+        """Initialize the server state; call ``start()`` to listen."""
+        self.api_key = api_key
+        self.latency = latency
+        self.zones = {}
+        self.requests = []
+        self.connections = 0
+        self.fail_next = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL of the running server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Start serving on an ephemeral localhost port."""
+        fake = self
+
+        class Handler(_Handler):
+            server_state = fake
+
+        class Server(ThreadingHTTPServer):
+            def get_request(self):
+                request = super().get_request()
+                with fake._lock:
+                    fake.connections += 1
+                return request
+
+        self._server = Server(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def add_zone(self, name, rrsets=(), serial=1):
+        """Create a zone directly in the server state."""
+        name = name if name.endswith(".") else name + "."
+        self.zones[name] = {
+            "id": name,
+            "name": name,
+            "kind": "Native",
+            "serial": serial,
+            "edited_serial": serial,
+            "rrsets": [copy.deepcopy(rrset) for rrset in rrsets],
+        }
+        return self.zones[name]
+
+    def populate(self, zones, records=4, prefix="zone"):
+        """Add ``zones`` zones ``<prefix><n>.test.`` with SOA, NS and ``records`` A records each."""
+        names = []
+        for index in range(zones):
+            name = f"{prefix}{index}.test."
+            rrsets = [
+                {
+                    "name": name,
+                    "type": "SOA",
+                    "ttl": 3600,
+                    "records": [
+                        {"content": f"ns1.{name} hostmaster.{name} 1 10800 3600 604800 3600"}
+                    ],
+                },
+                {"name": name, "type": "NS", "ttl": 3600, "records": [{"content": f"ns1.{name}"}]},
+            ]
+            rrsets.extend(
+                {
+                    "name": f"host{n}.{name}",
+                    "type": "A",
+                    "ttl": 300,
+                    "records": [{"content": f"192.0.2.{n % 250 + 1}"}],
+                }
+                for n in range(records)
+            )
+            # Built fresh here, so add_zone's copy is skipped for large populations
+            self.zones[name] = {
+                "id": name,
+                "name": name,
+                "kind": "Native",
+                "serial": 1,
+                "edited_serial": 1,
+                "rrsets": rrsets,
+            }
+            names.append(name)
+        return names
+
+    @staticmethod
+    def summary(zone):
+        """Return a zone as listed by ``GET /zones`` (without RRsets)."""
+        return {key: value for key, value in zone.items() if key != "rrsets"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_state = None
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately; avoid delayed-ACK stalls
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def _send(self, status, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def _handle(self, method):
+        state = self.server_state
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        body = self._body()
+        with state._lock:
+            state.requests.append((method, self.path))
+            failure = state.fail_next.pop(0) if state.fail_next else None
+        if state.latency:
+            time.sleep(state.latency)
+        if failure:
+            self._send(failure, {"error": "injected failure"})
+            return
+        if self.headers.get("X-API-Key") != state.api_key:
+            self._send(401, {"error": "Unauthorized"})
+            return
+
+        path = parts.path
+        if path == "/api/v1/servers":
+            self._send(200, [{"id": "localhost", "type": "Server"}])
+            return
+        if not path.startswith(API_PREFIX + "/zones"):
+            self._send(404, {"error": "Not Found"})
+            return
+
+        zone_name = path[len(API_PREFIX + "/zones") :].lstrip("/")
+        with state._lock:
+            if not zone_name:
+                self._zones(method, query, body)
+            else:
+                self._zone(method, zone_name, query, body)
+
+    def _zones(self, method, query, body):
+        state = self.server_state
+        if method == "GET":
+            zones = state.zones.values()
+            if "zone" in query:
+                zones = [zone for zone in zones if zone["name"] == query["zone"]]
+            zones = [state.summary(zone) for zone in zones]
+            if query.get("dnssec") == "false":
+                zones = [
+                    {k: v for k, v in zone.items() if k not in ("dnssec", "edited_serial")}
+                    for zone in zones
+                ]
+            self._send(200, zones)
+        elif method == "POST":
+            name = body["name"]
+            if name in state.zones:
+                self._send(409, {"error": f"Domain '{name}' already exists"})
+                return
+            rrsets = body.get("rrsets", [])
+            if body.get("nameservers"):
+                rrsets = rrsets + [
+                    {
+                        "name": name,
+                        "type": "NS",
+                        "ttl": 3600,
+                        "records": [{"content": ns} for ns in body["nameservers"]],
+                    }
+                ]
+            zone = state.add_zone(name, rrsets)
+            self._send(201, zone)
+        else:
+            self._send(405, {"error": "Method Not Allowed"})
+
+    def _zone(self, method, zone_name, query, body):
+        state = self.server_state
+        zone = state.zones.get(zone_name)
+        if zone is None:
+            self._send(404, {"error": "Not Found"})
+            return
+        if method == "GET":
+            if query.get("rrsets") == "false":
+                self._send(200, dict(state.summary(zone), rrsets=[]))
+            else:
+                self._send(200, zone)
+        elif method == "DELETE":
+            del state.zones[zone_name]
+            self._send(204)
+        elif method == "PATCH":
+            rrsets = {(rrset["name"], rrset["type"]): rrset for rrset in zone["rrsets"]}
+            for change in body.get("rrsets", []):
+                key = (change["name"], change["type"])
+                if change.get("changetype") == "DELETE":
+                    rrsets.pop(key, None)
+                else:
+                    rrsets[key] = {k: v for k, v in change.items() if k != "changetype"}
+            zone["rrsets"] = list(rrsets.values())
+            zone["serial"] += 1
+            zone["edited_serial"] = zone["serial"]
+            self._send(204)
+        else:
+            self._send(405, {"error": "Method Not Allowed"})
+
+    def do_GET(self):  # noqa: N802
+        self._handle("GET")
+
+    def do_POST(self):  # noqa: N802
+        self._handle("POST")
+
+    def do_PATCH(self):  # noqa: N802
+        self._handle("PATCH")
+
+    def do_DELETE(self):  # noqa: N802
+        self._handle("DELETE")
@@ -0,0 +1,175 @@
+"""Tests for the asyncio PowerDNS client."""
+
+import asyncio
+
+import pytest
+import requests
+
+from ultahost_dns.async_client import AsyncPowerDNSClient, ConnectionPool, _Disconnected
+from ultahost_dns.powerdns_client import PowerDNSClient
+from ultahost_dns.records import Record
+
+
+def run(coro):
+    """Run a coroutine to completion."""
+    return asyncio.run(coro)
+
+
+def make_rrset(name, record_type, contents, ttl=3600):
+    """Build a PowerDNS RRset."""
+    return {
+        "name": name,
+        "type": record_type,
+        "ttl": ttl,
+        "records": [{"content": c, "disabled": False} for c in contents],
+    }
+
+
+class TestAsyncPowerDNSClient:
+    """Test AsyncPowerDNSClient against the stand-in API server."""
+
+    def test_same_shapes_as_sync_client(self, fake_pdns):
+        """Test reads return what PowerDNSClient returns."""
+        fake_pdns.add_zone("example.com", [make_rrset("www.example.com.", "A", ["192.0.2.1"])])
+        sync_client = PowerDNSClient(api_url=fake_pdns.url, api_key="test-key")
+
+        async def main():
+            async with AsyncPowerDNSClient(api_url=fake_pdns.url, api_key="test-key") as client:
+                return (
+                    await client.list_zones(),
+                    await client.get_zone("example.com"),
+                    await client.get_records("example.com"),
+                    await client.get_zone_serial("example.com"),
+                    await client.get_zone("missing.com"),
+                    await client.test_connection(),
+                )
+
+        zones, zone, records, serial, missing, connected = run(main())
+        assert zones == sync_client.list_zones()
+        assert zone == sync_client.get_zone("example.com")
+        assert records == sync_client.get_records("example.com")
+        assert serial == 1
+        assert missing is None
+        assert connected is True
+
+    def test_writes(self, fake_pdns):
+        """Test zone and record changes."""
+
+        async def main():
+            async with AsyncPowerDNSClient(api_url=fake_pdns.url, api_key="test-key") as client:
+                records = [Record("@", "A", 300, "192.0.2.1")]
+                assert await client.create_zone("example.com", records=records) is True
+                assert await client.create_zone("example.com") is False
+                assert await client.add_record("example.com", "www", "A", "192.0.2.2") is True
+                assert (
+                    await client.batch("example.com")
+                    .add("mail", "MX", "mail.example.com.", priority=10)
+                    .commit()
+                )
+                assert await client.delete_record("example.com", "@", "A") is True
+                assert await client.delete_zone("other.com") is False
+
+        run(main())
+        rrsets = {(r["name"], r["type"]): r for r in fake_pdns.zones["example.com."]["rrsets"]}
+        assert set(rrsets) == {("www.example.com.", "A"), ("mail.example.com.", "MX")}
+        assert (
+            rrsets[("mail.example.com.", "MX")]["records"][0]["content"] == "10 mail.example.com."
+        )
+
+    def test_concurrent_requests_reuse_connections(self, fake_pdns):
+        """Test many requests in flight share a bounded set of keep-alive connections."""
+        names = [f"zone{i}.com" for i in range(50)]
+        for name in names:
+            fake_pdns.add_zone(name)
+
+        async def main():
+            async with AsyncPowerDNSClient(
+                api_url=fake_pdns.url, api_key="test-key", concurrency=4
+            ) as client:
+                first = await client.get_zones(names)
+                second = await client.get_zones(names)
+                return first, second
+
+        first, second = run(main())
+        assert all(first[name]["name"] == name + "." for name in names)
+        assert first == second
+        assert len(fake_pdns.requests) == 100
+        assert fake_pdns.connections <= 4
+
+    def test_retry_and_error_semantics(self, fake_pdns):
+        """Test transient errors are retried and HTTP errors raise requests exceptions."""
+        fake_pdns.add_zone("example.com")
+        fake_pdns.fail_next = [503]
+
+        async def main():
+            async with AsyncPowerDNSClient(api_url=fake_pdns.url, api_key="wrong") as client:
+                client.RETRY_BACKOFF = 0
+                with pytest.raises(requests.exceptions.HTTPError) as error:
+                    await client._request("GET", "/zones/example.com.")
+                return error.value.response.status_code
+
+        assert run(main()) == 401
+        assert len(fake_pdns.requests) == 2
+
+    @pytest.mark.parametrize("method", ["GET", "POST"])
+    def test_lost_response_resent_only_if_idempotent(self, fake_pdns, monkeypatch, method):
+        """Test a request whose response was lost on a reused connection is resent if idempotent."""
+        read_response = ConnectionPool.read_response
+
+        async def lost_response(reader, request_method):
+            monkeypatch.setattr(ConnectionPool, "read_response", staticmethod(read_response))
+            await read_response(reader, request_method)
+            raise _Disconnected()
+
+        async def main():
+            async with AsyncPowerDNSClient(api_url=fake_pdns.url, api_key="test-key") as client:
+                client.max_retries = 0
+                await client.list_zones()
+                monkeypatch.setattr(ConnectionPool, "read_response", staticmethod(lost_response))
+                if method == "GET":
+                    return await client._request("GET", "/zones")
+                return await client._request("POST", "/zones", data={"name": "new.com."})
+
+        path = "/api/v1/servers/localhost/zones"
+        if method == "GET":
+            assert run(main()) == []
+            assert fake_pdns.requests.count(("GET", path)) == 3
+        else:
+            with pytest.raises(requests.exceptions.ConnectionError):
+                run(main())
+            assert fake_pdns.requests.count(("POST", path)) == 1
+
+    def test_connection_refused(self, fake_pdns):
+        """Test an unreachable endpoint raises ConnectionError."""
+        url = fake_pdns.url
+        fake_pdns.stop()
+
+        async def main():
+            client = AsyncPowerDNSClient(api_url=url, api_key="test-key")
+            client.max_retries = 0
+            client.RETRY_BACKOFF = 0
+            with pytest.raises(requests.exceptions.ConnectionError):
+                await client._request("GET", "/zones")
+            assert await client.list_zones() == []
+
+        run(main())
+
+
+class TestStreaming:
+    """Test the streaming iterators of PowerDNSClient against the stand-in server."""
+
+    def test_iter_zones_and_records(self, fake_pdns):
+        """Test zones and records are streamed with the same shapes as the list methods."""
+        fake_pdns.add_zone("a.com", [make_rrset("www.a.com.", "A", ["192.0.2.1", "192.0.2.2"])])
+        fake_pdns.add_zone("b.com")
+        client = PowerDNSClient(api_url=fake_pdns.url, api_key="test-key")
+        client.STREAM_CHUNK_SIZE = 16
+
+        assert list(client.iter_zones()) == client.list_zones()
+        assert [z["name"] for z in client.iter_zones("b.com")] == ["b.com."]
+        assert "edited_serial" not in next(client.iter_zones(dnssec=False))
+        assert [r.content for r in client.iter_records("a.com")] == ["192.0.2.1", "192.0.2.2"]
+        assert client.get_records("a.com") == list(client.iter_records("a.com"))
+        assert client.get_records("missing.com") == []
+        assert client.get_zone("a.com", rrsets=False)["rrsets"] == []
+        assert ("GET", "/api/v1/servers/localhost/zones?zone=b.com.") in fake_pdns.requests
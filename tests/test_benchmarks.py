@@ -0,0 +1,77 @@
+"""Smoke test for the benchmark harness."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+
+class TestBenchmarks:
+    """Test the harness runs every group against the stand-ins."""
+
+    def test_small_run(self, tmp_path):
+        """Test a tiny run reports every benchmark and no hook failures."""
+        output = tmp_path / "results.json"
+        args = [
+            "--zones",
+            "50",
+            "--repeat",
+            "1",
+            "--sample",
+            "5",
+            "--hook-zones",
+            "5",
+            "--sync-zones",
+            "5",
+        ]
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.run_benchmarks", *args, "--output", str(output)],
+            cwd=REPO_DIR,
+            check=True,
+            capture_output=True,
+        )
+        report = json.loads(output.read_text())
+        results = report["results"]
+
+        assert {name.split(".")[0] for name in results} == {
+            "hooks",
+            "api",
+            "transport",
+            "sync",
+            "templates",
+        }
+        assert all(
+            result["failures"] == 0 for name, result in results.items() if name.startswith("hooks.")
+        )
+        assert results["transport.http.client.list_zones"]["connections"] == 1
+        assert results["sync.initial.5"]["stats"]["changed"] == 5
+        assert results["sync.unchanged.5"]["stats"]["skipped"] == 5
+
+        # A report compares cleanly against itself
+        args = [
+            "--only",
+            "templates",
+            "--repeat",
+            "1",
+            "--compare",
+            str(output),
+            "--threshold",
+            "1000",
+        ]
+        compared = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.run_benchmarks",
+                *args,
+                "--output",
+                str(tmp_path / "again.json"),
+            ],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+        )
+        assert compared.returncode == 0
+        assert "templates.apply" in compared.stderr
@@ -0,0 +1,124 @@
+"""Tests for retries and the circuit breaker."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from ultahost_dns.circuit_breaker import CircuitBreaker, CircuitOpenError
+from ultahost_dns.powerdns_client import PowerDNSClient
+
+
+def make_response(status_code=200, payload=None):
+    """Build a mocked requests response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = b"x" if payload is not None else b""
+    response.json.return_value = payload
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+    return response
+
+
+@pytest.fixture(autouse=True)
+def no_sleep():
+    """Skip retry backoff delays."""
+    with patch("ultahost_dns.powerdns_client.time.sleep") as sleep:
+        yield sleep
+
+
+class TestRetries:
+    """Test request retries."""
+
+    @patch("ultahost_dns.powerdns_client.requests.Session")
+    def test_get_retried_on_503(self, mock_session_class):
+        """Test idempotent requests are retried on a transient status."""
+        mock_session = MagicMock()
+        mock_session.request.side_effect = [
+            make_response(503),
+            make_response(200, {"name": "example.com."}),
+        ]
+        mock_session_class.return_value = mock_session
+
+        client = PowerDNSClient(api_url="https://dns.example.com", api_key="test-key")
+        assert client.get_zone("example.com") == {"name": "example.com."}
+        assert mock_session.request.call_count == 2
+        assert mock_session.request.call_args[1]["timeout"] == client.timeout
+
+    @patch("ultahost_dns.powerdns_client.requests.Session")
+    def test_post_not_retried_after_send(self, mock_session_class):
+        """Test POST is not repeated once the server may have acted on it."""
+        mock_session = MagicMock()
+        mock_session.request.side_effect = [make_response(503), make_response(201, {})]
+        mock_session_class.return_value = mock_session
+
+        client = PowerDNSClient(api_url="https://dns.example.com", api_key="test-key")
+        assert client.create_zone("example.com") is False
+        assert mock_session.request.call_count == 1
+
+    @patch("ultahost_dns.powerdns_client.requests.Session")
+    def test_post_retried_on_connect_timeout(self, mock_session_class):
+        """Test POST is retried when the connection was never established."""
+        mock_session = MagicMock()
+        mock_session.request.side_effect = [
+            requests.exceptions.ConnectTimeout(),
+            make_response(201, {}),
+        ]
+        mock_session_class.return_value = mock_session
+
+        client = PowerDNSClient(api_url="https://dns.example.com", api_key="test-key")
+        assert client.create_zone("example.com") is True
+        assert mock_session.request.call_count == 2
+
+
+class TestCircuitBreaker:
+    """Test the shared circuit breaker."""
+
+    @patch("ultahost_dns.powerdns_client.requests.Session")
+    def test_open_circuit_fails_fast_across_clients(self, mock_session_class):
+        """Test an open circuit stops requests from every client of the endpoint."""
+        mock_session = MagicMock()
+        mock_session.request.side_effect = requests.exceptions.ConnectionError("refused")
+        mock_session_class.return_value = mock_session
+
+        client = PowerDNSClient(api_url="https://dns.example.com", api_key="test-key")
+        client.max_retries = 0
+        for _ in range(CircuitBreaker.THRESHOLD):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                client._request("GET", "/zones")
+        assert mock_session.request.call_count == CircuitBreaker.THRESHOLD
+
+        other = PowerDNSClient(api_url="https://dns.example.com/", api_key="test-key")
+        with pytest.raises(CircuitOpenError):
+            other._request("GET", "/zones")
+        assert other.test_connection() is False
+        assert mock_session.request.call_count == CircuitBreaker.THRESHOLD
+
+        elsewhere = PowerDNSClient(api_url="https://dns2.example.com", api_key="test-key")
+        assert elsewhere.breaker.allow() is True
+
+    def test_single_probe_after_cooldown(self, breaker_state):
+        """Test one caller probes after the cooldown and its success closes the circuit."""
+        breaker = CircuitBreaker("https://dns.example.com", threshold=2, cooldown=0)
+        peer = CircuitBreaker("https://dns.example.com", threshold=2, cooldown=0)
+        breaker.record_failure()
+        breaker.record_failure()
+
+        assert breaker.allow() is True
+        assert peer.allow() is False
+
+        breaker.record_success()
+        assert peer.allow() is True
+        assert breaker_state.read_text() == "{}"
+
+    def test_client_errors_do_not_count(self, breaker_state):
+        """Test 4xx responses are treated as a healthy API."""
+        breaker = CircuitBreaker("https://dns.example.com", threshold=1)
+        with patch("ultahost_dns.powerdns_client.requests.Session") as mock_session_class:
+            mock_session_class.return_value.request.return_value = make_response(404)
+            client = PowerDNSClient(
+                api_url="https://dns.example.com", api_key="test-key", breaker=breaker
+            )
+            assert client.get_zone("missing.com") is None
+        assert breaker.allow() is True
+        assert not breaker_state.exists()
@@ -84,4 +84,66 @@ class TestConfig:
                 assert config["enabled"] is True
                 assert config["api_key"] == ""
 
-
+    def test_missing_file_not_created(self, tmp_path):
+        """Test loading without a config file does not write one."""
+        with patch.object(Config, "CONFIG_FILE", tmp_path / "test_config.json"):
+            assert Config.is_enabled() is False
+            assert not (tmp_path / "test_config.json").exists()
+
+    def test_snapshot_parsed_once(self, tmp_path):
+        """Test an unchanged file is parsed only once."""
+        with patch.object(Config, "CONFIG_FILE", tmp_path / "test_config.json"):
+            Config.save({"api_url": "https://test.com", "api_key": "key", "enabled": "yes"})
+            with patch.object(Config, "_read", wraps=Config._read) as read:
+                assert Config.is_enabled() is True
+                assert Config.get_api_url() == "https://test.com"
+                assert Config.get("sync_workers", 8) == 8
+                read.assert_not_called()
+
+                snapshot = Config.reload()
+                assert read.call_count == 1
+                assert snapshot.enabled is True
+                with pytest.raises(TypeError):
+                    snapshot.values["api_key"] = "other"
+
+    def test_snapshot_follows_file_changes(self, tmp_path):
+        """Test a replaced config file is picked up."""
+        config_file = tmp_path / "test_config.json"
+        with patch.object(Config, "CONFIG_FILE", config_file):
+            Config.save({"api_url": "https://old.com", "api_key": "key", "enabled": True})
+            assert Config.get_api_url() == "https://old.com"
+
+            other = tmp_path / "other.json"
+            other.write_text(json.dumps({"api_url": "https://new.com"}))
+            other.replace(config_file)
+            assert Config.get_api_url() == "https://new.com"
+
+    def test_endpoints(self, tmp_path):
+        """Test endpoint lists with weights and roles."""
+        with patch.object(Config, "CONFIG_FILE", tmp_path / "test_config.json"):
+            Config.save({"api_url": "https://single.com/", "api_key": "key", "enabled": True})
+            assert [e.url for e in Config.get_endpoints()] == ["https://single.com"]
+
+            Config.save(
+                {
+                    "api_key": "key",
+                    "enabled": True,
+                    "endpoints": [
+                        "https://a.com",
+                        {
+                            "url": "https://b.com",
+                            "weight": 3,
+                            "role": "primary",
+                            "api_key": "b-key",
+                        },
+                        {"url": ""},
+                    ],
+                }
+            )
+            endpoints = Config.get_endpoints()
+            assert [(e.url, e.weight, e.primary, e.api_key) for e in endpoints] == [
+                ("https://b.com", 3.0, True, "b-key"),
+                ("https://a.com", 1.0, False, "key"),
+            ]
+            assert Config.get_api_url() == "https://b.com"
+            assert Config.is_enabled() is True
@@ -0,0 +1,187 @@
+"""Tests for the hook daemon."""
+
+import json
+import runpy
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ultahost_dns.config import Config
+from ultahost_dns.daemon import (
+    DaemonClient,
+    DaemonError,
+    DaemonUnavailable,
+    HookDaemon,
+    run_operation,
+)
+from ultahost_dns.operations import DENIED, OK, DNSOperations
+
+
+class FakeOperations:
+    """Operations stand-in that records calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def dispatch(self, operation, params):
+        self.calls.append((operation, params))
+        if operation == "explode":
+            raise ValueError("boom")
+        return OK
+
+    def stream(self, operation, params):
+        self.calls.append((operation, params))
+
+        def items():
+            yield {"zone": "a.com"}
+            if operation == "explode":
+                raise ValueError("boom")
+            yield {"zone": "b.com"}
+
+        return items()
+
+
+@pytest.fixture
+def running_daemon():
+    """Run a daemon with fake operations on a temporary socket."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = Path(tmpdir) / "run" / "test.sock"
+        operations = FakeOperations()
+        daemon = HookDaemon(socket_path=socket_path, operations=operations)
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+
+        for _ in range(100):
+            if socket_path.exists():
+                break
+            time.sleep(0.01)
+
+        yield daemon, operations, socket_path
+
+        daemon.shutdown()
+        thread.join(timeout=5)
+
+
+class TestHookDaemon:
+    """Test the daemon protocol."""
+
+    def test_call_round_trip(self, running_daemon):
+        """Test an operation is executed by the daemon."""
+        _, operations, socket_path = running_daemon
+
+        result = DaemonClient(socket_path).call("add_record", {"zone_name": "example.com"})
+
+        assert result == OK
+        assert operations.calls == [("add_record", {"zone_name": "example.com"})]
+
+    def test_operation_error(self, running_daemon):
+        """Test errors raised by an operation are reported to the client."""
+        _, _, socket_path = running_daemon
+
+        with pytest.raises(DaemonError, match="boom"):
+            DaemonClient(socket_path).call("explode", {})
+
+    def test_stream_round_trip(self, running_daemon):
+        """Test streamed items are received in order, and errors after them are raised."""
+        _, operations, socket_path = running_daemon
+
+        assert list(DaemonClient(socket_path).stream("iter_zones", {})) == [
+            {"zone": "a.com"},
+            {"zone": "b.com"},
+        ]
+        assert operations.calls == [("iter_zones", {})]
+
+        items = DaemonClient(socket_path).stream("explode", {})
+        assert next(items) == {"zone": "a.com"}
+        with pytest.raises(DaemonError, match="boom"):
+            next(items)
+
+    def test_missing_socket(self):
+        """Test a missing socket is reported as unavailable."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with pytest.raises(DaemonUnavailable):
+                DaemonClient(Path(tmpdir) / "missing.sock").call("list_zones", {})
+
+    def test_run_operation_falls_back_in_process(self):
+        """Test hooks run the operation locally when the daemon is down."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with (
+                patch.object(DaemonClient, "SOCKET_PATH", Path(tmpdir) / "missing.sock"),
+                patch.object(DNSOperations, "__init__", return_value=None),
+                patch.object(DNSOperations, "delete_zone", return_value=OK) as mock_delete_zone,
+            ):
+                result = run_operation("delete_zone", zone_name="example.com", username="root")
+
+        assert result == OK
+        mock_delete_zone.assert_called_once_with(zone_name="example.com", username="root")
+
+
+class TestListZonesHook:
+    """Test the output of the dns_list_zones hook."""
+
+    HOOK = Path(__file__).parent.parent / "scripts" / "hooks" / "dns_list_zones"
+
+    def run_hook(self, monkeypatch, items):
+        """Run the hook with ``items`` as the zone stream; return its exit code."""
+        monkeypatch.setattr(Config, "is_enabled", classmethod(lambda cls: True))
+        monkeypatch.setattr("ultahost_dns.daemon.stream_operation", lambda operation: items())
+        with pytest.raises(SystemExit) as exit_info:
+            runpy.run_path(str(self.HOOK), run_name="__main__")
+        return exit_info.value.code
+
+    def test_lists_zones(self, monkeypatch, capsys):
+        """Test the zones are written as one API2 response."""
+
+        def items():
+            yield {"domain": "a.com"}
+            yield {"domain": "b.com"}
+
+        assert self.run_hook(monkeypatch, items) == 0
+        output = json.loads(capsys.readouterr().out)
+        assert output["data"]["zone"] == [{"domain": "a.com"}, {"domain": "b.com"}]
+
+    def test_failure_mid_stream_writes_nothing(self, monkeypatch, capsys):
+        """Test a listing that fails after some zones leaves stdout empty."""
+
+        def items():
+            yield {"domain": "a.com"}
+            raise DaemonError("Connection broken")
+
+        assert self.run_hook(monkeypatch, items) == 1
+        assert capsys.readouterr().out == ""
+
+
+class TestDNSOperations:
+    """Test operations shared by the daemon and the hooks."""
+
+    @patch("ultahost_dns.operations.Permissions.can_manage_zone", return_value=False)
+    def test_permission_denied(self, _mock_can_manage_zone):
+        """Test writes are refused without permission."""
+        client = MagicMock()
+        operations = DNSOperations(client)
+
+        assert (
+            operations.add_record("example.com", "www", "A", "192.0.2.1", username="bob") == DENIED
+        )
+        client.add_record.assert_not_called()
+
+    def test_list_zones_api2_shape(self):
+        """Test zones are formatted as an API2 listzones response."""
+        client = MagicMock()
+        client.iter_zones.return_value = iter([{"name": "example.com."}, {"name": ""}])
+
+        result = DNSOperations(client).list_zones()
+
+        assert result["status"] == 1
+        assert result["data"]["zone"] == [
+            {"domain": "example.com", "zone": "example.com", "zonefile": "example.com.db"},
+        ]
+
+    def test_unknown_operation(self):
+        """Test only whitelisted operations can be dispatched."""
+        with pytest.raises(ValueError):
+            DNSOperations(MagicMock()).dispatch("__init__", {})
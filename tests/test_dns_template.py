@@ -0,0 +1,159 @@
+"""Tests for DNS template management."""
+
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ultahost_dns.dns_template import CompiledTemplate, DNSTemplate, TemplateError
+from ultahost_dns.operations import DNSOperations
+from ultahost_dns.permissions import Permissions
+from ultahost_dns.powerdns_client import PowerDNSClient
+from ultahost_dns.status import FAILED
+
+
+class TestDNSTemplate:
+    """Test DNS template application."""
+
+    @patch("ultahost_dns.powerdns_client.requests.Session")
+    def test_apply_template_single_request(self, mock_session_class):
+        """Test the whole template is applied with one PATCH."""
+        mock_session = MagicMock()
+        mock_response = MagicMock()
+        mock_response.content = b""
+        mock_session.request.return_value = mock_response
+        mock_session_class.return_value = mock_session
+
+        client = PowerDNSClient(api_url="https://dns.example.com", api_key="test-key")
+        with (
+            tempfile.TemporaryDirectory() as tmpdir,
+            patch.object(DNSTemplate, "TEMPLATE_DIR", Path(tmpdir)),
+        ):
+            result = DNSTemplate.apply_template_to_zone(client, "example.com")
+
+        assert result is True
+        mock_session.request.assert_called_once()
+        rrsets = mock_session.request.call_args[1]["json"]["rrsets"]
+        ns = next(rrset for rrset in rrsets if rrset["type"] == "NS")
+        assert ns["name"] == "example.com."
+        assert len(ns["records"]) == 2
+
+
+TEMPLATE = """\
+; Zone file for %domain%
+$TTL %ttl%
+@      %nsttl%  IN      SOA     %nameserver%. %rpemail%. (
+                %serial%        ; serial
+                3600            ; refresh
+                86400 )         ; minimum
+
+%domain%. %nsttl% IN NS %nameserver%.
+%domain%. %nsttl% IN NS %nameserver2%.
+%domain%. IN A %ip%
+        IN MX 0 mail
+mail IN CNAME %domain%.
+www 300 IN TXT "v=spf1 a mx ; -all"
+$ORIGIN _tcp.%domain%.
+_sip 1h IN SRV 10 5 5060 sip
+"""
+
+
+@pytest.fixture
+def template_dirs(tmp_path, monkeypatch):
+    """Point the template and compiled-template directories at a temporary tree."""
+    template_dir = tmp_path / "dns_templates"
+    template_dir.mkdir()
+    monkeypatch.setattr(DNSTemplate, "TEMPLATE_DIR", template_dir)
+    monkeypatch.setattr(DNSTemplate, "CACHE_DIR", tmp_path / "compiled")
+    monkeypatch.setattr(DNSTemplate, "_compiled", {})
+    return template_dir
+
+
+class TestTemplateCompiler:
+    """Test template compilation, rendering and caching."""
+
+    VARIABLES = {
+        "ip": "192.0.2.1",
+        "nameserver": "ns1.example.net",
+        "nameserver2": "ns2.example.net",
+    }
+
+    def test_render(self, template_dirs):
+        """Test directives, parentheses, placeholders and relative names."""
+        (template_dirs / "standard.db").write_text(TEMPLATE)
+
+        records = DNSTemplate.get_template_records("example.com", "standard", self.VARIABLES)
+
+        assert [(r.name, r.ttl, r.type, r.content) for r in records] == [
+            ("example.com.", 86400, "NS", "ns1.example.net."),
+            ("example.com.", 86400, "NS", "ns2.example.net."),
+            ("example.com.", 14400, "A", "192.0.2.1"),
+            ("example.com.", 14400, "MX", "0 mail.example.com."),
+            ("mail.example.com.", 14400, "CNAME", "example.com."),
+            ("www.example.com.", 300, "TXT", '"v=spf1 a mx ; -all"'),
+            ("_sip._tcp.example.com.", 3600, "SRV", "10 5 5060 sip._tcp.example.com."),
+        ]
+
+    def test_missing_placeholder_fails(self, template_dirs):
+        """Test a template with placeholders left without a value is not rendered."""
+        (template_dirs / "standard.db").write_text(TEMPLATE)
+
+        with pytest.raises(TemplateError, match="no value for ip, nameserver2 "):
+            DNSTemplate.get_template_records(
+                "example.com", "standard", {"nameserver": "ns1.example.net"}
+            )
+
+        client = MagicMock()
+        operations = DNSOperations(client=client)
+        with patch.object(Permissions, "can_manage_zone", return_value=True):
+            assert operations.create_zone("example.com", "standard") == FAILED
+        client.create_zone.assert_not_called()
+
+    def test_server_variables(self, template_dirs, server_settings):
+        """Test the IP and nameservers come from the server's cPanel settings."""
+        (template_dirs / "standard.db").write_text(TEMPLATE)
+        (server_settings / "mainip").write_text("192.0.2.7\n")
+        (server_settings / "wwwacct.conf").write_text(
+            "HOMEDIR /home\nNS ns1.example.net\nNS2 ns2.example.net\nNS3\n"
+        )
+
+        records = DNSTemplate.get_template_records("example.com", "standard")
+        assert [(r.type, r.content) for r in records[:3]] == [
+            ("NS", "ns1.example.net."),
+            ("NS", "ns2.example.net."),
+            ("A", "192.0.2.7"),
+        ]
+
+        # A shared IP in wwwacct.conf takes precedence over the main IP
+        (server_settings / "wwwacct.conf").write_text("ADDR 192.0.2.8\nNS a.example.net\n")
+        records = DNSTemplate.get_template_records(
+            "example.com", "standard", {"nameserver2": "b.example.net"}
+        )
+        assert records[2].content == "192.0.2.8"
+
+    def test_compiled_once_per_file_version(self, template_dirs):
+        """Test the template is parsed once, reused from disk, and recompiled when it changes."""
+        template_file = template_dirs / "standard.db"
+        template_file.write_text(TEMPLATE)
+
+        with patch.object(
+            CompiledTemplate, "compile", wraps=CompiledTemplate.compile
+        ) as compile_mock:
+            first = DNSTemplate.compile_template("standard")
+            assert DNSTemplate.compile_template("standard") is first
+
+            # Another process starts with an empty memory cache and loads the compiled file
+            DNSTemplate._compiled.clear()
+            assert DNSTemplate.compile_template("standard") == first
+            assert compile_mock.call_count == 1
+
+            template_file.write_text(TEMPLATE + "ftp IN A %ip%\n")
+            assert len(DNSTemplate.compile_template("standard").entries) == len(first.entries) + 1
+            assert compile_mock.call_count == 2
+
+    def test_missing_template_uses_default(self, template_dirs):
+        """Test unknown and path-like template names fall back to the default records."""
+        for name in ("missing", "../standard"):
+            records = DNSTemplate.get_template_records("example.com", name)
+            assert ("www.example.com.", "A") in [(r.name, r.type) for r in records]
@@ -0,0 +1,244 @@
+"""Tests for the write-behind journal."""
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ultahost_dns.config import Config
+from ultahost_dns.daemon import DaemonClient, HookDaemon
+from ultahost_dns.journal import Journal, JournalFlusher
+from ultahost_dns.operations import FAILED, OK, DNSOperations
+from ultahost_dns.permissions import Permissions
+from ultahost_dns.powerdns_client import PowerDNSClient
+from ultahost_dns.zone_cache import ZoneCache
+
+
+def add(name, content, record_type="A", **params):
+    """Params of a journaled add_record."""
+    return dict(
+        {
+            "name": name,
+            "record_type": record_type,
+            "content": content,
+            "ttl": 300,
+            "priority": None,
+        },
+        **params,
+    )
+
+
+def rrsets(fake_pdns, zone="example.com."):
+    """Return the zone's RRsets as ``{(name, type): [contents]}``."""
+    return {
+        (rrset["name"], rrset["type"]): [record["content"] for record in rrset["records"]]
+        for rrset in fake_pdns.zones[zone]["rrsets"]
+    }
+
+
+def patches(fake_pdns):
+    """Return the PATCH requests the server received."""
+    return [path for method, path in fake_pdns.requests if method == "PATCH"]
+
+
+@pytest.fixture
+def client(fake_pdns):
+    """A client for the stand-in server with retries off."""
+    fake_pdns.add_zone("example.com")
+    client = PowerDNSClient(api_url=fake_pdns.url, api_key="test-key")
+    client.max_retries = 0
+    return client
+
+
+@pytest.fixture
+def write_behind(tmp_path, fake_pdns, monkeypatch):
+    """Enable write-behind against the stand-in server and allow every user."""
+    monkeypatch.setattr(Permissions, "can_manage_zone", classmethod(lambda cls, user, zone: True))
+    monkeypatch.setattr(ZoneCache, "CACHE_FILE", tmp_path / "zones.sqlite")
+    with patch.object(Config, "CONFIG_FILE", tmp_path / "config.json"):
+        Config.save(
+            {"api_url": fake_pdns.url, "api_key": "test-key", "enabled": True, "write_behind": True}
+        )
+        yield
+
+
+class TestJournal:
+    """Test the journal store."""
+
+    def test_order_stats_and_leases(self, journal, monkeypatch):
+        """Test entries are claimed in order and counted, and other flushers skip a leased zone."""
+        journal.append("b.com", "add_record", add("www", "192.0.2.1"))
+        journal.append("A.com.", "add_record", add("www", "192.0.2.2"))
+        journal.append("b.com", "delete_record", {"name": "www", "record_type": "A"})
+
+        stats = journal.stats()
+        assert (stats["depth"], stats["zones"], stats["retrying_zones"]) == (3, 2, 0)
+        assert stats["lag_seconds"] >= 0
+        assert journal.due_zones() == ["b.com", "a.com"]
+        assert [entry.operation for entry in journal.claim("b.com")] == [
+            "add_record",
+            "delete_record",
+        ]
+
+        monkeypatch.setattr(Journal, "_owner", staticmethod(lambda: "another-process"))
+        assert journal.claim("b.com") is None
+        assert journal.claim("a.com")[0].params == add("www", "192.0.2.2")
+
+    def test_discard(self, journal):
+        """Test a zone's entries can be dropped."""
+        journal.append("a.com", "add_record", add("www", "192.0.2.1"))
+        assert journal.discard("a.com") == 1
+        assert journal.stats()["depth"] == 0
+
+
+class TestJournalFlusher:
+    """Test applying journaled changes to the stand-in server."""
+
+    def test_coalesces_zone_into_one_patch(self, fake_pdns, client, journal):
+        """Test a zone's entries become one PATCH in which later changes to an RRset win."""
+        journal.append("example.com", "add_record", add("www", "192.0.2.1"))
+        journal.append("example.com", "update_record", add("www", "192.0.2.2"))
+        journal.append("example.com", "add_record", add("old", "192.0.2.3"))
+        journal.append("example.com", "delete_record", {"name": "old", "record_type": "A"})
+        journal.append(
+            "example.com", "add_record", add("@", "mail.example.com.", "MX", priority=10)
+        )
+
+        assert JournalFlusher(client, journal, debounce=0).flush() == 5
+        assert len(patches(fake_pdns)) == 1
+        assert rrsets(fake_pdns) == {
+            ("www.example.com.", "A"): ["192.0.2.2"],
+            ("example.com.", "MX"): ["10 mail.example.com."],
+        }
+        assert journal.stats()["depth"] == 0
+
+    def test_failures_are_retried_in_order(self, fake_pdns, client, journal):
+        """Test a failed zone keeps its entries in order and waits for its backoff."""
+        journal.append("example.com", "add_record", add("www", "192.0.2.1"))
+        fake_pdns.fail_next = [503]
+        flusher = JournalFlusher(client, journal, debounce=0)
+
+        assert flusher.flush() == 0
+        journal.append("example.com", "update_record", add("www", "192.0.2.2"))
+        assert journal.due_zones() == []
+        stats = journal.stats()
+        assert (stats["depth"], stats["retrying_zones"]) == (2, 1)
+        assert "503" in stats["last_error"]["error"]
+
+        assert flusher.flush(force=True) == 2
+        assert rrsets(fake_pdns) == {("www.example.com.", "A"): ["192.0.2.2"]}
+
+    def test_debounce_merges_bursts(self, fake_pdns, client, journal, monkeypatch):
+        """Test a zone is flushed once edits pause for the debounce window or the maximum delay."""
+        now = [1000.0]
+        monkeypatch.setattr("ultahost_dns.journal.time", SimpleNamespace(time=lambda: now[0]))
+        flusher = JournalFlusher(client, journal, debounce=2, max_delay=5)
+
+        journal.append("example.com", "add_record", add("www", "192.0.2.1"))
+        now[0] = 1001.0
+        journal.append("example.com", "update_record", add("www", "192.0.2.2"))
+        now[0] = 1002.5
+        assert flusher.flush() == 0
+        assert flusher.wait_time() == pytest.approx(0.5)
+        now[0] = 1003.0
+        assert flusher.flush() == 2
+        assert len(patches(fake_pdns)) == 1
+        assert rrsets(fake_pdns) == {("www.example.com.", "A"): ["192.0.2.2"]}
+
+        # Edits that never pause are flushed max_delay after the first one
+        for index in range(5):
+            now[0] = 2000.0 + index
+            journal.append("example.com", "add_record", add(f"host{index}", "192.0.2.1"))
+        now[0] = 2004.5
+        assert flusher.flush() == 0
+        now[0] = 2005.0
+        assert flusher.flush() == 5
+        assert len(patches(fake_pdns)) == 2
+
+    def test_rejected_changes_are_dropped_singly(self, fake_pdns, client, journal):
+        """Test a rejected batch is resent entry by entry, dropping only the rejected ones."""
+        for name in ("a", "b", "c"):
+            journal.append("example.com", "add_record", add(name, "192.0.2.1"))
+        fake_pdns.fail_next = [422, 0, 422]
+
+        assert JournalFlusher(client, journal, debounce=0).flush() == 2
+        assert set(rrsets(fake_pdns)) == {("a.example.com.", "A"), ("c.example.com.", "A")}
+        assert journal.stats()["depth"] == 0
+
+
+class TestWriteBehind:
+    """Test record operations with the write_behind setting."""
+
+    def test_queued_for_the_flusher(self, fake_pdns, client, journal, write_behind):
+        """Test with a flusher to notify, record changes are only journaled."""
+        notify = MagicMock()
+        operations = DNSOperations(client, journal=journal, notify=notify)
+
+        assert operations.add_record("example.com", "www", "A", "192.0.2.1") == OK
+        assert operations.delete_record("example.com", "old", "A") == OK
+        assert notify.call_count == 2
+        assert patches(fake_pdns) == []
+        assert journal.stats()["depth"] == 2
+
+        operations.delete_zone("example.com")
+        assert journal.stats()["depth"] == 0
+
+    def test_flushed_inline_without_daemon(self, fake_pdns, client, journal, write_behind):
+        """Test without a flusher the change is applied at once, and kept when PowerDNS is down."""
+        operations = DNSOperations(client, journal=journal)
+        assert operations.add_record("example.com", "www", "A", "192.0.2.1") == OK
+        assert rrsets(fake_pdns) == {("www.example.com.", "A"): ["192.0.2.1"]}
+
+        fake_pdns.fail_next = [503]
+        assert operations.add_record("example.com", "mail", "A", "192.0.2.2") == FAILED
+        assert journal.stats()["depth"] == 1
+
+        # The next change to the zone applies the one left behind as well
+        assert operations.add_record("example.com", "ftp", "A", "192.0.2.3") == OK
+        assert journal.stats()["depth"] == 0
+        assert ("mail.example.com.", "A") in rrsets(fake_pdns)
+
+    def test_daemon_applies_queued_changes(self, fake_pdns, write_behind):
+        """Test the daemon answers at once and its flusher applies a burst of changes together."""
+        fake_pdns.add_zone("example.com")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            socket_path = Path(tmpdir) / "test.sock"
+            daemon = HookDaemon(socket_path=socket_path)
+            thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+            thread.start()
+            for _ in range(100):
+                if socket_path.exists():
+                    break
+                time.sleep(0.01)
+
+            try:
+                for operation, name, content in (
+                    ("add_record", "www", "192.0.2.1"),
+                    ("update_record", "www", "192.0.2.2"),
+                    ("add_record", "mail", "192.0.2.3"),
+                ):
+                    params = {
+                        "zone_name": "example.com",
+                        "name": name,
+                        "record_type": "A",
+                        "content": content,
+                    }
+                    assert DaemonClient(socket_path).call(operation, params) == OK
+                for _ in range(300):
+                    if rrsets(fake_pdns):
+                        break
+                    time.sleep(0.01)
+            finally:
+                daemon.shutdown()
+                thread.join(timeout=5)
+
+        assert rrsets(fake_pdns) == {
+            ("www.example.com.", "A"): ["192.0.2.2"],
+            ("mail.example.com.", "A"): ["192.0.2.3"],
+        }
+        assert len(patches(fake_pdns)) == 1
+        assert daemon.journal.stats()["depth"] == 0
@@ -0,0 +1,58 @@
+"""Tests for incremental JSON parsing."""
+
+import json
+
+import pytest
+
+from ultahost_dns.json_stream import JSONStream
+
+
+def chunked(text, size):
+    """Split text into chunks of ``size`` characters."""
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class TestJSONStream:
+    """Test JSONStream."""
+
+    @pytest.mark.parametrize("size", [1, 3, 7, 1000])
+    def test_iter_array(self, size):
+        """Test array items are parsed across arbitrary chunk boundaries."""
+        items = [{"name": "a.com.", "serial": 2024010101}, 12345, "x,]}", [1, [2]], None, -1.5e3]
+        text = " " + json.dumps(items) + "\n"
+        assert list(JSONStream(chunked(text, size)).iter_array()) == items
+
+    def test_empty_array(self):
+        """Test an empty array yields nothing."""
+        assert list(JSONStream(["[", " ]"]).iter_array()) == []
+
+    @pytest.mark.parametrize("size", [1, 5, 1000])
+    def test_iter_member(self, size):
+        """Test the items of one member are streamed and the others collected."""
+        document = {
+            "name": "a.com.",
+            "rrsets": [{"name": "www.a.com."}, {"name": "a.com."}],
+            "serial": 3,
+        }
+        fields = {}
+        items = list(JSONStream(chunked(json.dumps(document), size)).iter_member("rrsets", fields))
+        assert items == document["rrsets"]
+        assert fields == {"name": "a.com.", "serial": 3}
+
+    def test_items_yielded_before_end(self):
+        """Test items are produced while the stream is still being read."""
+        consumed = []
+
+        def chunks():
+            for chunk in ['[{"a": 1}, ', '{"b": 2}', "]"]:
+                consumed.append(chunk)
+                yield chunk
+
+        items = JSONStream(chunks()).iter_array()
+        assert next(items) == {"a": 1}
+        assert len(consumed) == 1
+
+    def test_truncated(self):
+        """Test truncated input raises ValueError."""
+        with pytest.raises(ValueError):
+            list(JSONStream(['[{"a": 1}, {"b"']).iter_array())
@@ -0,0 +1,61 @@
+"""Tests for the plugin logger."""
+
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from ultahost_dns.config import Config
+from ultahost_dns.logger import LazyJSON, PluginLogger
+
+
+@pytest.fixture
+def plugin_logger(tmp_path, monkeypatch):
+    """Set up the plugin logger from a temporary config, writing to a temporary log file."""
+    config_file = tmp_path / "config.json"
+    monkeypatch.setattr(Config, "CONFIG_FILE", config_file)
+    monkeypatch.setattr(PluginLogger, "LOG_DIR", tmp_path)
+    monkeypatch.setattr(PluginLogger, "LOG_FILE", tmp_path / "plugin.log")
+    logger = logging.getLogger("ultahost_dns")
+    level = logger.level
+    PluginLogger.shutdown()
+
+    def setup(**config):
+        config_file.write_text(json.dumps(config))
+        Config.reload()
+        return PluginLogger.get_logger()
+
+    yield setup
+
+    PluginLogger.shutdown()
+    logger.setLevel(level)
+    Config.reload()
+
+
+class TestPluginLogger:
+    """Test queued, level-filtered and JSON-lines logging."""
+
+    def test_json_lines(self, plugin_logger):
+        """Test records are written as JSON lines by the background writer."""
+        logger = plugin_logger(log_level="debug", log_format="json")
+        logger.debug("Request data: %s", LazyJSON({"rrsets": []}))
+        PluginLogger.shutdown()
+
+        entry = json.loads(Path(PluginLogger.LOG_FILE).read_text().splitlines()[-1])
+        assert entry["level"] == "DEBUG"
+        assert entry["message"] == 'Request data: {\n  "rrsets": []\n}'
+
+    def test_disabled_level_is_not_formatted(self, plugin_logger):
+        """Test payloads below the configured level are never serialized."""
+
+        class Payload:
+            def __str__(self):
+                raise AssertionError("formatted a filtered record")
+
+        logger = plugin_logger(log_level="WARNING")
+        logger.debug("Request data: %s", Payload())
+        logger.info("Request data: %s", Payload())
+        PluginLogger.shutdown()
+
+        assert Path(PluginLogger.LOG_FILE).read_text() == ""
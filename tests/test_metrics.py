@@ -0,0 +1,152 @@
+"""Tests for latency histograms and counters."""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from ultahost_dns.daemon import run_operation
+from ultahost_dns.metrics import Metrics, MetricsStore, prometheus_text, summary
+from ultahost_dns.permissions import Permissions
+from ultahost_dns.powerdns_client import PowerDNSClient, _api_route
+
+
+def stored(store):
+    """Return the stored samples as ``{(name, sorted label items): value}``."""
+    return {(name, tuple(sorted(labels.items()))): value for name, labels, value in store.samples()}
+
+
+class TestMetrics:
+    """Test recording, flushing and exporting metrics."""
+
+    def test_flush_adds_to_store(self, metrics_store):
+        """Test increments from several flushes and stores add up."""
+        Metrics.inc("jobs_total", kind="a")
+        Metrics.inc("jobs_total", 2, kind="a")
+        Metrics.flush()
+        Metrics.inc("jobs_total", kind="a")
+        Metrics.flush()
+        # A second process's store on the same file
+        MetricsStore(metrics_store.path).add({("jobs_total", '{"kind": "a"}'): 4})
+
+        assert stored(metrics_store)[("jobs_total", (("kind", "a"),))] == 8
+
+    def test_concurrent_writers(self, metrics_store):
+        """Test stores on the same file do not lose increments."""
+
+        def write():
+            store = MetricsStore(metrics_store.path)
+            for _ in range(20):
+                store.add({("hits_total", "{}"): 1})
+
+        threads = [threading.Thread(target=write) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert stored(metrics_store)[("hits_total", ())] == 80
+
+    def test_histogram_export(self, metrics_store):
+        """Test observations become cumulative Prometheus buckets and JSON quantiles."""
+        for seconds in (0.003, 0.02, 0.02, 0.7):
+            Metrics.observe("op_seconds", seconds, op="x")
+        Metrics.flush()
+        samples = metrics_store.samples()
+
+        text = prometheus_text(samples)
+        assert "# TYPE op_seconds histogram" in text
+        assert 'op_seconds_bucket{le="0.005",op="x"} 1' in text
+        assert 'op_seconds_bucket{le="0.025",op="x"} 3' in text
+        assert 'op_seconds_bucket{le="+Inf",op="x"} 4' in text
+        assert 'op_seconds_count{op="x"} 4' in text
+
+        (entry,) = summary(samples)["histograms"]
+        assert entry["count"] == 4
+        assert entry["sum"] == pytest.approx(0.743)
+        assert entry["p50"] == "0.025"
+        assert entry["p99"] == "1.0"
+
+    def test_timer_counts_errors(self, metrics_store):
+        """Test a failing block is timed and counted as an error."""
+        with pytest.raises(ValueError):
+            with Metrics.timer("step_seconds", step="parse"):
+                raise ValueError("bad")
+        Metrics.flush()
+
+        samples = stored(metrics_store)
+        assert samples[("step_seconds_count", (("step", "parse"),))] == 1
+        assert samples[("step_errors_total", (("error", "ValueError"), ("step", "parse")))] == 1
+
+    def test_disabled(self, metrics_store, monkeypatch):
+        """Test nothing is recorded when metrics are disabled."""
+        monkeypatch.setattr(Metrics, "_enabled", False)
+        Metrics.inc("jobs_total")
+        Metrics.flush()
+        assert metrics_store.samples() == []
+
+
+class TestInstrumentation:
+    """Test the plugin's metrics."""
+
+    def test_api_route(self):
+        """Test zone and server names are replaced in metric labels."""
+        assert (
+            _api_route("/api/v1/servers/localhost/zones/example.com.")
+            == "/api/v1/servers/{server}/zones/{zone}"
+        )
+        assert (
+            _api_route("/api/v1/servers/localhost/zones?dnssec=false")
+            == "/api/v1/servers/{server}/zones"
+        )
+
+    def test_powerdns_requests(self, fake_pdns, metrics_store):
+        """Test API requests are timed per method and endpoint, and failures counted."""
+        client = PowerDNSClient(api_url=fake_pdns.url, api_key="test-key")
+        client.list_zones()
+        client.get_zone("missing.com")
+        Metrics.flush()
+
+        samples = stored(metrics_store)
+        zones = (("endpoint", "/api/v1/servers/{server}/zones"), ("method", "GET"))
+        zone = (("endpoint", "/api/v1/servers/{server}/zones/{zone}"), ("method", "GET"))
+        assert samples[("ultahost_dns_pdns_request_seconds_count", zones)] == 1
+        assert (
+            samples[
+                ("ultahost_dns_pdns_request_errors_total", (zone[0], ("error", "404"), zone[1]))
+            ]
+            == 1
+        )
+
+    def test_permission_checks(self, metrics_store, monkeypatch):
+        """Test permission checks are timed and denials counted."""
+        monkeypatch.setattr(Permissions, "get_user_type", classmethod(lambda cls, username: "user"))
+        monkeypatch.setattr(
+            Permissions, "ownership", MagicMock(owner_of_domain=lambda zone: "alice")
+        )
+        assert Permissions.can_manage_zone("alice", "example.com") is True
+        assert Permissions.can_manage_zone("bob", "example.com") is False
+        Metrics.flush()
+
+        samples = stored(metrics_store)
+        assert samples[("ultahost_dns_permission_check_seconds_count", ())] == 2
+        assert samples[("ultahost_dns_permission_denied_total", ())] == 1
+
+    def test_hook_runtime(self, metrics_store, monkeypatch):
+        """Test hooks record their runtime per operation."""
+        monkeypatch.setattr(
+            "ultahost_dns.daemon.DaemonClient.call", lambda self, operation, params: "ok"
+        )
+        assert run_operation("add_zone_record", zone="example.com") == "ok"
+        Metrics.flush()
+
+        samples = stored(metrics_store)
+        assert (
+            samples[
+                (
+                    "ultahost_dns_hook_seconds_count",
+                    (("mode", "daemon"), ("operation", "add_zone_record")),
+                )
+            ]
+            == 1
+        )
@@ -0,0 +1,148 @@
+"""Tests for permission management."""
+
+from unittest.mock import patch
+
+import pytest
+
+from ultahost_dns.ownership import OwnershipIndex
+from ultahost_dns.permissions import (
+    AccountBackend,
+    CpanelAccountBackend,
+    Permissions,
+    StaticAccountBackend,
+)
+
+
+@pytest.fixture
+def ownership(tmp_path):
+    """Build an ownership index from sample cPanel account files."""
+    userdomains = tmp_path / "userdomains"
+    userdomains.write_text(
+        "alice.com: alice\nshop.alice.com: alice\nbob.net: bob\ncarol.org: carol\n* : nobody\n",
+    )
+    trueuserowners = tmp_path / "trueuserowners"
+    trueuserowners.write_text("alice: res1\nbob: res1\ncarol: root\nres1: root\n")
+    index = OwnershipIndex(userdomains, trueuserowners, tmp_path / "ownership.json")
+    with patch.object(Permissions, "ownership", index):
+        yield index
+
+
+class TestOwnershipIndex:
+    """Test the domain ownership index."""
+
+    def test_lookups(self, ownership):
+        """Test domain and reseller lookups."""
+        assert ownership.owner_of_domain("alice.com.") == "alice"
+        assert ownership.owner_of_domain("www.bob.net") == "bob"
+        assert ownership.owner_of_domain("unknown.com") is None
+        assert ownership.reseller_of("bob") == "res1"
+        assert sorted(ownership.users_of_reseller("res1")) == ["alice", "bob"]
+        assert "*" not in ownership.all_domains()
+
+    def test_rebuilt_when_source_changes(self, ownership, tmp_path):
+        """Test the index follows changes to the source files."""
+        assert ownership.owner_of_domain("dave.io") is None
+
+        userdomains = tmp_path / "userdomains"
+        userdomains.write_text(userdomains.read_text() + "dave.io: dave\n")
+        ownership.CHECK_INTERVAL = 0
+
+        assert ownership.owner_of_domain("dave.io") == "dave"
+        assert (tmp_path / "ownership.json").exists()
+
+
+class TestPermissions:
+    """Test zone permission checks."""
+
+    @pytest.mark.parametrize(
+        ("username", "user_type", "zone", "allowed"),
+        [
+            ("root", "root", "anything.com", True),
+            ("alice", "user", "alice.com", True),
+            ("alice", "user", "shop.alice.com.", True),
+            ("alice", "user", "bob.net", False),
+            ("res1", "reseller", "bob.net", True),
+            ("res1", "reseller", "carol.org", False),
+            ("alice", "user", "unknown.com", False),
+        ],
+    )
+    def test_can_manage_zone(self, ownership, username, user_type, zone, allowed):
+        """Test users and resellers can only manage zones they own."""
+        with patch.object(Permissions, "get_user_type", return_value=user_type):
+            assert Permissions.can_manage_zone(username, zone) is allowed
+
+    def test_get_user_domains(self, ownership):
+        """Test domain listing per user type."""
+        with patch.object(Permissions, "get_user_type", return_value="user"):
+            assert sorted(Permissions.get_user_domains("alice")) == ["alice.com", "shop.alice.com"]
+        with patch.object(Permissions, "get_user_type", return_value="reseller"):
+            assert sorted(Permissions.get_user_domains("res1")) == [
+                "alice.com",
+                "bob.net",
+                "shop.alice.com",
+            ]
+
+
+class TestUserTypes:
+    """Test in-process user type resolution."""
+
+    @pytest.fixture(autouse=True)
+    def clear_user_types(self):
+        """Start every test with an empty memo."""
+        Permissions.clear_cache()
+        yield
+        Permissions.clear_cache()
+
+    def test_user_types_from_backend(self):
+        """Test user types come from the injected backend."""
+        backend = StaticAccountBackend(resellers=["res1"], users=["alice"])
+        with patch.object(Permissions, "backend", backend), patch("os.geteuid", return_value=0):
+            assert Permissions.get_user_type("root") == "root"
+            assert Permissions.get_user_type("res1") == "reseller"
+            assert Permissions.get_user_type("alice") == "user"
+            assert Permissions.get_user_type("mallory") is None
+
+    def test_backend_must_implement_lookups(self):
+        """Test a backend missing one of the account lookups cannot be created."""
+
+        class PartialBackend(AccountBackend):
+            def is_reseller(self, username):
+                return False
+
+        with pytest.raises(TypeError):
+            PartialBackend()
+
+    def test_root_requires_root_process(self):
+        """Test the root user type needs an effective UID of 0."""
+        with (
+            patch.object(Permissions, "backend", StaticAccountBackend()),
+            patch("os.geteuid", return_value=1000),
+        ):
+            assert Permissions.get_user_type("root") is None
+
+    def test_user_types_memoized(self):
+        """Test user types are resolved once within the TTL."""
+        backend = StaticAccountBackend(users=["alice"])
+        with patch.object(Permissions, "backend", backend):
+            assert Permissions.get_user_type("alice") == "user"
+            backend.users.clear()
+            assert Permissions.get_user_type("alice") == "user"
+
+            Permissions.clear_cache()
+            assert Permissions.get_user_type("alice") is None
+
+    def test_cpanel_backend(self, ownership, tmp_path):
+        """Test the cPanel backend reads the reseller file and account files."""
+        resellers_file = tmp_path / "resellers"
+        resellers_file.write_text("res1:list-accts,create-acct\n")
+        users_dir = tmp_path / "users"
+        users_dir.mkdir()
+        (users_dir / "erin").write_text("")
+
+        backend = CpanelAccountBackend(ownership, resellers_file, users_dir)
+
+        assert backend.is_reseller("res1") is True
+        assert backend.is_reseller("alice") is False
+        assert backend.user_exists("erin") is True
+        assert backend.user_exists("bob") is True
+        assert backend.user_exists("mallory") is False
@@ -5,7 +5,9 @@ from unittest.mock import MagicMock, patch
 import pytest
 import requests
 
+from ultahost_dns.config import Config
 from ultahost_dns.powerdns_client import PowerDNSClient
+from ultahost_dns.records import Record
 
 
 class TestPowerDNSClient:
@@ -112,4 +114,192 @@ class TestPowerDNSClient:
 
         assert result is False
 
+    @patch("ultahost_dns.powerdns_client.requests.Session")
+    def test_batch_groups_rrsets(self, mock_session_class):
+        """Test batched records are grouped into full RRsets in one PATCH."""
+        mock_session = MagicMock()
+        mock_response = MagicMock()
+        mock_response.content = b""
+        mock_session.request.return_value = mock_response
+        mock_session_class.return_value = mock_session
+
+        client = PowerDNSClient(api_url="https://dns.example.com", api_key="test-key")
+        result = (
+            client.batch("example.com")
+            .add("@", "NS", "ns1.example.net.")
+            .add("@", "NS", "ns2.example.net.")
+            .add("www", "A", "192.0.2.1")
+            .add("mail", "MX", "mail.example.com.", priority=10)
+            .delete("old", "CNAME")
+            .commit()
+        )
+
+        assert result is True
+        mock_session.request.assert_called_once()
+        call_args = mock_session.request.call_args
+        assert call_args[1]["method"] == "PATCH"
+        assert call_args[1]["url"].endswith("/zones/example.com.")
+
+        rrsets = {(rrset["name"], rrset["type"]): rrset for rrset in call_args[1]["json"]["rrsets"]}
+        assert len(rrsets) == 4
+        assert [r["content"] for r in rrsets["example.com.", "NS"]["records"]] == [
+            "ns1.example.net.",
+            "ns2.example.net.",
+        ]
+        assert rrsets["www.example.com.", "A"]["changetype"] == "REPLACE"
+        assert rrsets["mail.example.com.", "MX"]["records"][0]["content"] == "10 mail.example.com."
+        assert rrsets["old.example.com.", "CNAME"] == {
+            "name": "old.example.com.",
+            "type": "CNAME",
+            "changetype": "DELETE",
+        }
+
+    def test_batch_later_change_supersedes(self):
+        """Test a later delete or replace supersedes earlier changes to an RRset."""
+        client = PowerDNSClient(api_url="https://dns.example.com", api_key="test-key")
+
+        batch = client.batch("example.com").add("www", "A", "192.0.2.1").delete("www", "A")
+        assert batch.rrsets() == [{"name": "www.example.com.", "type": "A", "changetype": "DELETE"}]
+
+        batch.add("www", "A", "192.0.2.2").replace("www", "A", ["192.0.2.3"], ttl=300)
+        assert batch.rrsets()[0]["records"] == [{"content": "192.0.2.3", "disabled": False}]
+        assert batch.rrsets()[0]["ttl"] == 300
+
+    @patch("ultahost_dns.powerdns_client.requests.Session")
+    def test_empty_batch_sends_nothing(self, mock_session_class):
+        """Test committing an empty batch does not call the API."""
+        mock_session = MagicMock()
+        mock_session_class.return_value = mock_session
+
+        client = PowerDNSClient(api_url="https://dns.example.com", api_key="test-key")
+
+        assert client.batch("example.com").commit() is True
+        mock_session.request.assert_not_called()
+
+    @patch("ultahost_dns.powerdns_client.requests.Session")
+    def test_create_zone_with_records(self, mock_session_class):
+        """Test template records are sent inline in the zone creation POST."""
+        mock_session = MagicMock()
+        mock_response = MagicMock()
+        mock_response.content = b""
+        mock_session.request.return_value = mock_response
+        mock_session_class.return_value = mock_session
+
+        client = PowerDNSClient(api_url="https://dns.example.com", api_key="test-key")
+        records = [
+            Record("@", "NS", 3600, "ns1.example.net."),
+            Record("@", "NS", 3600, "ns2.example.net."),
+            Record("www", "A", 300, "192.0.2.1"),
+        ]
+        result = client.create_zone(
+            "example.com", nameservers=["ns1.example.net."], records=records
+        )
+
+        assert result is True
+        mock_session.request.assert_called_once()
+        payload = mock_session.request.call_args[1]["json"]
+        assert mock_session.request.call_args[1]["method"] == "POST"
+        assert "nameservers" not in payload
+        assert len(payload["rrsets"]) == 2
+        assert all("changetype" not in rrset for rrset in payload["rrsets"])
+        assert payload["rrsets"][1] == {
+            "name": "www.example.com.",
+            "type": "A",
+            "ttl": 300,
+            "records": [{"content": "192.0.2.1", "disabled": False}],
+        }
+
+
+class TestMultipleEndpoints:
+    """Test endpoint selection and failover."""
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Configure a primary and a secondary endpoint."""
+        with patch.object(Config, "CONFIG_FILE", tmp_path / "config.json"):
+            Config.save(
+                {
+                    "api_key": "key",
+                    "enabled": True,
+                    "max_retries": 0,
+                    "endpoints": [
+                        {"url": "https://primary.example.com"},
+                        {"url": "https://secondary.example.com"},
+                    ],
+                }
+            )
+            yield
+
+    @staticmethod
+    def make_client(responses):
+        """Build a client whose sessions answer per URL host."""
+        client = PowerDNSClient()
+        calls = []
+
+        def request(method, url, **kwargs):
+            calls.append((method, url))
+            host = url.split("/")[2]
+            result = responses[host]
+            if isinstance(result, Exception):
+                raise result
+            response = MagicMock()
+            response.status_code = result
+            response.content = b""
+            return response
+
+        for endpoint in client.endpoints:
+            endpoint.session = MagicMock()
+            endpoint.session.request.side_effect = request
+        return client, calls
+
+    def test_reads_prefer_fastest(self, config):
+        """Test reads go to the endpoint with the lowest latency."""
+        client, calls = self.make_client({"primary.example.com": 200, "secondary.example.com": 200})
+        client.endpoints[0].latency = 0.2
+        client.endpoints[1].latency = 0.01
+
+        client._request("GET", "/zones")
+        assert calls == [("GET", "https://secondary.example.com/api/v1/servers/localhost/zones")]
+
+    def test_writes_fail_over(self, config):
+        """Test writes go to the primary and fail over to the secondary."""
+        client, calls = self.make_client(
+            {
+                "primary.example.com": requests.exceptions.ConnectionError("down"),
+                "secondary.example.com": 204,
+            }
+        )
+        client._request("PATCH", "/zones/example.com.", data={"rrsets": []})
+        assert [url.split("/")[2] for _, url in calls] == [
+            "primary.example.com",
+            "secondary.example.com",
+        ]
+
+        client.write_policy = "primary"
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client._request("PATCH", "/zones/example.com.", data={"rrsets": []})
+
+    def test_unhealthy_endpoint_skipped(self, config):
+        """Test reads avoid an endpoint whose circuit is open."""
+        client, calls = self.make_client({"primary.example.com": 200, "secondary.example.com": 200})
+        for _ in range(client.endpoints[0].breaker.threshold):
+            client.endpoints[0].breaker.record_failure()
+
+        for _ in range(3):
+            client._request("GET", "/zones")
+        assert {url.split("/")[2] for _, url in calls} == {"secondary.example.com"}
+
+    def test_check_endpoints(self, config):
+        """Test every endpoint's health and latency is reported."""
+        client, _ = self.make_client({})
+        client.endpoints[1].session.get.side_effect = requests.exceptions.ConnectTimeout(
+            "timed out"
+        )
 
+        results = client.check_endpoints()
+        assert [(r["url"], r["primary"], r["healthy"]) for r in results] == [
+            ("https://primary.example.com", True, True),
+            ("https://secondary.example.com", False, False),
+        ]
+        assert results[0]["latency"] is not None
+        assert results[1]["error"] == "timed out"
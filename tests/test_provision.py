@@ -0,0 +1,95 @@
+"""Tests for bulk zone provisioning."""
+
+from functools import partial
+
+import pytest
+
+from ultahost_dns.async_client import AsyncPowerDNSClient
+from ultahost_dns.dns_template import DNSTemplate
+from ultahost_dns.permissions import Permissions
+from ultahost_dns.provision import BulkProvisioner, Checkpoint, ProvisionItem, parse_items
+
+
+@pytest.fixture
+def provisioner(fake_pdns, tmp_path, monkeypatch):
+    """Build a provisioner against the stand-in API; only "mallory" lacks permission."""
+    monkeypatch.setattr(DNSTemplate, "TEMPLATE_DIR", tmp_path / "dns_templates")
+    monkeypatch.setattr(
+        Permissions, "can_manage_zone", classmethod(lambda cls, user, zone: user != "mallory")
+    )
+    output = []
+    provisioner = BulkProvisioner(
+        client_factory=partial(AsyncPowerDNSClient, api_url=fake_pdns.url, api_key="test-key"),
+        checkpoint=Checkpoint(tmp_path / "provision.checkpoint"),
+        concurrency=4,
+        rate=0,
+        output=output.append,
+    )
+    return provisioner
+
+
+class TestBulkProvisioner:
+    """Test BulkProvisioner against the stand-in API server."""
+
+    def test_parse_items(self):
+        """Test list parsing with defaults, comments and commas."""
+        lines = [
+            "# migration batch 1\n",
+            "A.com\n",
+            "b.com alice\n",
+            "c.com., bob, simple  # note\n",
+            "\n",
+        ]
+
+        assert list(parse_items(lines, template="standard")) == [
+            ProvisionItem("a.com", "root", "standard"),
+            ProvisionItem("b.com", "alice", "standard"),
+            ProvisionItem("c.com", "bob", "simple"),
+        ]
+
+    def test_run(self, provisioner, fake_pdns):
+        """Test zones are created with their template, existing and denied ones are not."""
+        fake_pdns.add_zone("exists.com")
+        items = [
+            ProvisionItem("a.com"),
+            ProvisionItem("b.com", "alice"),
+            ProvisionItem("exists.com"),
+            ProvisionItem("evil.com", "mallory"),
+            ProvisionItem("a.com"),
+        ]
+
+        stats = provisioner.run(items)
+
+        assert stats == {
+            "zones": 4,
+            "created": 2,
+            "exists": 1,
+            "denied": 1,
+            "failed": 0,
+            "resumed": 0,
+        }
+        assert set(fake_pdns.zones) == {"a.com.", "b.com.", "exists.com."}
+        rrsets = {(r["name"], r["type"]) for r in fake_pdns.zones["b.com."]["rrsets"]}
+        assert ("www.b.com.", "A") in rrsets
+        assert ("POST", "/api/v1/servers/localhost/zones") in fake_pdns.requests
+
+    def test_resume(self, provisioner, fake_pdns):
+        """Test a second run skips finished zones and retries failed ones."""
+        fake_pdns.fail_next = [200, 500]
+        items = [ProvisionItem("a.com"), ProvisionItem("b.com")]
+
+        # The listing consumes the first injected status, one creation fails
+        first = provisioner.run(items)
+        assert first["created"] == 1
+        assert first["failed"] == 1
+
+        second = provisioner.run(items)
+        assert second == {
+            "zones": 2,
+            "created": 1,
+            "exists": 0,
+            "denied": 0,
+            "failed": 0,
+            "resumed": 1,
+        }
+        assert set(fake_pdns.zones) == {"a.com.", "b.com."}
@@ -0,0 +1,80 @@
+"""Tests for the shared record types."""
+
+from ultahost_dns.records import Record, RRset
+
+
+class TestRecord:
+    """Test Record conversions."""
+
+    def test_create_interns_type_and_ttl(self):
+        """Test records built from parsed input share their type and TTL objects."""
+        first = Record.create(
+            "a.example.com.", "".join(["m", "x"]), "86400", "10 mail.example.com."
+        )
+        second = Record.create("b.example.com.", "MX", int("864" + "00"), "20 mail.example.com.")
+
+        assert first.type == "MX"
+        assert first.type is second.type
+        assert first.ttl is second.ttl
+
+    def test_to_api2(self):
+        """Test the cPanel API2 shape splits MX priority and relativizes the apex."""
+        mx = Record.create("example.com.", "MX", 300, "10 mail.example.com.")
+        a = Record.create("www.example.com.", "A", 300, "192.0.2.1")
+
+        assert mx.to_api2("example.com") == {
+            "name": "@",
+            "ttl": 300,
+            "type": "MX",
+            "record": "mail.example.com.",
+            "priority": 10,
+        }
+        assert a.to_api2("example.com.") == {
+            "name": "www.example.com",
+            "ttl": 300,
+            "type": "A",
+            "record": "192.0.2.1",
+        }
+
+    def test_to_zone_line(self):
+        """Test zone-file output."""
+        record = Record.create("example.com.", "TXT", 60, '"v=spf1 -all"')
+
+        assert record.to_zone_line("example.com") == '@\t60\tIN\tTXT\t"v=spf1 -all"'
+
+
+class TestRRset:
+    """Test RRset conversions."""
+
+    def test_api_round_trip(self):
+        """Test PowerDNS rrset JSON converts to records and back."""
+        data = {
+            "name": "www.example.com.",
+            "type": "A",
+            "ttl": 300,
+            "records": [
+                {"content": "192.0.2.1", "disabled": False},
+                {"content": "192.0.2.2", "disabled": True},
+            ],
+        }
+        rrset = RRset.from_api(data)
+
+        assert [r.content for r in rrset.records()] == ["192.0.2.1", "192.0.2.2"]
+        assert [r.disabled for r in rrset.records()] == [False, True]
+        assert rrset.to_api() == data
+        assert rrset.to_api("REPLACE")["changetype"] == "REPLACE"
+
+    def test_group(self):
+        """Test records are grouped per name and type in first-seen order."""
+        records = [
+            Record.create("example.com.", "NS", 3600, "ns1.example.net."),
+            Record.create("www.example.com.", "A", 300, "192.0.2.1"),
+            Record.create("example.com.", "NS", 3600, "ns2.example.net."),
+        ]
+        rrsets = RRset.group(records)
+
+        assert [(r.name, r.type, r.contents) for r in rrsets] == [
+            ("example.com.", "NS", ("ns1.example.net.", "ns2.example.net.")),
+            ("www.example.com.", "A", ("192.0.2.1",)),
+        ]
+        assert list(RRset.group(rrsets[0].records())) == [rrsets[0]]
@@ -0,0 +1,94 @@
+"""Import-time budget of the hook scripts."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.sandbox import Sandbox
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+HOOK = REPO_DIR / "scripts" / "hooks" / "dns_add_record"
+RUN_HOOK = REPO_DIR / "benchmarks" / "run_hook.py"
+
+# Modules a hook must not load before it has work to do
+HEAVY = (
+    "requests",
+    "urllib3",
+    "sqlite3",
+    "subprocess",
+    "ultahost_dns.operations",
+    "ultahost_dns.powerdns_client",
+)
+
+# Import times depend on the machine: budgets are relaxed by SLACK unless the
+# tight ones are requested
+TIGHT_BUDGETS = os.environ.get("ULTAHOST_DNS_STARTUP_BUDGET") == "1"
+SLACK = 1 if TIGHT_BUDGETS else 4
+
+
+def import_times(args):
+    """Run Python with ``-X importtime``; return cumulative microseconds of top-level imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        cwd=REPO_DIR / "src",
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.rstrip()] = int(cumulative)
+    return times
+
+
+def plugin_ms(times):
+    """Milliseconds spent importing the plugin package, its dependencies included."""
+    return sum(us for name, us in times.items() if name.startswith("ultahost_dns")) / 1000
+
+
+def loaded(times):
+    """Names of all imported modules."""
+    return {name.strip() for name in times}
+
+
+class TestStartup:
+    """Test hooks load only what they use.
+
+    The modules loaded and the import time are checked. Budgets are
+    milliseconds and the best of three runs is compared; they are enforced
+    as given with ``ULTAHOST_DNS_STARTUP_BUDGET=1`` and with ``SLACK`` times
+    the headroom otherwise, so slow CI machines catch only gross regressions.
+    """
+
+    DISABLED_BUDGET_MS = 20
+    HOOK_BUDGET_MS = 45
+
+    def test_disabled_hook(self, tmp_path):
+        """Test a disabled plugin exits having loaded only the configuration."""
+        sandbox = Sandbox(tmp_path)
+        sandbox.write_config(enabled=False)
+        hook = [str(RUN_HOOK), str(tmp_path), str(HOOK)]
+        times = import_times([*hook, "example.com", "www", "A", "192.0.2.1"])
+
+        modules = loaded(times)
+        assert {name for name in modules if name.startswith("ultahost_dns")} == {
+            "ultahost_dns",
+            "ultahost_dns.config",
+            "ultahost_dns.status",
+        }
+        assert "logging" not in modules
+        runs = [times] + [import_times(hook) for _ in range(2)]
+        assert min(plugin_ms(times) for times in runs) < self.DISABLED_BUDGET_MS * SLACK
+
+    def test_hook_modules(self):
+        """Test what an enabled hook loads before handing work to the daemon."""
+        modules = ("config", "status", "logger", "daemon")
+        code = "import " + ", ".join(f"ultahost_dns.{name}" for name in modules)
+        times = import_times(["-c", code])
+
+        assert not loaded(times).intersection(HEAVY)
+        runs = [times] + [import_times(["-c", code]) for _ in range(2)]
+        assert min(plugin_ms(times) for times in runs) < self.HOOK_BUDGET_MS * SLACK
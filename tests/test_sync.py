@@ -0,0 +1,285 @@
+"""Tests for PowerDNS to cPanel zone sync."""
+
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from ultahost_dns.cpanel_dns import ZoneFiles
+from ultahost_dns.records import Record
+from ultahost_dns.sync import SyncError, SyncState, ZoneSyncer
+
+
+def make_zone(name, rrsets):
+    """Build a PowerDNS zone document."""
+    return {
+        "name": name,
+        "rrsets": [
+            {
+                "name": rr_name,
+                "type": rr_type,
+                "ttl": ttl,
+                "records": [{"content": c} for c in contents],
+            }
+            for rr_name, rr_type, ttl, contents in rrsets
+        ],
+    }
+
+
+class FakeCpanel:
+    """In-memory stand-in for CpanelDNS."""
+
+    def __init__(self, zones=None):
+        self.zones = zones or {}
+        self.calls = []
+
+    def list_zones(self):
+        return set(self.zones)
+
+    def delete_zone(self, zone_name):
+        self.calls.append(("delete", zone_name))
+        del self.zones[zone_name]
+
+    def get_records(self, zone_name):
+        return list(self.zones[zone_name])
+
+    def create_zone(self, zone_name):
+        self.calls.append(("create", zone_name))
+        self.zones[zone_name] = []
+
+    def write_zone(self, zone_name, records):
+        self.calls.append(("write", zone_name, [(r.name, r.content) for r in records]))
+        self.zones[zone_name] = list(records)
+
+
+class TestZoneSyncer:
+    """Test the sync engine."""
+
+    def test_plan_zone_diff(self):
+        """Test only changed records are planned."""
+        remote = [
+            Record("example.com.", "NS", 3600, "ns1.example.net."),
+            Record("www.example.com.", "A", 300, "192.0.2.1"),
+            Record("example.com.", "TXT", 300, '"v=spf1 " "-all"'),
+            Record("new.example.com.", "A", 300, "192.0.2.9"),
+        ]
+        local = [
+            Record("www.example.com.", "A", 300, "192.0.2.1"),
+            Record("example.com.", "TXT", 300, "v=spf1 -all"),
+            Record("old.example.com.", "A", 300, "192.0.2.2"),
+        ]
+
+        plan = ZoneSyncer.plan_zone("example.com", remote, local)
+
+        assert plan.changed
+        assert [r.name for r in plan.add] == ["new.example.com."]
+        assert plan.remove == [local[2]]
+        assert plan.keep == local[:2]
+
+    def test_run_fetches_each_zone_once(self, tmp_path):
+        """Test zones are fetched once and unchanged zones are left alone."""
+        client = MagicMock()
+        client.iter_zones.return_value = [{"name": "a.com."}, {"name": "b.com."}]
+        client.get_zone.side_effect = lambda name: {
+            "a.com": make_zone("a.com.", [("www.a.com.", "A", 300, ["192.0.2.1"])]),
+            "b.com": make_zone("b.com.", [("www.b.com.", "A", 300, ["192.0.2.2"])]),
+        }[name]
+        cpanel = FakeCpanel(
+            {"a.com": [Record("www.a.com.", "A", 300, "192.0.2.1")]},
+        )
+
+        state = SyncState(tmp_path / "state.json")
+        syncer = ZoneSyncer(
+            client_factory=lambda: client,
+            cpanel=cpanel,
+            workers=4,
+            output=lambda line: None,
+            state=state,
+        )
+        stats = syncer.run()
+
+        assert stats == {
+            "zones": 2,
+            "changed": 1,
+            "unchanged": 1,
+            "skipped": 0,
+            "deleted": 0,
+            "failed": 0,
+        }
+        assert client.get_zone.call_count == 2
+        client.get_records.assert_not_called()
+        assert cpanel.calls == [
+            ("create", "b.com"),
+            ("write", "b.com", [("www.b.com.", "192.0.2.2")]),
+        ]
+
+    def test_dry_run_prints_plan(self, tmp_path):
+        """Test dry run prints the plan without applying it."""
+        client = MagicMock()
+        client.get_zone.return_value = make_zone(
+            "a.com.", [("www.a.com.", "A", 300, ["192.0.2.1"])]
+        )
+        cpanel = FakeCpanel({"a.com": []})
+        output = []
+
+        syncer = ZoneSyncer(
+            client_factory=lambda: client,
+            cpanel=cpanel,
+            workers=1,
+            dry_run=True,
+            output=output.append,
+            state=SyncState(tmp_path / "state.json"),
+        )
+        stats = syncer.run(["a.com."])
+
+        assert stats["changed"] == 1
+        assert cpanel.calls == []
+        assert output == ["Zone a.com:", "  + www.a.com. 300 A 192.0.2.1"]
+
+    def test_incremental_sync(self, tmp_path):
+        """Test only zones whose serial changed are fetched on later runs."""
+        client = MagicMock()
+        client.iter_zones.return_value = [
+            {"name": "a.com.", "serial": 1, "edited_serial": 1},
+            {"name": "b.com.", "serial": 5, "edited_serial": 5},
+        ]
+
+        def get_zone(name):
+            listed = next(z for z in client.iter_zones.return_value if z["name"] == name + ".")
+            zone = make_zone(name + ".", [(f"www.{name}.", "A", 300, ["192.0.2.1"])])
+            return dict(zone, serial=listed["serial"], edited_serial=listed["edited_serial"])
+
+        client.get_zone.side_effect = get_zone
+        cpanel = FakeCpanel()
+        state_file = tmp_path / "state.json"
+
+        def sync():
+            syncer = ZoneSyncer(
+                client_factory=lambda: client,
+                cpanel=cpanel,
+                workers=2,
+                output=lambda line: None,
+                state=SyncState(state_file),
+            )
+            return syncer.run()
+
+        assert sync()["changed"] == 2
+        assert client.get_zone.call_count == 2
+
+        # Nothing changed: only the listing is requested
+        stats = sync()
+        assert stats["skipped"] == 2
+        assert client.get_zone.call_count == 2
+
+        # b.com changed, a.com was deleted from PowerDNS
+        client.iter_zones.return_value = [{"name": "b.com.", "serial": 6, "edited_serial": 6}]
+        stats = sync()
+        assert stats["deleted"] == 1
+        assert stats["unchanged"] == 1
+        assert client.get_zone.call_count == 3
+        assert ("delete", "a.com") in cpanel.calls
+        assert SyncState(state_file).zones() == ["b.com"]
+
+    def test_failed_listing_removes_nothing(self, tmp_path):
+        """Test a listing that fails, comes back empty or loses most zones removes no local zone."""
+        names = ("a.com", "b.com", "c.com")
+        cpanel = FakeCpanel(
+            {name: [Record(f"www.{name}.", "A", 300, "192.0.2.1")] for name in names}
+        )
+        state = SyncState(tmp_path / "state.json")
+        for name in names:
+            state.set(name, [1, 1])
+        client = MagicMock()
+
+        def listing():
+            yield {"name": "a.com.", "serial": 1, "edited_serial": 1}
+            raise requests.exceptions.ChunkedEncodingError("Connection broken")
+
+        def syncer(**kwargs):
+            return ZoneSyncer(
+                client_factory=lambda: client,
+                cpanel=cpanel,
+                output=lambda line: None,
+                state=state,
+                **kwargs,
+            )
+
+        client.iter_zones.side_effect = listing
+        with pytest.raises(SyncError):
+            syncer().run()
+
+        client.iter_zones.side_effect = None
+        for listed in ([], [{"name": "a.com.", "serial": 1, "edited_serial": 1}]):
+            client.iter_zones.return_value = listed
+            assert syncer().run()["deleted"] == 0
+        assert cpanel.calls == []
+        assert sorted(state.zones()) == ["a.com", "b.com", "c.com"]
+
+        assert syncer(force=True).run()["deleted"] == 2
+        assert set(cpanel.zones) == {"a.com"}
+
+
+class TestZoneFiles:
+    """Test the zone-file backend."""
+
+    ZONE = """\
+$TTL 14400
+example.com. 86400 IN SOA ns1.example.net. hostmaster.example.com. (
+    2024010101 3600 1800 1209600 86400 )
+example.com. 86400 IN NS ns1.example.net.
+www IN A 192.0.2.1
+example.com. IN TXT "v=spf1 " "-all"
+"""
+
+    def test_read_and_write(self, tmp_path):
+        """Test the zone is read like whmapi1 reports it and rewritten in one write and reload."""
+        (tmp_path / "example.com.db").write_text(self.ZONE)
+        reloads = []
+        files = ZoneFiles(zone_dir=tmp_path, reload_command=["true", "{zone}"])
+        files.reload = reloads.append
+
+        records = files.get_records("example.com")
+        assert files.list_zones() == {"example.com"}
+        assert [(r.name, r.type, r.content) for r in records][1:] == [
+            ("example.com.", "NS", "ns1.example.net."),
+            ("www.example.com.", "A", "192.0.2.1"),
+            ("example.com.", "TXT", "v=spf1 -all"),
+        ]
+
+        files.write_zone(
+            "example.com", records[:2] + [Record.create("mail.example.com.", "A", 300, "192.0.2.2")]
+        )
+
+        assert reloads == ["example.com"]
+        rewritten = files.get_records("example.com")
+        assert [(r.name, r.type) for r in rewritten] == [
+            ("example.com.", "SOA"),
+            ("example.com.", "NS"),
+            ("mail.example.com.", "A"),
+        ]
+        assert int(rewritten[0].content.split()[2]) > 2024010101
+        assert files.render("example.com", records[3:]).endswith(
+            'example.com.\t14400\tIN\tTXT\t"v=spf1 -all"\n'
+        )
+
+    def test_sync_writes_zone_files(self, tmp_path):
+        """Test a sync run rewrites a changed zone file."""
+        (tmp_path / "a.com.db").write_text("a.com. 300 IN A 192.0.2.9\n")
+        files = ZoneFiles(zone_dir=tmp_path)
+        files.reload = lambda zone_name: None
+        client = MagicMock()
+        client.get_zone.return_value = make_zone(
+            "a.com.", [("www.a.com.", "A", 300, ["192.0.2.1"])]
+        )
+
+        syncer = ZoneSyncer(
+            client_factory=lambda: client,
+            cpanel=files,
+            workers=1,
+            output=lambda line: None,
+            state=SyncState(tmp_path / "state.json"),
+        )
+        assert syncer.run(["a.com"])["changed"] == 1
+        assert [(r.name, r.content) for r in files.get_records("a.com")] == [
+            ("www.a.com.", "192.0.2.1")
+        ]
@@ -0,0 +1,156 @@
+"""Tests for the HTTP transports of the PowerDNS client."""
+
+import http.client
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from ultahost_dns.config import Config
+from ultahost_dns.powerdns_client import PowerDNSClient
+from ultahost_dns.transport import HTTPClientTransport
+
+TRANSPORTS = PowerDNSClient.TRANSPORTS
+
+
+def make_rrset(name, record_type, contents, ttl=3600):
+    """Build a PowerDNS RRset."""
+    return {
+        "name": name,
+        "type": record_type,
+        "ttl": ttl,
+        "records": [{"content": c, "disabled": False} for c in contents],
+    }
+
+
+class TestTransports:
+    """Test both transports give the same results and errors against the stand-in API server."""
+
+    @pytest.mark.parametrize("transport", TRANSPORTS)
+    def test_reads_and_writes(self, fake_pdns, transport):
+        """Test reads, streamed reads and writes."""
+        fake_pdns.add_zone("example.com", [make_rrset("www.example.com.", "A", ["192.0.2.1"])])
+        client = PowerDNSClient(api_url=fake_pdns.url, api_key="test-key", transport=transport)
+        client.STREAM_CHUNK_SIZE = 16
+
+        assert [zone["name"] for zone in client.list_zones()] == ["example.com."]
+        assert list(client.iter_zones()) == client.list_zones()
+        assert [r.content for r in client.iter_records("example.com")] == ["192.0.2.1"]
+        assert client.add_record("example.com", "mail", "A", "192.0.2.2") is True
+        assert client.create_zone("new.com", nameservers=["ns1.example.com."]) is True
+        assert client.get_zone("missing.com") is None
+        assert "mail.example.com." in {
+            rrset["name"] for rrset in fake_pdns.zones["example.com."]["rrsets"]
+        }
+        assert [e["healthy"] for e in client.check_endpoints()] == [True]
+
+    @pytest.mark.parametrize("transport", TRANSPORTS)
+    def test_http_errors(self, fake_pdns, transport):
+        """Test HTTP errors raise HTTPError carrying the response."""
+        fake_pdns.add_zone("example.com")
+        client = PowerDNSClient(api_url=fake_pdns.url, api_key="wrong", transport=transport)
+        with pytest.raises(requests.exceptions.HTTPError) as error:
+            client._request("GET", "/zones/example.com.")
+        assert error.value.response.status_code == 401
+        assert error.value.response.json() == {"error": "Unauthorized"}
+
+    @pytest.mark.parametrize("transport", TRANSPORTS)
+    def test_connection_refused(self, fake_pdns, transport):
+        """Test an unreachable endpoint raises ConnectionError."""
+        url = fake_pdns.url
+        fake_pdns.stop()
+        client = PowerDNSClient(api_url=url, api_key="test-key", transport=transport)
+        client.max_retries = 0
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client._request("GET", "/zones")
+
+    @pytest.mark.parametrize("transport", TRANSPORTS)
+    def test_refused_post_retried(self, fake_pdns, transport):
+        """Test a POST whose connection was refused is retried, since nothing was sent."""
+        url = fake_pdns.url
+        fake_pdns.stop()
+        client = PowerDNSClient(api_url=url, api_key="test-key", transport=transport)
+        client.RETRY_BACKOFF = 0
+        send = client.session.request = MagicMock(wraps=client.session.request)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client._request("POST", "/zones", data={"name": "new.com.", "kind": "Native"})
+        assert send.call_count == client.max_retries + 1
+
+    @pytest.mark.parametrize("session", [requests.Session, HTTPClientTransport])
+    def test_read_timeout(self, fake_pdns, session):
+        """Test a slow response raises ReadTimeout."""
+        fake_pdns.latency = 0.5
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            session().get(f"{fake_pdns.url}/api/v1/servers", timeout=(1, 0.1))
+
+    def test_setting_selects_transport(self, tmp_path):
+        """Test the http_transport setting, falling back to requests for unknown values."""
+        with patch.object(Config, "CONFIG_FILE", tmp_path / "config.json"):
+            Config.save(
+                {
+                    "api_url": "http://127.0.0.1:8081",
+                    "api_key": "key",
+                    "http_transport": "http.client",
+                }
+            )
+            assert isinstance(PowerDNSClient().session, HTTPClientTransport)
+            Config.save(
+                {"api_url": "http://127.0.0.1:8081", "api_key": "key", "http_transport": "curl"}
+            )
+            assert isinstance(PowerDNSClient().session, requests.Session)
+
+
+class TestHTTPClientTransport:
+    """Test connection reuse of the http.client transport."""
+
+    def test_keep_alive(self, fake_pdns):
+        """Test sequential requests, including streamed ones, share one connection."""
+        fake_pdns.populate(3)
+        client = PowerDNSClient(api_url=fake_pdns.url, api_key="test-key", transport="http.client")
+        for _ in range(10):
+            client.list_zones()
+            list(client.iter_zones())
+        client.get_zone("missing.com")
+
+        assert len(fake_pdns.requests) == 21
+        assert fake_pdns.connections == 1
+
+    @pytest.mark.parametrize("detected", [True, False])
+    def test_server_closed_idle_connection(self, fake_pdns, monkeypatch, detected):
+        """Test an idle connection the server closed is replaced, whether detected early or not."""
+        transport = HTTPClientTransport()
+        transport.headers["X-API-Key"] = "test-key"
+        url = f"{fake_pdns.url}/api/v1/servers"
+        transport.get(url)
+        ((connection,),) = transport._idle.values()
+        connection.sock.shutdown(1)
+        time.sleep(0.1)
+        if not detected:
+            monkeypatch.setattr("ultahost_dns.transport._dropped", lambda sock: False)
+
+        assert transport.get(url).status_code == 200
+        assert fake_pdns.connections == 2
+
+    @pytest.mark.parametrize("method", ["GET", "POST"])
+    def test_lost_response_resent_only_if_idempotent(self, fake_pdns, monkeypatch, method):
+        """Test a request whose response was lost is resent only if its method is idempotent."""
+        transport = HTTPClientTransport()
+        transport.headers["X-API-Key"] = "test-key"
+        url = f"{fake_pdns.url}/api/v1/servers/localhost/zones"
+        transport.get(url)
+        getresponse = http.client.HTTPConnection.getresponse
+
+        def lost_response(connection):
+            monkeypatch.setattr(http.client.HTTPConnection, "getresponse", getresponse)
+            getresponse(connection).close()
+            raise http.client.RemoteDisconnected("Remote end closed connection without response")
+
+        monkeypatch.setattr(http.client.HTTPConnection, "getresponse", lost_response)
+        if method == "GET":
+            assert transport.get(url).status_code == 200
+            assert fake_pdns.requests.count(("GET", "/api/v1/servers/localhost/zones")) == 3
+        else:
+            with pytest.raises(requests.exceptions.ConnectionError):
+                transport.request("POST", url, json={"name": "new.com.", "kind": "Native"})
+            assert fake_pdns.requests.count(("POST", "/api/v1/servers/localhost/zones")) == 1
@@ -0,0 +1,116 @@
+"""Tests for the zone cache."""
+
+from unittest.mock import MagicMock, patch
+
+from ultahost_dns.powerdns_client import PowerDNSClient
+from ultahost_dns.zone_cache import ZoneCache
+
+
+def make_cache(tmp_path, **kwargs):
+    """Create a cache in a temporary directory."""
+    settings = {"ttl": 60, "max_entries": 100, "max_bytes": 1024 * 1024}
+    settings.update(kwargs)
+    return ZoneCache(tmp_path / "zones.sqlite", **settings)
+
+
+def make_response(payload):
+    """Build a mocked requests response."""
+    response = MagicMock()
+    response.content = b"x"
+    response.json.return_value = payload
+    return response
+
+
+class TestZoneCache:
+    """Test the on-disk zone cache."""
+
+    def test_put_and_get(self, tmp_path):
+        """Test a cached zone is returned fresh within its TTL."""
+        cache = make_cache(tmp_path)
+        cache.put("example.com.", {"name": "example.com.", "serial": 7, "rrsets": []})
+
+        zone, serial, fresh = cache.get("example.com")
+        assert zone["name"] == "example.com."
+        assert serial == 7
+        assert fresh is True
+
+    def test_stale_and_revalidated(self, tmp_path):
+        """Test entries past their TTL are stale until revalidated."""
+        cache = make_cache(tmp_path, ttl=0)
+        cache.put("example.com", {"serial": 1})
+        assert cache.get("example.com")[2] is False
+
+        cache.ttl = 60
+        cache.revalidated("example.com")
+        assert cache.get("example.com")[2] is True
+
+    def test_invalidate(self, tmp_path):
+        """Test invalidated zones are no longer served."""
+        cache = make_cache(tmp_path)
+        cache.put("example.com", {"serial": 1})
+        cache.invalidate("example.com.")
+        assert cache.get("example.com") is None
+
+    def test_evicts_least_recently_read(self, tmp_path):
+        """Test the entry limit evicts the least recently read zones."""
+        cache = make_cache(tmp_path, max_entries=2)
+        cache.put("a.com", {"serial": 1})
+        cache.put("b.com", {"serial": 1})
+        cache.get("a.com")
+        cache.put("c.com", {"serial": 1})
+
+        assert cache.get("a.com") is not None
+        assert cache.get("b.com") is None
+        assert cache.get("c.com") is not None
+
+
+class TestCachedClient:
+    """Test PowerDNSClient with a zone cache."""
+
+    @patch("ultahost_dns.powerdns_client.requests.Session")
+    def test_repeated_fetch_served_from_cache(self, mock_session_class, tmp_path):
+        """Test an unchanged zone is fetched from the API once."""
+        mock_session = MagicMock()
+        mock_session.request.return_value = make_response(
+            {"name": "example.com.", "serial": 3, "rrsets": []}
+        )
+        mock_session_class.return_value = mock_session
+
+        client = PowerDNSClient(
+            api_url="https://dns.example.com", api_key="test-key", cache=make_cache(tmp_path)
+        )
+        assert client.get_zone_cached("example.com")["serial"] == 3
+        assert client.get_zone_cached("example.com")["serial"] == 3
+        assert mock_session.request.call_count == 1
+
+    @patch("ultahost_dns.powerdns_client.requests.Session")
+    def test_stale_entry_validated_by_serial(self, mock_session_class, tmp_path):
+        """Test a stale entry costs only a serial lookup when unchanged."""
+        mock_session = MagicMock()
+        mock_session.request.side_effect = [
+            make_response({"name": "example.com.", "serial": 3, "rrsets": []}),
+            make_response([{"name": "example.com.", "serial": 3}]),
+        ]
+        mock_session_class.return_value = mock_session
+
+        cache = make_cache(tmp_path, ttl=0)
+        client = PowerDNSClient(api_url="https://dns.example.com", api_key="test-key", cache=cache)
+        client.get_zone_cached("example.com")
+        assert client.get_zone_cached("example.com")["serial"] == 3
+
+        assert mock_session.request.call_count == 2
+        assert mock_session.request.call_args[1]["params"] == {"zone": "example.com."}
+
+    @patch("ultahost_dns.powerdns_client.requests.Session")
+    def test_writes_invalidate(self, mock_session_class, tmp_path):
+        """Test record changes made through the client invalidate the zone."""
+        mock_session = MagicMock()
+        mock_session.request.return_value = make_response({})
+        mock_session_class.return_value = mock_session
+
+        cache = make_cache(tmp_path)
+        cache.put("example.com", {"serial": 1})
+        client = PowerDNSClient(api_url="https://dns.example.com", api_key="test-key", cache=cache)
+
+        assert client.add_record("example.com", "www", "A", "192.0.2.1") is True
+        assert cache.get("example.com") is None
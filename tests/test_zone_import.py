@@ -0,0 +1,94 @@
+"""Tests for importing local zone files into PowerDNS."""
+
+from functools import partial
+
+from ultahost_dns.powerdns_client import PowerDNSClient
+from ultahost_dns.zone_import import ZoneImporter, read_zone_file
+
+ZONE = """\
+; cPanel first:130.0.1
+$TTL 14400
+example.com. 86400 IN SOA ns1.example.net. hostmaster.example.com. (
+    2024010101 3600 1800 1209600 86400 )
+example.com. 86400 IN NS ns1.example.net.
+example.com. 86400 IN NS ns2.example.net.
+example.com. IN A 192.0.2.1
+www IN CNAME example.com.
+example.com. IN TXT v=spf1 +a +mx ~all
+"""
+
+
+def make_importer(fake_pdns, zone_dir, **kwargs):
+    """Build an importer against the stand-in API server."""
+    return ZoneImporter(
+        client_factory=partial(PowerDNSClient, api_url=fake_pdns.url, api_key="test-key"),
+        zone_dir=zone_dir,
+        workers=2,
+        output=lambda line: None,
+        **kwargs,
+    )
+
+
+class TestZoneImporter:
+    """Test ZoneImporter against the stand-in API server."""
+
+    def test_read_zone_file(self, tmp_path):
+        """Test a cPanel zone file becomes PowerDNS RRsets without the SOA."""
+        path = tmp_path / "example.com.db"
+        path.write_text(ZONE)
+
+        rrsets = {(r.name, r.type): r for r in read_zone_file(path, "example.com")}
+
+        assert set(rrsets) == {
+            ("example.com.", "NS"),
+            ("example.com.", "A"),
+            ("www.example.com.", "CNAME"),
+            ("example.com.", "TXT"),
+        }
+        assert rrsets[("example.com.", "NS")].contents == ("ns1.example.net.", "ns2.example.net.")
+        assert rrsets[("example.com.", "TXT")].contents == ('"v=spf1 +a +mx ~all"',)
+        assert rrsets[("www.example.com.", "CNAME")].ttl == 14400
+
+    def test_import(self, fake_pdns, tmp_path):
+        """Test new zones are created, changed ones patched and identical ones left alone."""
+        (tmp_path / "example.com.db").write_text(ZONE)
+        (tmp_path / "other.com.db").write_text("$ORIGIN other.com.\n@ 300 IN A 192.0.2.9\n")
+        fake_pdns.add_zone(
+            "other.com",
+            [
+                {
+                    "name": "other.com.",
+                    "type": "A",
+                    "ttl": 300,
+                    "records": [{"content": "192.0.2.8"}],
+                },
+                {
+                    "name": "old.other.com.",
+                    "type": "A",
+                    "ttl": 300,
+                    "records": [{"content": "192.0.2.7"}],
+                },
+            ],
+        )
+
+        stats = make_importer(fake_pdns, tmp_path).run()
+
+        assert stats == {"zones": 2, "created": 1, "updated": 1, "unchanged": 0, "failed": 0}
+        other = {(r["name"], r["type"]): r for r in fake_pdns.zones["other.com."]["rrsets"]}
+        assert set(other) == {("other.com.", "A")}
+        assert other[("other.com.", "A")]["records"][0]["content"] == "192.0.2.9"
+        assert len(fake_pdns.zones["example.com."]["rrsets"]) == 4
+
+        writes = len([r for r in fake_pdns.requests if r[0] in ("POST", "PATCH")])
+        stats = make_importer(fake_pdns, tmp_path).run()
+        assert stats["unchanged"] == 2
+        assert len([r for r in fake_pdns.requests if r[0] in ("POST", "PATCH")]) == writes
+
+    def test_dry_run(self, fake_pdns, tmp_path):
+        """Test a dry run writes nothing."""
+        (tmp_path / "example.com.db").write_text(ZONE)
+
+        stats = make_importer(fake_pdns, tmp_path, dry_run=True).run(["example.com"])
+
+        assert stats["created"] == 1
+        assert fake_pdns.zones == {}
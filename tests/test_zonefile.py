@@ -0,0 +1,41 @@
+"""Tests for the zone-file parser."""
+
+from ultahost_dns.zonefile import ZoneEntry, iter_entries, parse_ttl
+
+
+class TestZoneFile:
+    """Test zone-file parsing."""
+
+    def test_parse_ttl(self):
+        """Test plain and BIND-style TTLs."""
+        assert parse_ttl("300") == 300
+        assert parse_ttl("1h30m") == 5400
+        assert parse_ttl("1D") == 86400
+        assert parse_ttl("%ttl%") is None
+
+    def test_iter_entries(self):
+        """Test directives, blank owners, class/TTL order and multi-line records."""
+        lines = [
+            "$TTL 1h\n",
+            "$ORIGIN example.com.\n",
+            "@ IN SOA ns1 hostmaster (\n",
+            "    2024010101 ; serial\n",
+            "    3600 1800 1209600 86400 )\n",
+            "@ 300 IN A 192.0.2.1\n",
+            "  IN 600 AAAA 2001:db8::1\n",
+            "www CNAME @ ; the site\n",
+            "mail.example.com. MX 10 mx1\n",
+        ]
+
+        assert list(iter_entries(lines)) == [
+            ZoneEntry(
+                "example.com.",
+                "1h",
+                "SOA",
+                "ns1.example.com. hostmaster.example.com. 2024010101 3600 1800 1209600 86400",
+            ),
+            ZoneEntry("example.com.", "300", "A", "192.0.2.1"),
+            ZoneEntry("example.com.", "600", "AAAA", "2001:db8::1"),
+            ZoneEntry("www.example.com.", "1h", "CNAME", "example.com."),
+            ZoneEntry("mail.example.com.", "1h", "MX", "10 mx1.example.com."),
+        ]
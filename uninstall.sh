@@ -17,6 +17,14 @@ fi
 
 echo -e "${YELLOW}Uninstalling Ultahost DNS Plugin...${NC}"
 
+# Stop hook daemon
+if [ -f "/etc/systemd/system/ultahost-dns.service" ]; then
+    echo -e "${YELLOW}Stopping hook daemon...${NC}"
+    systemctl disable --now ultahost-dns.service > /dev/null 2>&1 || true
+    rm -f /etc/systemd/system/ultahost-dns.service
+    systemctl daemon-reload || true
+fi
+
 # Remove directories
 echo -e "${YELLOW}Removing plugin files...${NC}"
 rm -rf /usr/local/cpanel/whostmgr/docroot/cgi/ultahost_dns
@@ -42,6 +50,8 @@ echo
 if [[ $REPLY =~ ^[Yy]$ ]]; then
     rm -f /var/cpanel/ultahost_dns_config.json
     rm -rf /var/log/ultahost_dns
+    rm -rf /var/cache/ultahost_dns
+    rm -f /var/cpanel/ultahost_dns_sync_state.json
 fi
 
 echo -e "${GREEN}Uninstallation completed!${NC}"
@@ -0,0 +1,41 @@
+#!/usr/bin/perl
+# AJAX endpoint returning the plugin's latency and error metrics
+
+use strict;
+use warnings;
+use lib '/usr/local/cpanel';
+use Cpanel::JSON ();
+use CGI qw(:standard);
+use File::Temp ();
+
+my $q = CGI->new;
+
+# Security check
+my $user = $ENV{'REMOTE_USER'} || '';
+if ($user ne 'root') {
+    print $q->header(-type => 'application/json', -status => '403');
+    print Cpanel::JSON::Dump({ success => 0, error => 'Access denied' });
+    exit;
+}
+
+# Only stdout carries the JSON document; stderr is kept apart for error messages
+my $stderr = File::Temp->new;
+my $stderr_file = $stderr->filename;
+my $output = `python3 /usr/local/cpanel/bin/ultahost_dns/export_metrics.py --json 2>$stderr_file`;
+my $exit_code = $? >> 8;
+
+my $result;
+if ($exit_code == 0) {
+    my $metrics = eval { Cpanel::JSON::Load($output) };
+    if ($@) {
+        $result = { success => 0, error => "Invalid metrics output: $@" };
+    } else {
+        $result = { success => 1, metrics => $metrics };
+    }
+} else {
+    my $error = do { local $/; <$stderr> };
+    $result = { success => 0, error => $error || "export_metrics.py exited with status $exit_code" };
+}
+
+print $q->header(-type => 'application/json');
+print Cpanel::JSON::Dump($result);
@@ -104,8 +104,10 @@ HTML
 
     # Save configuration
     eval {
+        # Keep settings that are not edited on this form (e.g. sync_workers)
         my $json_data = Cpanel::JSON::Dump(
             {
+                %{$config},
                 api_url => $api_url,
                 api_key => $api_key,
                 enabled => $enabled,